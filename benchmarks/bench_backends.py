@@ -0,0 +1,54 @@
+"""
+Compare per-track overhead of the cli and inprocess backends.
+
+Each backend resolves the same video several times in simulate mode, so the
+numbers reflect process spawn, extractor setup and connection reuse rather
+than download bandwidth. Requires network access.
+
+    poetry run python benchmarks/bench_backends.py --tracks 10 --video jNQXAC9IVRw
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from ytdlplist.backends import BACKENDS, get_backend
+
+
+async def bench_backend(name: str, video_id: str, tracks: int) -> list[float]:
+    backend = get_backend(name, workers=1, simulate=True)
+    timings: list[float] = []
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            for _ in range(tracks):
+                start: float = time.perf_counter()
+                result: int = await backend.download(video_id, output_dir=output_dir)
+                timings.append(time.perf_counter() - start)
+                if result:
+                    raise RuntimeError(f"{name} backend failed on {video_id}")
+    finally:
+        backend.close()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tracks", type=int, default=10)
+    parser.add_argument("--video", default="jNQXAC9IVRw")
+    parser.add_argument("--backend", choices=BACKENDS, action="append")
+    args = parser.parse_args()
+
+    print(f"{'backend':<10} {'first':>8} {'median':>8} {'mean':>8}  (seconds/track)")
+    for name in args.backend or BACKENDS:
+        timings: list[float] = asyncio.run(bench_backend(name, args.video, args.tracks))
+        warm: list[float] = timings[1:] or timings
+        print(
+            f"{name:<10} {timings[0]:>8.3f} {statistics.median(warm):>8.3f} "
+            f"{statistics.mean(warm):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Measure how long a small playlist waits behind a large backlog.
+
+A large playlist is queued first, then a small one, and simulated downloads
+of a fixed length drain the queue. With a plain FIFO queue the small
+playlist waits for the whole backlog; with the scheduler's fair queue it is
+interleaved from the next round on, and with a higher priority it goes
+first.
+
+    poetry run python benchmarks/bench_fairness.py --large 3000 --small 20
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from ytdlplist.fairqueue import FairQueue, PlaylistPolicy
+
+
+async def drain(
+    queue: Any, concurrency: int, seconds: float, done: dict[str, list[float]]
+) -> None:
+    start: float = time.perf_counter()
+
+    async def worker() -> None:
+        while True:
+            playlist: str = await queue.get()
+            await asyncio.sleep(seconds)
+            done[playlist].append(time.perf_counter() - start)
+            queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    await queue.join()
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def bench(
+    kind: str, large: int, small: int, concurrency: int, seconds: float
+) -> dict[str, list[float]]:
+    queue: Any
+    if kind == "fifo":
+        queue = asyncio.Queue()
+    else:
+        policies: dict[str, PlaylistPolicy] = {}
+        if kind == "priority":
+            policies["small"] = PlaylistPolicy(priority=1)
+        queue = FairQueue(lambda playlist: playlist, policies)
+    for _ in range(large):
+        queue.put_nowait("large")
+    for _ in range(small):
+        queue.put_nowait("small")
+    done: dict[str, list[float]] = {"large": [], "small": []}
+    await drain(queue, concurrency, seconds, done)
+    return done
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--large", type=int, default=3000)
+    parser.add_argument("--small", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--seconds", type=float, default=0.002, help="simulated download length"
+    )
+    parser.add_argument(
+        "--track-seconds",
+        type=float,
+        default=30.0,
+        help="real download length to scale the waits to",
+    )
+    args = parser.parse_args()
+
+    scale: float = args.track_seconds / args.seconds
+    print(
+        f"{'queue':>8} {'small first':>12} {'small last':>11} {'large last':>11}"
+        "  (minutes at {:.0f} s per track)".format(args.track_seconds)
+    )
+    for kind in ("fifo", "fair", "priority"):
+        done: dict[str, list[float]] = asyncio.run(
+            bench(kind, args.large, args.small, args.concurrency, args.seconds)
+        )
+        print(
+            f"{kind:>8} {min(done['small']) * scale / 60:>12.1f}"
+            f" {max(done['small']) * scale / 60:>11.1f}"
+            f" {max(done['large']) * scale / 60:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Measure the memory held by a parsed flat playlist.
+
+Builds a synthetic playlist shaped like ``yt-dlp -j --flat-playlist`` output
+and compares keeping every JSON object (the old ``Playlist.json``) against
+the compact TrackEntry model.
+
+    poetry run python benchmarks/bench_memory.py --entries 50000
+"""
+
+import argparse
+import json
+import tracemalloc
+from typing import Any, Callable
+
+from ytdlplist.metadata import parse_flat_playlist
+
+
+def synthetic_entry(i: int, playlist_id: str) -> dict[str, Any]:
+    video_id: str = f"v{i:010d}"
+    return {
+        "_type": "url",
+        "ie_key": "Youtube",
+        "id": video_id,
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "title": f"Synthetic track number {i}",
+        "description": None,
+        "duration": 180.0 + i % 240,
+        "channel_id": "UC0000000000000000000000",
+        "channel": "Synthetic Channel",
+        "channel_url": "https://www.youtube.com/channel/UC0000000000000000000000",
+        "uploader": "Synthetic Channel",
+        "uploader_id": "@synthetic",
+        "uploader_url": "https://www.youtube.com/@synthetic",
+        "thumbnails": [
+            {
+                "url": f"https://i.ytimg.com/vi/{video_id}/hq{size}.jpg",
+                "height": size,
+                "width": size * 16 // 9,
+            }
+            for size in (90, 180, 360, 720)
+        ],
+        "view_count": i * 37,
+        "live_status": None,
+        "playlist_id": playlist_id,
+        "playlist_title": "Synthetic Playlist",
+        "playlist_index": i + 1,
+        "webpage_url": f"https://www.youtube.com/watch?v={video_id}",
+        "extractor": "youtube",
+        "extractor_key": "Youtube",
+    }
+
+
+def measure(build: Callable[[], Any]) -> tuple[int, int]:
+    tracemalloc.start()
+    kept: Any = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=50_000)
+    args = parser.parse_args()
+
+    lines: list[str] = [
+        json.dumps(synthetic_entry(i, "PLsynthetic")) for i in range(args.entries)
+    ]
+
+    def raw_dicts() -> list[dict[str, Any]]:
+        return [json.loads(line) for line in lines]
+
+    def track_entries() -> Any:
+        return parse_flat_playlist(lines)
+
+    print(f"{args.entries} entries, {sum(map(len, lines)) / 2**20:.1f} MiB of NDJSON")
+    print(f"{'model':<14} {'retained':>12} {'peak':>12}")
+    results: dict[str, tuple[int, int]] = {}
+    for name, build in (("json dicts", raw_dicts), ("TrackEntry", track_entries)):
+        results[name] = measure(build)
+        current, peak = results[name]
+        print(f"{name:<14} {current / 2**20:>9.1f} MiB {peak / 2**20:>9.1f} MiB")
+    ratio: float = results["json dicts"][0] / max(results["TrackEntry"][0], 1)
+    print(f"retained memory reduced {ratio:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
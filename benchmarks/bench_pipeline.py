@@ -0,0 +1,281 @@
+"""
+Benchmark the playlist pipeline offline against a local fake yt-dlp.
+
+yt-dlp and ffmpeg are replaced by fake_ytdlp.py and fake_ffmpeg.py through
+YTDLPLIST_YTDLP and YTDLPLIST_FFMPEG, so the numbers measure ytdlplist itself
+and do not depend on the network. Every measurement runs in a fresh
+interpreter under a temporary HOME. The suite covers:
+
+    metadata    flat-playlist parse time, fetch time and peak RSS, and the
+                time to normalize and dedupe a large playlists.json
+    throughput  end-to-end tracks per second through dlplist_main
+    scaling     tracks per second at increasing concurrency
+
+Results are compared with benchmarks/baseline.json and the script exits with
+status 1 on a regression beyond the tolerance. Baselines are machine
+specific; refresh them with --save-baseline after an intended change.
+
+    poetry run python benchmarks/bench_pipeline.py
+    poetry run python benchmarks/bench_pipeline.py --save-baseline
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+HERE: str = os.path.dirname(os.path.abspath(__file__))
+BASELINE: str = os.path.join(HERE, "baseline.json")
+
+# Metric name -> whether a larger value is better.
+HIGHER_IS_BETTER: dict[str, bool] = {
+    "metadata_parse_s": False,
+    "metadata_fetch_s": False,
+    "metadata_rss_mb": False,
+    "playlist_validate_s": False,
+    "throughput_tracks_per_s": True,
+    "throughput_rss_mb": False,
+}
+
+
+def fake_env(home: str, **fake: Any) -> dict[str, str]:
+    env: dict[str, str] = {
+        **os.environ,
+        "HOME": home,
+        "XDG_CACHE_HOME": os.path.join(home, ".cache"),
+        "YTDLPLIST_YTDLP": os.path.join(HERE, "fake_ytdlp.py"),
+        "YTDLPLIST_FFMPEG": os.path.join(HERE, "fake_ffmpeg.py"),
+        "FAKE_YTDLP_STATE": home,
+    }
+    env.update({f"FAKE_{k.upper()}": str(v) for k, v in fake.items()})
+    return env
+
+
+def run_child(scenario: str, params: dict[str, Any], **fake: Any) -> dict[str, Any]:
+    """
+    Run one measurement in a fresh interpreter with the fake executables.
+
+    Parameters
+    ----------
+    scenario : str
+        Name of the child scenario.
+    params : dict[str, Any]
+        Scenario parameters.
+    **fake : Any
+        Settings for the stand-ins, such as ``ytdlp_entries=100``.
+
+    Returns
+    -------
+    dict[str, Any]
+        Measurements reported by the child.
+    """
+    with tempfile.TemporaryDirectory() as home:
+        result_path: str = os.path.join(home, "result.json")
+        subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--child",
+                scenario,
+                json.dumps(params),
+                result_path,
+            ],
+            env=fake_env(home, **fake),
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        with open(result_path, "r") as fp:
+            return json.load(fp)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+async def child_metadata(params: dict[str, Any]) -> dict[str, Any]:
+    from ytdlplist.metadata import fetch_playlist_metadata, parse_flat_playlist
+    from ytdlplist.playlist_util import Playlist
+
+    url: str = "https://www.youtube.com/playlist?list=PLbenchmeta"
+    started_at: float = time.perf_counter()
+    snapshot = await fetch_playlist_metadata(url)
+    fetch_s: float = time.perf_counter() - started_at
+    lines: list[str] = subprocess.run(
+        [os.environ["YTDLPLIST_YTDLP"], "-j", "--flat-playlist", url],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.splitlines()
+    started_at = time.perf_counter()
+    parse_flat_playlist(lines)
+    parse_s: float = time.perf_counter() - started_at
+    # Each playlist twice, in the forms playlists.json entries take.
+    forms: list[str] = [
+        "https://www.youtube.com/playlist?list={}",
+        "https://music.youtube.com/playlist?list={}&si=share",
+        "{}",
+    ]
+    inputs: list[str] = [
+        forms[i % len(forms)].format(f"PLbench{i // 2:012d}")
+        for i in range(params["playlists"])
+    ]
+    started_at = time.perf_counter()
+    Playlist.validate_playlists(inputs)
+    return {
+        "entries": len(snapshot),
+        "metadata_fetch_s": fetch_s,
+        "metadata_parse_s": parse_s,
+        "metadata_rss_mb": peak_rss_mb(),
+        "playlist_validate_s": time.perf_counter() - started_at,
+    }
+
+
+async def child_run(params: dict[str, Any]) -> dict[str, Any]:
+    from ytdlplist.ytdlplist import dlplist_main
+
+    playlists: list[str] = [
+        f"https://www.youtube.com/playlist?list=PLbench{i:04d}"
+        for i in range(params["playlists"])
+    ]
+    started_at: float = time.perf_counter()
+    await dlplist_main(
+        playlists,
+        concurrency=params["concurrency"],
+        interval=0,
+        cache_ttl=None,
+        resume=False,
+        show_banner=False,
+        metrics_file=os.path.join(os.environ["HOME"], "metrics.jsonl"),
+    )
+    seconds: float = time.perf_counter() - started_at
+    with open(os.path.join(os.environ["HOME"], "metrics.jsonl"), "r") as fp:
+        run: dict[str, Any] = [json.loads(line) for line in fp][-1]
+    return {
+        "seconds": seconds,
+        "tracks": run["success"] + run["error"],
+        "success": run["success"],
+        "throughput_tracks_per_s": (run["success"] + run["error"]) / seconds,
+        "throughput_rss_mb": peak_rss_mb(),
+    }
+
+
+CHILDREN = {"metadata": child_metadata, "run": child_run}
+
+
+def compare(results: dict[str, float], tolerance: float) -> list[str]:
+    """
+    Print results next to the baseline and list the regressions.
+
+    Parameters
+    ----------
+    results : dict[str, float]
+        Measured metrics.
+    tolerance : float
+        Allowed relative change in the bad direction.
+
+    Returns
+    -------
+    list[str]
+        Names of the metrics that regressed.
+    """
+    try:
+        with open(BASELINE, "r") as fp:
+            baseline: dict[str, float] = json.load(fp)
+    except FileNotFoundError:
+        baseline = {}
+    regressions: list[str] = []
+    print(f"{'metric':<34} {'value':>10} {'baseline':>10} {'change':>8}")
+    for name, value in results.items():
+        base: float | None = baseline.get(name)
+        if not base:
+            print(f"{name:<34} {value:>10.3f} {'-':>10} {'':>8}")
+            continue
+        change: float = value / base - 1
+        higher: bool = HIGHER_IS_BETTER.get(name, name.startswith("scaling_"))
+        worse: bool = change < -tolerance if higher else change > tolerance
+        flag: str = "  REGRESSION" if worse else ""
+        print(f"{name:<34} {value:>10.3f} {base:>10.3f} {change:>+8.1%}{flag}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        scenario, params, result_path = (
+            sys.argv[2],
+            json.loads(sys.argv[3]),
+            sys.argv[4],
+        )
+        result: dict[str, Any] = asyncio.run(CHILDREN[scenario](params))
+        with open(result_path, "w") as fp:
+            json.dump(result, fp)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=20_000)
+    parser.add_argument("--playlists", type=int, default=2)
+    parser.add_argument("--tracks", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scaling", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--bandwidth", type=float, default=20e6)
+    parser.add_argument("--dead-rate", type=float, default=0.02)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    download: dict[str, Any] = {
+        "ytdlp_entries": args.tracks,
+        "ytdlp_latency": args.latency,
+        "ytdlp_bandwidth": args.bandwidth,
+        "ytdlp_dead_rate": args.dead_rate,
+        "ffmpeg_cpu": 0.02,
+    }
+    results: dict[str, float] = {}
+    metadata: dict[str, Any] = run_child(
+        "metadata", {"playlists": args.entries}, ytdlp_entries=args.entries
+    )
+    for name in (
+        "metadata_parse_s",
+        "metadata_fetch_s",
+        "metadata_rss_mb",
+        "playlist_validate_s",
+    ):
+        results[name] = metadata[name]
+    run: dict[str, Any] = run_child(
+        "run",
+        {"playlists": args.playlists, "concurrency": args.concurrency},
+        **download,
+    )
+    results["throughput_tracks_per_s"] = run["throughput_tracks_per_s"]
+    results["throughput_rss_mb"] = run["throughput_rss_mb"]
+    for concurrency in args.scaling:
+        scaled: dict[str, Any] = run_child(
+            "run", {"playlists": 1, "concurrency": concurrency}, **download
+        )
+        results[f"scaling_c{concurrency}_tracks_per_s"] = scaled[
+            "throughput_tracks_per_s"
+        ]
+
+    if args.save_baseline:
+        with open(BASELINE, "w") as fp:
+            json.dump({k: round(v, 4) for k, v in results.items()}, fp, indent=2)
+            fp.write("\n")
+        print(f"Saved baseline to {BASELINE}")
+    regressions: list[str] = compare(results, args.tolerance)
+    if regressions and not args.save_baseline:
+        print("FAIL:", ", ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
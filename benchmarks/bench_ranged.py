@@ -0,0 +1,79 @@
+"""
+Compare single-connection and range-parallel fetching of one long stream.
+
+The stream is served by range_server.py on localhost with a per-connection
+rate cap, so the numbers show how much parallel ranges recover from the cap.
+Every download is checked byte for byte against the served stream.
+
+    poetry run python benchmarks/bench_ranged.py --size 50000000 --rate 5000000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import zlib
+
+from range_server import content, serve
+
+from ytdlplist.backends import get_backend
+from ytdlplist.ranged import RangedFetcher
+
+
+async def bench_fetch(url: str, connections: int, chunk: int, path: str) -> float:
+    backend = get_backend("cli", workers=1)
+    fetcher = RangedFetcher(backend, connections, chunk_size=chunk, streams=1)
+    try:
+        start: float = time.perf_counter()
+        await fetcher.fetch(url, path, {})
+        return time.perf_counter() - start
+    finally:
+        fetcher.close()
+        backend.close()
+
+
+def crc_of_file(path: str) -> int:
+    crc: int = 0
+    with open(path, "rb") as fp:
+        while data := fp.read(2**20):
+            crc = zlib.crc32(data, crc)
+    return crc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=50_000_000)
+    parser.add_argument("--rate", type=float, default=5e6)
+    parser.add_argument("--chunk", type=int, default=2**22)
+    parser.add_argument("--connections", type=int, action="append")
+    args = parser.parse_args()
+
+    server = serve(args.size, args.rate)
+    url: str = f"http://127.0.0.1:{server.server_address[1]}/stream"
+    expected: int = 0
+    for offset in range(0, args.size, 2**20):
+        expected = zlib.crc32(
+            content(offset, min(offset + 2**20, args.size) - 1), expected
+        )
+    print(f"{'connections':>11} {'seconds':>8} {'MB/s':>8}  verified")
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            for connections in args.connections or [1, 2, 4, 8]:
+                path: str = os.path.join(output_dir, f"stream.{connections}")
+                seconds: float = asyncio.run(
+                    bench_fetch(url, connections, args.chunk, path)
+                )
+                ok: bool = (
+                    os.path.getsize(path) == args.size and crc_of_file(path) == expected
+                )
+                print(
+                    f"{connections:>11} {seconds:>8.2f} "
+                    f"{args.size / seconds / 1e6:>8.1f}  {'yes' if ok else 'NO'}"
+                )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Guard the startup time of ytdlplist.
+
+Measures the import time of ``ytdlplist.ytdlplist`` with ``-X importtime``
+and checks that optional, slow modules are not imported eagerly. Then times a
+whole run with nothing to download: every track of a freshly cached playlist
+is already in its download archive, so no yt-dlp process is spawned. Exits
+with status 1 if either number is over budget.
+
+    poetry run python benchmarks/bench_startup.py --import-budget 150 --run-budget 1
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from ytdlplist.archive import ARCHIVE_FILENAME
+from ytdlplist.cache import MetadataCache
+from ytdlplist.models import PlaylistSnapshot, TrackEntry
+
+LAZY_MODULES: tuple[str, ...] = (
+    "yt_dlp",
+    "pyaudio",
+    "wave",
+    "multiprocessing",
+    "concurrent.futures.process",
+)
+
+PLAYLIST_ID = "PLbenchmarkstartup"
+PLAYLIST_TITLE = "Startup Benchmark"
+
+RUN_SCRIPT = """
+import asyncio
+from ytdlplist.ytdlplist import dlplist_main
+asyncio.run(dlplist_main([{url!r}], show_banner=False))
+"""
+
+
+def import_time() -> tuple[float, set[str]]:
+    """
+    Import ytdlplist in a fresh interpreter.
+
+    Returns
+    -------
+    tuple[float, set[str]]
+        Cumulative import time in milliseconds, and every module imported.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import ytdlplist.ytdlplist"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us: int = 0
+    modules: set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.add(name.strip())
+        if name.strip() == "ytdlplist.ytdlplist":
+            total_us = int(cumulative)
+    return total_us / 1000, modules
+
+
+def noop_run(tracks: int) -> float:
+    """
+    Time a run whose only playlist is cached and fully downloaded.
+
+    Parameters
+    ----------
+    tracks : int
+        Number of tracks in the playlist.
+
+    Returns
+    -------
+    float
+        Wall time of the run in seconds, interpreter startup included.
+    """
+    with tempfile.TemporaryDirectory() as home:
+        cache_home: str = os.path.join(home, ".cache")
+        cache = MetadataCache(
+            path=os.path.join(cache_home, "ytdlplist", "metadata.json")
+        )
+        entries: list[TrackEntry] = [
+            TrackEntry(f"bench{i:06d}", f"Track {i}") for i in range(tracks)
+        ]
+        cache.put(PLAYLIST_ID, PlaylistSnapshot(PLAYLIST_ID, PLAYLIST_TITLE, entries))
+        cache.save()
+        output_dir: str = os.path.join(
+            home, "Music", "yt-dlp", "Playlists", PLAYLIST_TITLE.replace(" ", "_")
+        )
+        os.makedirs(output_dir)
+        with open(os.path.join(output_dir, ARCHIVE_FILENAME), "w") as fp:
+            fp.writelines(f"youtube {e.id}\n" for e in entries)
+
+        env: dict[str, str] = {**os.environ, "HOME": home, "XDG_CACHE_HOME": cache_home}
+        url: str = f"https://www.youtube.com/playlist?list={PLAYLIST_ID}"
+        start: float = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", RUN_SCRIPT.format(url=url)],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--import-budget", type=float, default=150.0, help="ms")
+    parser.add_argument("--run-budget", type=float, default=1.0, help="seconds")
+    parser.add_argument("--tracks", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    failures: list[str] = []
+    samples: list[tuple[float, set[str]]] = [import_time() for _ in range(args.repeat)]
+    import_ms: float = min(ms for ms, _ in samples)
+    eager: list[str] = sorted(
+        name for name in LAZY_MODULES if any(name in modules for _, modules in samples)
+    )
+    print(
+        f"import ytdlplist.ytdlplist: {import_ms:.1f} ms (budget {args.import_budget:.0f} ms)"
+    )
+    if import_ms > args.import_budget:
+        failures.append("import time over budget")
+    if eager:
+        print(f"imported eagerly: {', '.join(eager)}")
+        failures.append("optional modules imported at startup")
+
+    run_s: float = min(noop_run(args.tracks) for _ in range(args.repeat))
+    print(
+        f"no-op run, {args.tracks} archived tracks: {run_s:.3f} s (budget {args.run_budget:.1f} s)"
+    )
+    if run_s > args.run_budget:
+        failures.append("no-op run over budget")
+
+    if failures:
+        print("FAIL:", "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the ffmpeg executable, for benchmarks and offline runs.
+
+Point ytdlplist at it with ``YTDLPLIST_FFMPEG=benchmarks/fake_ffmpeg.py``.
+It burns ``FAKE_FFMPEG_CPU`` seconds of CPU time (default 0.1) and copies
+the input file to the output path given last on the command line.
+"""
+
+import os
+import shutil
+import sys
+import time
+
+
+def main() -> int:
+    args: list[str] = sys.argv[1:]
+    source: str = args[args.index("-i") + 1]
+    deadline: float = time.process_time() + float(
+        os.environ.get("FAKE_FFMPEG_CPU", 0.1)
+    )
+    while time.process_time() < deadline:
+        pass
+    shutil.copyfile(source, args[-1])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
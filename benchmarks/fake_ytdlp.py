@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the yt-dlp executable, for benchmarks and offline runs.
+
+Point ytdlplist at it with ``YTDLPLIST_YTDLP=benchmarks/fake_ytdlp.py``. It
+understands the handful of yt-dlp invocations ytdlplist makes and is tuned
+through environment variables:
+
+    FAKE_YTDLP_ENTRIES      tracks per playlist (default 100)
+    FAKE_YTDLP_LATENCY      seconds before a download starts (default 0.05)
+    FAKE_YTDLP_BANDWIDTH    bytes per second per download (default 20e6)
+    FAKE_YTDLP_SIZE         bytes per downloaded track (default 262144)
+    FAKE_YTDLP_FAIL_RATE    share of tracks whose first attempt fails with a
+                            transient HTTP 503 (default 0)
+    FAKE_YTDLP_DEAD_RATE    share of tracks that are unavailable (default 0)
+    FAKE_YTDLP_SHARED       share of playlist positions that hold the same
+                            video in every playlist (default 0)
+    FAKE_YTDLP_LINK         bytes per second shared by all running downloads
+                            (default: unlimited)
+    FAKE_YTDLP_MAX_RUNNING  downloads that may run at once before further
+                            ones fail with HTTP 429 (default: unlimited)
+    FAKE_YTDLP_MEDIA_URL    base URL of a server holding the tracks' audio
+                            streams, such as benchmarks/range_server.py;
+                            without it, streams resolve to DASH fragments
+    FAKE_YTDLP_STATE        directory used to remember failed first attempts,
+                            and to count running downloads
+
+Which tracks fail is derived from their IDs, so runs are reproducible.
+"""
+
+import json
+import os
+import sys
+import time
+import zlib
+
+
+def env(name: str, default: float) -> float:
+    return float(os.environ.get(f"FAKE_YTDLP_{name}", default))
+
+
+def share(video_id: str, salt: str) -> float:
+    return zlib.crc32(f"{salt}:{video_id}".encode()) % 10_000 / 10_000
+
+
+def option(args: list[str], name: str) -> str | None:
+    return args[args.index(name) + 1] if name in args else None
+
+
+def playlist_id(url: str) -> str:
+    return url.split("list=")[-1].split("&")[0]
+
+
+def flat_playlist(url: str, items: str | None) -> None:
+    pid: str = playlist_id(url)
+    entries: int = int(env("ENTRIES", 100))
+    start, stop = 1, entries
+    if items:
+        first, _, last = items.partition(":")
+        start, stop = int(first or 1), min(entries, int(last or entries))
+    out = sys.stdout
+    for i in range(start, stop + 1):
+        video_id: str = f"{pid[-6:]}{i:05d}"
+        if share(str(i), "shared") < env("SHARED", 0):
+            video_id = f"shared{i:05d}"
+        out.write(
+            json.dumps(
+                {
+                    "_type": "url",
+                    "ie_key": "Youtube",
+                    "id": video_id,
+                    "url": f"https://www.youtube.com/watch?v={video_id}",
+                    "title": f"Benchmark track {i}",
+                    "duration": 180 + i % 120,
+                    "channel": "Benchmark",
+                    "thumbnails": [
+                        {"url": f"https://i.ytimg.com/vi/{video_id}/hq.jpg"}
+                    ],
+                    "playlist_id": pid,
+                    "playlist_title": f"Benchmark {pid}",
+                    "playlist_index": i,
+                }
+            )
+            + "\n"
+        )
+    out.flush()
+
+
+def download(url: str, args: list[str]) -> int:
+    video_id: str = url.split("v=")[-1]
+    if share(video_id, "dead") < env("DEAD_RATE", 0):
+        sys.stderr.write(f"ERROR: [youtube] {video_id}: Video unavailable\n")
+        return 1
+    state: str | None = os.environ.get("FAKE_YTDLP_STATE")
+    if state and share(video_id, "fail") < env("FAIL_RATE", 0):
+        marker: str = os.path.join(state, video_id)
+        if not os.path.exists(marker):
+            open(marker, "w").close()
+            time.sleep(env("LATENCY", 0.05))
+            sys.stderr.write(
+                "ERROR: unable to download video data: HTTP Error 503: Service Unavailable\n"
+            )
+            return 1
+    size: int = int(env("SIZE", 262_144))
+    bandwidth: float = env("BANDWIDTH", 20e6)
+    running: str | None = None
+    if state:
+        running = os.path.join(state, f"running.{os.getpid()}")
+        open(running, "w").close()
+    try:
+        count: int = (
+            sum(name.startswith("running.") for name in os.listdir(state))
+            if state
+            else 1
+        )
+        if count > env("MAX_RUNNING", 1e9):
+            time.sleep(env("LATENCY", 0.05))
+            sys.stderr.write("ERROR: HTTP Error 429: Too Many Requests\n")
+            return 1
+        bandwidth = min(bandwidth, env("LINK", 1e18) / count)
+        time.sleep(env("LATENCY", 0.05))
+        template: str | None = option(args, "--progress-template")
+        if template is None:
+            time.sleep(size / bandwidth)
+        else:
+            template = template.partition(":")[2]
+            for step in range(1, 11):
+                time.sleep(size / bandwidth / 10)
+                done: int = size * step // 10
+                fields: dict[str, object] = {
+                    "downloaded_bytes": done,
+                    "total_bytes": size,
+                    "total_bytes_estimate": "NA",
+                    "speed": bandwidth,
+                    "eta": (size - done) / bandwidth,
+                }
+                line: str = template
+                for name, value in fields.items():
+                    line = line.replace(f"%(progress.{name})s", str(value))
+                # yt-dlp prints progress to stderr when --quiet is given.
+                sys.stderr.write(line + "\n")
+                sys.stderr.flush()
+    finally:
+        if running:
+            os.remove(running)
+    ext: str = "webm"
+    if "--extract-audio" in args:
+        ext = option(args, "--audio-format") or "mp3"
+    template: str = option(args, "--output") or "%(title)s.%(ext)s"
+    path: str = template.replace("%(title)s", f"Track {video_id}").replace(
+        "%(ext)s", ext
+    )
+    if "--simulate" not in args:
+        with open(path, "wb") as fp:
+            fp.write(os.urandom(min(size, 4096)) * (size // 4096 or 1))
+    if option(args, "--print") == "after_move:filepath":
+        print(path)
+    return 0
+
+
+def resolve(url: str) -> None:
+    video_id: str = url.split("v=")[-1]
+    media: str | None = os.environ.get("FAKE_YTDLP_MEDIA_URL")
+    time.sleep(env("LATENCY", 0.05))
+    print(
+        json.dumps(
+            {
+                "url": f"{media.rstrip('/')}/{video_id}" if media else None,
+                "ext": "webm",
+                "title": f"Track {video_id}",
+                "protocol": "http" if media else "http_dash_segments",
+                "http_headers": {"User-Agent": "fake-ytdlp"},
+                "filesize": None,
+            }
+        )
+    )
+
+
+def main() -> int:
+    args: list[str] = sys.argv[1:]
+    url: str = next(a for a in args if a.startswith("http"))
+    if "--flat-playlist" in args:
+        flat_playlist(url, option(args, "-I"))
+        return 0
+    if option(args, "--print") == "playlist_title":
+        print(f"Benchmark {playlist_id(url)}")
+        return 0
+    if (option(args, "--print") or "").startswith("%(.{"):
+        resolve(url)
+        return 0
+    return download(url, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Local HTTP server that stands in for YouTube's media servers.
+
+Every path serves the same deterministic stream of ``--size`` bytes, answers
+range requests with 206 Partial Content, keeps connections alive and caps
+the throughput of each connection, as YouTube does. Point fake_ytdlp.py at
+it with ``FAKE_YTDLP_MEDIA_URL=http://127.0.0.1:<port>``.
+
+    python benchmarks/range_server.py --size 50000000 --rate 5000000
+"""
+
+import argparse
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Odd length, so that ranges at round offsets do not all hold the same bytes.
+PATTERN: bytes = bytes(i * 7 % 251 for i in range(1_000_003))
+
+_RANGE = re.compile(r"bytes=(\d+)-(\d*)$")
+
+
+def content(start: int, end: int) -> bytes:
+    """
+    Get bytes ``start`` to ``end`` inclusive of the served stream.
+    """
+    out = bytearray()
+    offset: int = start
+    while offset <= end:
+        i: int = offset % len(PATTERN)
+        piece: bytes = PATTERN[i : i + end - offset + 1]
+        out += piece
+        offset += len(piece)
+    return bytes(out)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    size: int = 0
+    rate: float = 0.0
+
+    def do_GET(self) -> None:
+        start, end = 0, self.size - 1
+        header: str | None = self.headers.get("Range")
+        status: int = 200
+        if header:
+            match = _RANGE.match(header)
+            if match is None or int(match.group(1)) >= self.size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{self.size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            start = int(match.group(1))
+            end = min(int(match.group(2) or end), end)
+            status = 206
+        self.send_response(status)
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{self.size}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Content-Type", "audio/webm")
+        self.end_headers()
+        began: float = time.monotonic()
+        sent: int = 0
+        for offset in range(start, end + 1, 256 * 1024):
+            data: bytes = content(offset, min(offset + 256 * 1024 - 1, end))
+            self.wfile.write(data)
+            sent += len(data)
+            if self.rate:
+                # Paces the connection to ``rate`` bytes per second.
+                delay: float = began + sent / self.rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def serve(size: int, rate: float = 0.0, port: int = 0) -> ThreadingHTTPServer:
+    """
+    Start the server on a background thread.
+
+    Parameters
+    ----------
+    size : int
+        Bytes in the served stream.
+    rate : float, optional
+        Bytes per second per connection, by default unlimited
+    port : int, optional
+        Port to listen on, by default any free port
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        The running server; ``server_address`` holds its port. Stop it with
+        ``shutdown()``.
+    """
+    handler = type("Handler", (RangeHandler,), {"size": size, "rate": rate})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=50_000_000)
+    parser.add_argument("--rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = serve(args.size, args.rate, args.port)
+    print(f"Serving {args.size} bytes on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import asyncio
+
+from ytdlplist.cache import MetadataCache, fetch_incremental
+from ytdlplist.models import PlaylistSnapshot, TrackEntry
+
+
+class FakeBackend:
+    def __init__(self, ids: list[str]) -> None:
+        self.ids: list[str] = ids
+        self.calls: list[str | None] = []
+
+    async def fetch_playlist(
+        self, url: str, items: str | None = None
+    ) -> PlaylistSnapshot:
+        self.calls.append(items)
+        ids: list[str] = self.ids
+        if items is not None:
+            start, end = (int(i) for i in items.split(":"))
+            ids = ids[start - 1 : end]
+        return PlaylistSnapshot("PL", "Playlist", [TrackEntry(i) for i in ids])
+
+
+def test_incremental_refresh_keeps_cached_tail_until_full_fetch() -> None:
+    backend = FakeBackend(["new", "a", "c"])
+    cached = PlaylistSnapshot("PL", "Playlist", [TrackEntry(i) for i in "abc"])
+
+    async def refresh(snapshot: PlaylistSnapshot) -> PlaylistSnapshot:
+        return await fetch_incremental(
+            backend, "url", snapshot, head_size=2, full_every=3
+        )
+
+    first: PlaylistSnapshot = asyncio.run(refresh(cached))
+    # "b" was removed from the tail, which is not fetched again.
+    assert [e.id for e in first.entries] == ["new", "a", "b", "c"]
+    assert first.refreshes == 1
+    assert backend.calls == ["1:2"]
+
+    second: PlaylistSnapshot = asyncio.run(refresh(first))
+    assert second.refreshes == 2
+    third: PlaylistSnapshot = asyncio.run(refresh(second))
+    assert [e.id for e in third.entries] == ["new", "a", "c"]
+    assert third.refreshes == 0
+    assert backend.calls[-1] is None
+
+
+def test_cache_keeps_refresh_count(tmp_path) -> None:
+    path = str(tmp_path / "metadata.json")
+    cache = MetadataCache(path)
+    cache.put("PL", PlaylistSnapshot("PL", "Playlist", [TrackEntry("a")], 5))
+    cache.save()
+    snapshot: PlaylistSnapshot | None = MetadataCache(path).get("PL")
+    assert snapshot is not None and snapshot.refreshes == 5
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from ytdlplist.fairqueue import FairQueue, PlaylistPolicy
+
+
+def drain(queue: FairQueue[str]) -> list[str]:
+    async def run() -> list[str]:
+        items: list[str] = []
+        while not queue.empty():
+            items.append(await queue.get())
+            queue.task_done()
+        await queue.join()
+        return items
+
+    return asyncio.run(run())
+
+
+def test_weights_share_downloads() -> None:
+    queue: FairQueue[str] = FairQueue(
+        lambda item: item[0],
+        {"a": PlaylistPolicy(weight=2), "c": PlaylistPolicy(weight=0.5)},
+    )
+    for i in range(6):
+        queue.put_nowait(f"a{i}")
+        queue.put_nowait(f"b{i}")
+    queue.put_nowait("c0")
+    assert drain(queue) == [
+        "a0", "a1", "b0",
+        "a2", "a3", "b1", "c0",
+        "a4", "a5", "b2",
+        "b3", "b4", "b5",
+    ]  # fmt: skip
+
+
+def test_small_flow_is_served_within_one_round() -> None:
+    queue: FairQueue[str] = FairQueue(lambda item: item[0])
+    for i in range(100):
+        queue.put_nowait(f"a{i}")
+    queue.put_nowait("b0")
+    assert drain(queue)[:3] == ["a0", "b0", "a1"]
+
+
+def test_higher_priority_flows_come_first() -> None:
+    queue: FairQueue[str] = FairQueue(
+        lambda item: item[0], {"b": PlaylistPolicy(priority=1)}
+    )
+    queue.put_nowait("a0")
+    queue.put_nowait("b0")
+    queue.put_nowait("b1")
+    assert drain(queue) == ["b0", "b1", "a0"]
+
+
+def test_policy_rejects_invalid_values() -> None:
+    with pytest.raises(ValueError):
+        PlaylistPolicy(weight=0)
+    with pytest.raises(ValueError):
+        PlaylistPolicy.from_entry({"url": "PL", "max_tracks": -1})
+    assert PlaylistPolicy.from_entry("PL").weight == 1.0
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from ytdlplist.journal import DONE, FAILED, QUEUED, RUNNING, RunJournal
+from ytdlplist.retry import PERMANENT
+
+
+def test_resume_compacts_and_lists_unfinished_tracks(tmp_path) -> None:
+    path = str(tmp_path / "journal.jsonl")
+    journal = RunJournal(path)
+    journal.open()
+    for video_id in ("a", "b", "c", "d"):
+        journal.record("out", video_id, QUEUED, title=video_id.upper())
+    journal.record("out", "a", RUNNING)
+    journal.record("out", "a", DONE)
+    journal.record("out", "b", RUNNING)
+    journal.record("out", "c", FAILED, error_class=PERMANENT)
+    journal.close()
+    with open(path, "a") as fp:
+        fp.write('{"dir":"out","id":"d","sta')
+
+    resumed = RunJournal(path)
+    resumed.open()
+    assert resumed.is_done("out", "a")
+    assert resumed.get("out", "b") == {"title": "B", "state": RUNNING}
+    assert sorted(video_id for _, video_id, _ in resumed.pending()) == ["b", "d"]
+    assert resumed.counts() == {QUEUED: 1, RUNNING: 1, DONE: 1, FAILED: 1}
+    with open(path) as fp:
+        lines = [json.loads(line) for line in fp]
+    assert [line["id"] for line in lines] == ["a", "b", "c", "d"]
+
+    resumed.close(finished=True)
+    assert not (tmp_path / "journal.jsonl").exists()
+
+
+def test_open_without_resume_discards_the_journal(tmp_path) -> None:
+    path = str(tmp_path / "journal.jsonl")
+    journal = RunJournal(path)
+    journal.open()
+    journal.record("out", "a", QUEUED)
+    journal.close()
+
+    fresh = RunJournal(path)
+    fresh.open(resume=False)
+    assert not len(fresh)
+    assert not fresh.pending()
+    fresh.close()
+
+
+def read_ids(path: str) -> list[str]:
+    with open(path) as fp:
+        return [json.loads(line)["id"] for line in fp]
+
+
+def test_sync_and_close_write_pending_records(tmp_path) -> None:
+    path = str(tmp_path / "journal.jsonl")
+    journal = RunJournal(path, batch_size=16, max_delay=60.0)
+    journal.open()
+    journal.record("out", "a", QUEUED)
+    journal.sync()
+    assert read_ids(path) == ["a"]
+    journal.record("out", "b", QUEUED)
+    journal.close()
+    assert read_ids(path) == ["a", "b"]
+
+
+def test_idle_records_are_synced_after_max_delay(tmp_path) -> None:
+    path = str(tmp_path / "journal.jsonl")
+    journal = RunJournal(path, batch_size=16, max_delay=0.05)
+
+    async def run() -> list[str]:
+        journal.open()
+        journal.record("out", "a", QUEUED)
+        await asyncio.sleep(0.2)
+        # Read while the journal is still open, before close flushes it.
+        return read_ids(path)
+
+    assert asyncio.run(run()) == ["a"]
+    journal.close()
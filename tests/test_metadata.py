@@ -0,0 +1,31 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from ytdlplist.metadata import fetch_playlist_metadata
+
+# Floods stderr past what asyncio buffers for the pipe, about 2 MiB here,
+# before printing any entry.
+NOISY_YTDLP = """#!{python}
+import json, sys
+for i in range(150000):
+    sys.stderr.write(f"WARNING: noisy line {{i}}\\n")
+print(json.dumps({{"id": "aaaaaaaaaaa", "title": "A", "playlist_title": "P"}}))
+sys.stderr.write("ERROR: the end\\n")
+sys.exit(1)
+"""
+
+
+def test_noisy_stderr_does_not_stall_the_listing(tmp_path, monkeypatch) -> None:
+    script = tmp_path / "yt-dlp"
+    script.write_text(NOISY_YTDLP.format(python=sys.executable))
+    script.chmod(0o755)
+    monkeypatch.setenv("YTDLPLIST_YTDLP", str(script))
+
+    with pytest.raises(subprocess.CalledProcessError) as info:
+        asyncio.run(asyncio.wait_for(fetch_playlist_metadata("url"), 20))
+    lines: list[str] = info.value.stderr.splitlines()
+    assert len(lines) == 50
+    assert lines[-1] == "ERROR: the end"
@@ -0,0 +1,46 @@
+from ytdlplist.archive import DownloadArchive
+from ytdlplist.models import PlaylistSnapshot, TrackEntry
+from ytdlplist.planner import DirectoryIndex, PlaylistPlan, diff_directory
+
+
+def touch(path) -> None:
+    path.write_text("audio")
+
+
+def test_has_track_finds_yt_dlp_names(tmp_path) -> None:
+    touch(tmp_path / "AC⧸DC： Live？.mp3")
+    index = DirectoryIndex()
+    assert index.has_track(str(tmp_path), "aaaaaaaaaaa", "AC/DC: Live?", "mp3")
+    assert not index.has_track(str(tmp_path), "aaaaaaaaaaa", "AC/DC: Live?", "m4a")
+
+
+def test_diff_directory_reports_against_disk_not_cache(tmp_path) -> None:
+    output_dir = str(tmp_path)
+    touch(tmp_path / "Old Name.mp3")
+    touch(tmp_path / "Linked Old [bbbbbbbbbbb].mp3")
+    touch(tmp_path / "Kept.mp3")
+    archive = DownloadArchive(str(tmp_path / "archive.txt"))
+    for video_id in ("aaaaaaaaaaa", "ccccccccccc", "ddddddddddd"):
+        archive.add(video_id)
+    entries = [
+        TrackEntry("aaaaaaaaaaa", "New Name"),
+        TrackEntry("bbbbbbbbbbb", "Linked New"),
+        TrackEntry("ccccccccccc", "Kept"),
+    ]
+    # The cache snapshot holds the current listing apart from the old title,
+    # so dropped tracks are only known from the archive.
+    previous = PlaylistSnapshot(
+        entries=[
+            TrackEntry("aaaaaaaaaaa", "Old Name"),
+            TrackEntry("bbbbbbbbbbb", "Linked New"),
+            TrackEntry("ccccccccccc", "Kept"),
+        ]
+    )
+    plan = PlaylistPlan(None, output_dir)  # type: ignore[arg-type]
+    diff_directory(plan, entries, previous, archive, DirectoryIndex(), "mp3")
+
+    assert [entry.id for entry in plan.removed] == ["ddddddddddd"]
+    assert [(entry.id, old) for entry, old in plan.renamed] == [
+        ("aaaaaaaaaaa", "Old Name"),
+        ("bbbbbbbbbbb", "Linked Old"),
+    ]
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from ytdlplist.backends import CliBackend
+from ytdlplist.journal import DONE, QUEUED, RUNNING
+from ytdlplist.retry import RetryPolicy
+from ytdlplist.scheduler import DownloadJob, DownloadScheduler
+from ytdlplist.store import TrackStore
+from ytdlplist.workqueue import SqliteWorkQueue
+
+
+async def quiet(*args, **kwargs) -> None:
+    pass
+
+
+def test_retried_leader_settles_shared_track_waiters(tmp_path) -> None:
+    store = TrackStore(str(tmp_path / "store"), link_mode="copy")
+    calls: list[str] = []
+
+    async def downloader(video_id, output_dir, output_ext, **kwargs) -> int:
+        calls.append(video_id)
+        if len(calls) == 1:
+            raise subprocess.CalledProcessError(
+                1, ["yt-dlp"], stderr="ERROR: HTTP Error 503: Service Unavailable"
+            )
+        with open(os.path.join(output_dir, f"{video_id}.{output_ext}"), "w") as fp:
+            fp.write("audio")
+        return 0
+
+    async def run() -> DownloadScheduler:
+        scheduler = DownloadScheduler(
+            downloader,
+            quiet,
+            concurrency=2,
+            interval=0,
+            retry=RetryPolicy(retries=2, transient_delay=0.01),
+            store=store,
+        )
+        scheduler.start()
+        for playlist in ("A", "B"):
+            scheduler.submit(
+                DownloadJob("shared00001", "Shared", str(tmp_path / playlist))
+            )
+        await asyncio.wait_for(scheduler.join(), 10)
+        return scheduler
+
+    scheduler: DownloadScheduler = asyncio.run(run())
+    assert len(calls) == 2
+    assert scheduler.results["success"] == 2
+    assert scheduler.results["retried"] == 1
+    assert scheduler.pending == 0
+    for playlist in ("A", "B"):
+        assert (tmp_path / playlist / "Shared.mp3").read_text() == "audio"
+
+
+def test_failed_track_can_be_submitted_again(tmp_path) -> None:
+    calls: list[str] = []
+
+    async def downloader(video_id, output_dir, output_ext, **kwargs) -> int:
+        calls.append(video_id)
+        if len(calls) == 1:
+            raise subprocess.CalledProcessError(
+                1, ["yt-dlp"], stderr="ERROR: Video unavailable"
+            )
+        return 0
+
+    async def run() -> DownloadScheduler:
+        scheduler = DownloadScheduler(downloader, quiet, interval=0)
+        scheduler.start()
+        job = DownloadJob("flaky000001", "Flaky", str(tmp_path))
+        assert scheduler.submit(job)
+        assert not scheduler.submit(job)
+        await asyncio.wait_for(scheduler.join(), 10)
+        assert scheduler.failures == {(str(tmp_path), "flaky000001"): 1}
+        scheduler.start()
+        assert scheduler.submit(DownloadJob("flaky000001", "Flaky", str(tmp_path)))
+        await asyncio.wait_for(scheduler.join(), 10)
+        return scheduler
+
+    scheduler: DownloadScheduler = asyncio.run(run())
+    assert scheduler.results["error"] == 1
+    assert scheduler.results["success"] == 1
+    assert not scheduler.failures
+    assert not scheduler._seen
+
+
+def test_stop_kills_running_downloads(tmp_path) -> None:
+    pid_file = tmp_path / "pid"
+    script = (
+        "import os, sys, time; "
+        "open(sys.argv[1], 'w').write(str(os.getpid())); time.sleep(60)"
+    )
+
+    async def downloader(video_id, output_dir, output_ext, **kwargs) -> int:
+        await CliBackend()._run([sys.executable, "-c", script, str(pid_file)])
+        return 0
+
+    async def run() -> None:
+        scheduler = DownloadScheduler(downloader, quiet, interval=0)
+        scheduler.start()
+        scheduler.submit(DownloadJob("slow0000001", "Slow", str(tmp_path)))
+        while not pid_file.exists() or not pid_file.read_text():
+            await asyncio.sleep(0.05)
+        await asyncio.wait_for(scheduler.stop(), 10)
+
+    asyncio.run(run())
+    pid = int(pid_file.read_text())
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        pass
+    else:
+        raise AssertionError(f"download process {pid} is still running")
+
+
+class LockedOnceQueue(SqliteWorkQueue):
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.locked: set[str] = {"put", "settle"}
+
+    def put(self, tracks):
+        if "put" in self.locked:
+            self.locked.discard("put")
+            raise sqlite3.OperationalError("database is locked")
+        return super().put(tracks)
+
+    def settle(self, worker, updates):
+        if "settle" in self.locked:
+            self.locked.discard("settle")
+            raise sqlite3.OperationalError("database is locked")
+        super().settle(worker, updates)
+
+
+def test_flush_keeps_batches_that_could_not_be_written(tmp_path) -> None:
+    queue = LockedOnceQueue(str(tmp_path / "queue.db"))
+
+    async def run() -> None:
+        scheduler = DownloadScheduler(quiet, quiet, interval=0, work_queue=queue)
+        scheduler.submit(DownloadJob("first000001", "First", str(tmp_path)))
+        with pytest.raises(sqlite3.OperationalError):
+            await scheduler._flush(queue)
+        scheduler.submit(DownloadJob("second00001", "Second", str(tmp_path)))
+        await scheduler._flush(queue)
+        assert queue.counts()[QUEUED] == 2
+
+        for track in queue.claim(scheduler.worker_id, 2, 60.0):
+            job = DownloadJob.from_record(track["dir"], track["id"], track)
+            scheduler._claimed[job.key] = job
+            scheduler._hand_back(job, state=DONE)
+        with pytest.raises(sqlite3.OperationalError):
+            await scheduler._flush(queue)
+        assert queue.counts()[RUNNING] == 2
+        await scheduler._flush(queue)
+        assert queue.counts()[DONE] == 2
+
+    asyncio.run(run())
+    queue.close()
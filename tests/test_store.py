@@ -0,0 +1,21 @@
+from ytdlplist.models import TrackEntry
+from ytdlplist.store import write_m3u
+
+
+def test_write_m3u_lists_store_and_yt_dlp_names(tmp_path) -> None:
+    (tmp_path / "AC⧸DC： Live？.mp3").write_text("audio")
+    (tmp_path / "Linked [bbbbbbbbbbb].mp3").write_text("audio")
+    entries = [
+        TrackEntry("aaaaaaaaaaa", "AC/DC: Live?", 120),
+        TrackEntry("bbbbbbbbbbb", "Linked"),
+        TrackEntry("ccccccccccc", "Missing"),
+    ]
+    path: str = write_m3u(str(tmp_path), entries)
+    with open(path, encoding="utf-8") as fp:
+        assert fp.read().splitlines() == [
+            "#EXTM3U",
+            "#EXTINF:120,AC/DC: Live?",
+            "AC⧸DC： Live？.mp3",
+            "#EXTINF:-1,Linked",
+            "Linked [bbbbbbbbbbb].mp3",
+        ]
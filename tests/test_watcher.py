@@ -0,0 +1,51 @@
+import asyncio
+
+from ytdlplist.fairqueue import PlaylistPolicy
+from ytdlplist.models import PlaylistSnapshot, TrackEntry
+from ytdlplist.playlist_util import Playlist
+from ytdlplist.scheduler import DownloadScheduler
+from ytdlplist.watcher import PlaylistWatcher, WatchedPlaylist
+
+
+async def quiet(*args, **kwargs) -> None:
+    pass
+
+
+class FakeBackend:
+    def __init__(self, ids: list[str]) -> None:
+        self.ids: list[str] = ids
+
+    async def fetch_playlist(
+        self, url: str, items: str | None = None
+    ) -> PlaylistSnapshot:
+        return PlaylistSnapshot(
+            "PL", "Playlist", [TrackEntry(i, i.upper()) for i in self.ids]
+        )
+
+
+def test_poll_queues_tracks_left_out_by_the_limit_later(tmp_path) -> None:
+    backend = FakeBackend(["a", "b", "c", "d", "e"])
+
+    async def run() -> list[int]:
+        # The scheduler is not started, so queued tracks stay queued.
+        scheduler = DownloadScheduler(quiet, quiet, interval=0)  # type: ignore[arg-type]
+        watcher = PlaylistWatcher(
+            str(tmp_path / "playlists.json"),
+            scheduler,
+            backend,  # type: ignore[arg-type]
+            quiet,
+            str(tmp_path),
+            incremental=False,
+            use_archive=False,
+            title_lookup=False,
+        )
+        playlist = Playlist(
+            "PLxxxxxxxxxxxxxxxx",
+            quiet,
+            backend,  # type: ignore[arg-type]
+            policy=PlaylistPolicy(max_tracks=2),
+        )
+        watched = WatchedPlaylist(playlist, 60.0)
+        return [await watcher.poll(watched) for _ in range(4)]
+
+    assert asyncio.run(run()) == [2, 2, 1, 0]
@@ -0,0 +1,70 @@
+from ytdlplist.journal import DONE, FAILED, QUEUED, RUNNING
+from ytdlplist.retry import PERMANENT, TRANSIENT
+from ytdlplist.workqueue import SqliteWorkQueue
+
+
+def test_put_is_idempotent(tmp_path) -> None:
+    queue = SqliteWorkQueue(str(tmp_path / "queue.db"))
+    tracks = [{"dir": "out", "id": "a", "title": "A"}, {"dir": "out", "id": "b"}]
+    assert queue.put(tracks) == 2
+    assert queue.put(tracks) == 0
+    assert queue.remaining() == 2
+    queue.close()
+
+
+def test_put_queues_failed_tracks_again_unless_permanent(tmp_path) -> None:
+    queue = SqliteWorkQueue(str(tmp_path / "queue.db"))
+    queue.put([{"dir": "out", "id": i} for i in "abc"])
+    queue.claim("w1", 3, lease=60.0)
+    queue.settle(
+        "w1",
+        [
+            ("out", "a", {"state": FAILED, "attempts": 3, "error_class": TRANSIENT}),
+            ("out", "b", {"state": FAILED, "attempts": 1, "error_class": PERMANENT}),
+            ("out", "c", {"state": DONE, "attempts": 1}),
+        ],
+    )
+    assert queue.put([{"dir": "out", "id": i} for i in "abc"]) == 1
+    assert queue.counts() == {QUEUED: 1, RUNNING: 0, DONE: 1, FAILED: 1}
+    assert queue.claim("w2", 3, lease=60.0) == [
+        {"dir": "out", "id": "a", "attempts": 0}
+    ]
+    queue.close()
+
+
+def test_expired_lease_is_claimed_by_another_worker(tmp_path) -> None:
+    queue = SqliteWorkQueue(str(tmp_path / "queue.db"))
+    queue.put([{"dir": "out", "id": "a", "title": "A"}])
+    assert [t["id"] for t in queue.claim("w1", 4, lease=60.0)] == ["a"]
+    assert queue.claim("w2", 4, lease=60.0) == []
+
+    # w1 stops sending heartbeats and its lease runs out.
+    queue._db.execute("UPDATE tracks SET lease_until = 0")
+    claimed = queue.claim("w2", 4, lease=60.0)
+    assert claimed == [{"dir": "out", "id": "a", "attempts": 0, "title": "A"}]
+    assert queue.counts()[RUNNING] == 1
+    queue.close()
+
+
+def test_settle_from_stale_owner_only_records_done(tmp_path) -> None:
+    queue = SqliteWorkQueue(str(tmp_path / "queue.db"))
+    queue.put([{"dir": "out", "id": "a"}, {"dir": "out", "id": "b"}])
+    queue.claim("w1", 4, lease=0.0)
+    queue._db.execute("UPDATE tracks SET lease_until = 0")
+    assert len(queue.claim("w2", 4, lease=60.0)) == 2
+
+    queue.settle(
+        "w1",
+        [
+            ("out", "a", {"state": FAILED, "attempts": 1, "error": "late"}),
+            ("out", "b", {"state": QUEUED, "attempts": 1, "delay": 60.0}),
+        ],
+    )
+    assert queue.counts() == {QUEUED: 0, RUNNING: 2, DONE: 0, FAILED: 0}
+
+    queue.settle("w1", [("out", "a", {"state": DONE, "attempts": 1})])
+    queue.settle("w2", [("out", "a", {"state": FAILED, "attempts": 2})])
+    queue.settle("w2", [("out", "b", {"state": QUEUED, "attempts": 1})])
+    assert queue.counts() == {QUEUED: 1, RUNNING: 0, DONE: 1, FAILED: 0}
+    assert queue.remaining() == 1
+    queue.close()
@@ -0,0 +1,182 @@
+import asyncio
+import time
+from collections import deque
+
+from ytdlplist.constants import (
+    DEFAULT_ADAPTIVE_SLOWDOWN,
+    DEFAULT_ADAPTIVE_SMOOTHING,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_MIN_CONCURRENCY,
+)
+
+
+class ConcurrencyController:
+    """
+    AIMD limit on the number of downloads running at once.
+
+    The limit starts at ``minimum`` and grows by one for every successful
+    download until the first sign of congestion, then by about one for every
+    ``limit`` successful downloads. It is halved when a host rate-limits a
+    download, and cut by a quarter after a transient error or when the
+    smoothed download speed falls below half of the best speed seen lately,
+    which means the link or the host is saturated. Downloads that started
+    before the last cut do not cut it again, so that one burst of errors
+    counts once.
+
+    Download speed is measured in bytes per second when the size of the
+    download is known, and in downloads per second otherwise.
+
+    Attributes
+    ----------
+    minimum : int
+        Lowest limit.
+
+    maximum : int
+        Highest limit.
+
+    limit : float
+        Current limit. Its integer part is the number of downloads allowed
+        to run at once.
+
+    active : int
+        Number of downloads running.
+
+    speed : float | None
+        Smoothed download speed, or None before the first download.
+    """
+
+    def __init__(
+        self,
+        minimum: int = DEFAULT_MIN_CONCURRENCY,
+        maximum: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        if minimum < 1 or maximum < minimum:
+            raise ValueError("Concurrency limits must satisfy 1 <= minimum <= maximum.")
+        self.minimum: int = minimum
+        self.maximum: int = maximum
+        self.limit: float = float(minimum)
+        self.active: int = 0
+        self.speed: float | None = None
+        self._best: float = 0.0
+        self._sized: bool | None = None
+        self._slow_start: bool = True
+        self._cut_at: float = 0.0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    async def acquire(self) -> None:
+        """
+        Wait until fewer downloads than the limit are running, then count one
+        more.
+        """
+        while self.active >= int(self.limit):
+            waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if not waiter.done():
+                    self._waiters.remove(waiter)
+        self.active += 1
+
+    def release(self) -> None:
+        """
+        Count a download as finished.
+        """
+        self.active -= 1
+        self._wake()
+
+    def succeeded(self, started_at: float, seconds: float, size: int | None) -> None:
+        """
+        Feed a successful download into the controller.
+
+        Parameters
+        ----------
+        started_at : float
+            Monotonic time the download started.
+        seconds : float
+            How long the download took.
+        size : int | None
+            Size of the download in bytes, when known.
+        """
+        if seconds > 0:
+            sized: bool = size is not None
+            if sized != self._sized:
+                # The unit changed, so earlier speeds cannot be compared.
+                self._sized, self.speed, self._best = sized, None, 0.0
+            sample: float = (size or 1) / seconds
+            self.speed = (
+                sample
+                if self.speed is None
+                else self.speed + DEFAULT_ADAPTIVE_SMOOTHING * (sample - self.speed)
+            )
+            # Decays, so that a link that got slower for good becomes the new
+            # reference instead of holding the limit down forever.
+            self._best = max(sample, self._best * 0.98)
+            if self.speed < self._best * DEFAULT_ADAPTIVE_SLOWDOWN:
+                self._cut(started_at, 0.75)
+                return
+        if started_at < self._cut_at:
+            return
+        if self.active + len(self._waiters) < int(self.limit):
+            # Not every slot is in use, so the limit has not been tested.
+            return
+        self._set(self.limit + (1.0 if self._slow_start else 1.0 / self.limit))
+
+    def throttled(self, started_at: float) -> None:
+        """
+        Halve the limit after a host rate-limited a download.
+
+        Parameters
+        ----------
+        started_at : float
+            Monotonic time the download started.
+        """
+        self._cut(started_at, 0.5)
+
+    def failed(self, started_at: float) -> None:
+        """
+        Cut the limit after a download failed with a transient error.
+
+        Parameters
+        ----------
+        started_at : float
+            Monotonic time the download started.
+        """
+        self._cut(started_at, 0.75)
+
+    def describe(self) -> str:
+        """
+        Summarize the controller's state for progress output.
+
+        Returns
+        -------
+        str
+            Running downloads, limit and speed.
+        """
+        state: str = f"{self.active}/{int(self.limit)} running"
+        if self.speed is not None:
+            state += (
+                f", {self.speed / 1e6:.1f} MB/s"
+                if self._sized
+                else f", {self.speed * 60:.1f}/min"
+            )
+        return state
+
+    def _cut(self, started_at: float, factor: float) -> None:
+        if started_at < self._cut_at:
+            return
+        self._slow_start = False
+        self._cut_at = time.monotonic()
+        self._set(self.limit * factor)
+
+    def _set(self, limit: float) -> None:
+        self.limit = min(float(self.maximum), max(float(self.minimum), limit))
+        self._wake()
+
+    def _wake(self) -> None:
+        free: int = int(self.limit) - self.active
+        while free > 0 and self._waiters:
+            waiter: asyncio.Future[None] = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
@@ -0,0 +1,88 @@
+import os
+from typing import Iterator
+
+ARCHIVE_FILENAME = ".ytdlplist-archive.txt"
+
+
+class DownloadArchive:
+    """
+    Append-only index of downloaded video IDs.
+
+    The file uses yt-dlp's ``--download-archive`` format, one
+    ``youtube <video id>`` line per track, so it can also be passed to yt-dlp
+    directly. IDs are held in a set for constant-time lookups.
+
+    Attributes
+    ----------
+    path : str
+        Path to the archive file.
+    """
+
+    extractor: str = "youtube"
+    _open: dict[str, "DownloadArchive"] = {}
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._ids: set[str] = set()
+        self.load()
+
+    @classmethod
+    def for_directory(cls, output_dir: str) -> "DownloadArchive":
+        """
+        Open the archive kept alongside a playlist's output directory.
+
+        Archives are shared per path, so every job writing to a directory sees
+        the same set of IDs.
+
+        Parameters
+        ----------
+        output_dir : str
+            Playlist output directory.
+
+        Returns
+        -------
+        DownloadArchive
+            Archive for the directory.
+        """
+        path: str = os.path.join(output_dir, ARCHIVE_FILENAME)
+        if path not in cls._open:
+            cls._open[path] = cls(path)
+        return cls._open[path]
+
+    def load(self) -> None:
+        """
+        Read the archive file, if it exists.
+        """
+        try:
+            with open(self.path, "r") as fp:
+                for line in fp:
+                    parts: list[str] = line.split()
+                    if len(parts) == 2 and parts[0] == self.extractor:
+                        self._ids.add(parts[1])
+        except FileNotFoundError:
+            pass
+
+    def add(self, video_id: str) -> None:
+        """
+        Record a downloaded video.
+
+        Parameters
+        ----------
+        video_id : str
+            YouTube video ID.
+        """
+        if video_id in self._ids:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as fp:
+            fp.write(f"{self.extractor} {video_id}\n")
+        self._ids.add(video_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __contains__(self, video_id: object) -> bool:
+        return video_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
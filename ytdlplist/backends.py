@@ -0,0 +1,871 @@
+import asyncio
+import importlib.util
+import json
+import subprocess
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator
+
+from ytdlplist import profiling
+from ytdlplist.constants import DEFAULT_CONCURRENCY, RED, RESET
+from ytdlplist.metadata import fetch_playlist_metadata, iter_flat_playlist
+from ytdlplist.metrics import RunMetrics
+from ytdlplist.models import PlaylistSnapshot, TrackEntry
+from ytdlplist.progress import ProgressCallback
+from ytdlplist.utils import ensure_valid_destination, executable
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+BACKENDS: tuple[str, ...] = ("cli", "inprocess")
+
+# Fields of the selected format that describe how to fetch it directly.
+RESOLVE_FIELDS: tuple[str, ...] = (
+    "url",
+    "ext",
+    "title",
+    "protocol",
+    "http_headers",
+    "filesize",
+)
+RESOLVE_TEMPLATE: str = "%(.{" + ",".join(RESOLVE_FIELDS) + "})j"
+
+# Progress lines yt-dlp prints for ytdlplist, one per update, with the bytes
+# downloaded, total and estimated total bytes, speed and seconds left.
+PROGRESS_PREFIX: str = "ytdlplist-progress"
+PROGRESS_ARGS: tuple[str, ...] = (
+    "--progress",
+    "--newline",
+    "--progress-template",
+    f"download:{PROGRESS_PREFIX} %(progress.downloaded_bytes)s"
+    " %(progress.total_bytes)s %(progress.total_bytes_estimate)s"
+    " %(progress.speed)s %(progress.eta)s",
+)
+
+# Per-process cache of long-lived YoutubeDL instances, keyed by their options.
+_ydl_cache: dict[tuple[Any, ...], Any] = {}
+_YDL_CACHE_SIZE = 8
+
+
+def download_args(
+    video_id: str,
+    audio_only: bool = True,
+    output_dir: str = ".",
+    output_ext: str = "mp3",
+    simulate: bool = False,
+    fragments: int = 1,
+) -> list[str]:
+    """
+    Build the yt-dlp command line for a single track.
+
+    Parameters
+    ----------
+    video_id : str
+        YouTube video ID.
+    audio_only : bool, optional
+        Whether to download only the audio, by default True
+    output_dir : str, optional
+        Output directory, by default "."
+    output_ext : str, optional
+        Output file extension, by default "mp3"
+    simulate : bool, optional
+        Whether to resolve the track without downloading it, by default False
+    fragments : int, optional
+        Fragments of DASH and HLS streams to download at once, by default 1
+
+    Returns
+    -------
+    list[str]
+        Argument list, starting with the yt-dlp executable.
+    """
+    video_url = f"https://www.youtube.com/watch?v={video_id}"
+    _args: list[str] = [executable("yt-dlp"), video_url]
+    if audio_only:
+        _args.append("--extract-audio")
+        _args.append("--audio-format")
+        _args.append(output_ext)
+    else:
+        _args.append("--format")
+        _args.append(output_ext)
+    _args.append("--output")
+    _args.append(f"{output_dir}/%(title)s.%(ext)s")
+    if simulate:
+        _args.append("--simulate")
+    _args.append("--quiet")
+    _args.append("--no-warnings")
+    if fragments > 1:
+        _args += ["--concurrent-fragments", str(fragments)]
+    return _args
+
+
+def fetch_audio_args(
+    video_id: str, output_dir: str = ".", fragments: int = 1
+) -> list[str]:
+    """
+    Build the yt-dlp command line that downloads a track's best audio stream
+    as is and prints where it was saved.
+
+    Parameters
+    ----------
+    video_id : str
+        YouTube video ID.
+    output_dir : str, optional
+        Output directory, by default "."
+    fragments : int, optional
+        Fragments of DASH and HLS streams to download at once, by default 1
+
+    Returns
+    -------
+    list[str]
+        Argument list, starting with the yt-dlp executable.
+    """
+    _args: list[str] = [
+        executable("yt-dlp"),
+        f"https://www.youtube.com/watch?v={video_id}",
+        "--format",
+        "bestaudio/best",
+        "--output",
+        f"{output_dir}/%(title)s.%(ext)s",
+        "--print",
+        "after_move:filepath",
+        "--quiet",
+        "--no-warnings",
+    ]
+    if fragments > 1:
+        _args += ["--concurrent-fragments", str(fragments)]
+    return _args
+
+
+def resolve_audio_args(video_id: str) -> list[str]:
+    """
+    Build the yt-dlp command line that prints, without downloading anything,
+    where a track's best audio stream can be fetched from.
+
+    Parameters
+    ----------
+    video_id : str
+        YouTube video ID.
+
+    Returns
+    -------
+    list[str]
+        Argument list, starting with the yt-dlp executable.
+    """
+    return [
+        executable("yt-dlp"),
+        f"https://www.youtube.com/watch?v={video_id}",
+        "--format",
+        "bestaudio/best",
+        "--print",
+        RESOLVE_TEMPLATE,
+        "--quiet",
+        "--no-warnings",
+    ]
+
+
+def parse_progress(line: str, on_progress: ProgressCallback) -> bool:
+    """
+    Pass a progress line printed with PROGRESS_ARGS on to a callback.
+
+    Parameters
+    ----------
+    line : str
+        Line of yt-dlp output.
+    on_progress : ProgressCallback
+        Called with the line's numbers.
+
+    Returns
+    -------
+    bool
+        Whether the line was a progress line.
+    """
+    if not line.startswith(PROGRESS_PREFIX):
+        return False
+    values: list[float | None] = []
+    for field in line.split()[1:6]:
+        try:
+            values.append(float(field))
+        except ValueError:
+            # yt-dlp prints NA for fields it does not know.
+            values.append(None)
+    if len(values) == 5:
+        downloaded, total, estimate, speed, eta = values
+        size: float | None = total or estimate
+        if downloaded is not None:
+            on_progress(int(downloaded), int(size) if size else None, speed, eta)
+    return True
+
+
+def _ydl_options(
+    audio_only: bool,
+    output_dir: str,
+    output_ext: str,
+    simulate: bool,
+    fragments: int = 1,
+) -> dict[str, Any]:
+    options: dict[str, Any] = {
+        "outtmpl": f"{output_dir}/%(title)s.%(ext)s",
+        "quiet": True,
+        "no_warnings": True,
+        "simulate": simulate,
+        "concurrent_fragment_downloads": fragments,
+    }
+    if audio_only:
+        options["format"] = "bestaudio/best"
+        options["postprocessors"] = [
+            {"key": "FFmpegExtractAudio", "preferredcodec": output_ext}
+        ]
+    else:
+        options["format"] = output_ext
+    return options
+
+
+def _get_ydl(key: tuple[Any, ...], options: dict[str, Any]) -> Any:
+    ydl = _ydl_cache.pop(key, None)
+    if ydl is None:
+        from yt_dlp import YoutubeDL
+
+        ydl = YoutubeDL(options)
+        if len(_ydl_cache) >= _YDL_CACHE_SIZE:
+            _ydl_cache.pop(next(iter(_ydl_cache))).close()
+    # Re-insert so the dict order doubles as least-recently-used order.
+    _ydl_cache[key] = ydl
+    return ydl
+
+
+def _inprocess_download(
+    video_id: str,
+    audio_only: bool,
+    output_dir: str,
+    output_ext: str,
+    simulate: bool,
+    fragments: int,
+) -> int:
+    from yt_dlp.utils import DownloadError
+
+    key: tuple[Any, ...] = (
+        "download",
+        audio_only,
+        output_dir,
+        output_ext,
+        simulate,
+        fragments,
+    )
+    ydl = _get_ydl(
+        key, _ydl_options(audio_only, output_dir, output_ext, simulate, fragments)
+    )
+    url: str = f"https://www.youtube.com/watch?v={video_id}"
+    try:
+        returncode: int = ydl.download([url])
+    except DownloadError as e:
+        raise subprocess.CalledProcessError(1, ["yt_dlp", url], stderr=str(e)) from None
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, ["yt_dlp", url], stderr="")
+    return 0
+
+
+def _inprocess_fetch_audio(video_id: str, output_dir: str, fragments: int) -> str:
+    from yt_dlp.utils import DownloadError
+
+    options: dict[str, Any] = {
+        "outtmpl": f"{output_dir}/%(title)s.%(ext)s",
+        "format": "bestaudio/best",
+        "quiet": True,
+        "no_warnings": True,
+        "concurrent_fragment_downloads": fragments,
+    }
+    ydl = _get_ydl(("fetch_audio", output_dir, fragments), options)
+    url: str = f"https://www.youtube.com/watch?v={video_id}"
+    try:
+        info: dict[str, Any] = ydl.extract_info(url, download=True)
+    except DownloadError as e:
+        raise subprocess.CalledProcessError(1, ["yt_dlp", url], stderr=str(e)) from None
+    return info["requested_downloads"][0]["filepath"]
+
+
+def _inprocess_resolve_audio(video_id: str) -> dict[str, Any]:
+    from yt_dlp.utils import DownloadError
+
+    options: dict[str, Any] = {
+        "format": "bestaudio/best",
+        "quiet": True,
+        "no_warnings": True,
+    }
+    ydl = _get_ydl(("resolve_audio",), options)
+    url: str = f"https://www.youtube.com/watch?v={video_id}"
+    try:
+        info: dict[str, Any] = ydl.sanitize_info(ydl.extract_info(url, download=False))
+    except DownloadError as e:
+        raise subprocess.CalledProcessError(1, ["yt_dlp", url], stderr=str(e)) from None
+    return {key: info.get(key) for key in RESOLVE_FIELDS}
+
+
+def _inprocess_flat_playlist(
+    url: str, items: str | None = None, keep_raw: bool = False
+) -> PlaylistSnapshot:
+    options: dict[str, Any] = {
+        "extract_flat": "in_playlist",
+        "skip_download": True,
+        "quiet": True,
+        "no_warnings": True,
+    }
+    ydl = _get_ydl(("metadata",), options)
+    # playlist_items is read per extraction, so one instance serves every range.
+    ydl.params["playlist_items"] = items
+    info: dict[str, Any] = ydl.sanitize_info(ydl.extract_info(url, download=False))
+    snapshot = PlaylistSnapshot(id=info.get("id"), title=info.get("title"))
+    for data in info.get("entries") or []:
+        if data and data.get("id"):
+            data.setdefault("playlist_id", snapshot.id)
+            data.setdefault("playlist_title", snapshot.title)
+            snapshot.add(TrackEntry.from_json(data, keep_raw))
+    return snapshot
+
+
+class Backend:
+    """
+    Base class for the engines that drive yt-dlp.
+
+    Attributes
+    ----------
+    name : str
+        Backend name, as accepted by ``get_backend``.
+
+    simulate : bool
+        Whether to resolve tracks without downloading them.
+
+    keep_raw : bool
+        Whether playlist entries keep yt-dlp's whole JSON object.
+
+    metrics : RunMetrics
+        Where process spawn times are recorded.
+
+    fragments : int
+        Fragments of DASH and HLS streams that ``download`` and
+        ``fetch_audio`` download at once.
+    """
+
+    name: str = ""
+
+    def __init__(
+        self,
+        simulate: bool = False,
+        keep_raw: bool = False,
+        metrics: RunMetrics | None = None,
+        fragments: int = 1,
+    ) -> None:
+        self.simulate: bool = simulate
+        self.keep_raw: bool = keep_raw
+        self.metrics: RunMetrics = metrics or RunMetrics()
+        self.fragments: int = max(1, fragments)
+
+    async def download(
+        self,
+        video_id: str,
+        audio_only: bool = True,
+        output_dir: str = ".",
+        output_ext: str = "mp3",
+        on_progress: ProgressCallback | None = None,
+    ) -> int:
+        """
+        Download a single track.
+
+        Parameters
+        ----------
+        video_id : str
+            YouTube video ID.
+        audio_only : bool, optional
+            Whether to download only the audio, by default True
+        output_dir : str, optional
+            Output directory, by default "."
+        output_ext : str, optional
+            Output file extension, by default "mp3"
+        on_progress : ProgressCallback | None, optional
+            Called as the download progresses, where the backend can tell, by
+            default never
+
+        Returns
+        -------
+        int
+            0 on success, 1 if the output directory is unusable.
+
+        Raises
+        ------
+        subprocess.CalledProcessError :
+            If yt-dlp fails, with its error output in ``stderr``.
+        """
+        raise NotImplementedError
+
+    async def fetch_audio(
+        self,
+        video_id: str,
+        output_dir: str = ".",
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        """
+        Download a track's best audio stream without converting it.
+
+        Parameters
+        ----------
+        video_id : str
+            YouTube video ID.
+        output_dir : str, optional
+            Output directory, by default "."
+        on_progress : ProgressCallback | None, optional
+            Called as the download progresses, where the backend can tell, by
+            default never
+
+        Returns
+        -------
+        str
+            Path to the downloaded file.
+
+        Raises
+        ------
+        OSError :
+            If the output directory is unusable.
+        subprocess.CalledProcessError :
+            If yt-dlp fails, with its error output in ``stderr``.
+        """
+        raise NotImplementedError
+
+    async def resolve_audio(self, video_id: str) -> dict[str, Any]:
+        """
+        Find where a track's best audio stream can be fetched from, without
+        downloading it.
+
+        Parameters
+        ----------
+        video_id : str
+            YouTube video ID.
+
+        Returns
+        -------
+        dict[str, Any]
+            The stream's RESOLVE_FIELDS: its URL, extension, title, protocol,
+            the HTTP headers to send and its size in bytes, where known.
+
+        Raises
+        ------
+        subprocess.CalledProcessError :
+            If yt-dlp fails, with its error output in ``stderr``.
+        """
+        raise NotImplementedError
+
+    async def fetch_playlist(
+        self, url: str, items: str | None = None
+    ) -> PlaylistSnapshot:
+        """
+        Get a playlist's ID, title and flat entries.
+
+        Parameters
+        ----------
+        url : str
+            Playlist URL.
+        items : str | None, optional
+            yt-dlp ``-I`` item range such as ``"1:50"``, by default every item
+
+        Returns
+        -------
+        PlaylistSnapshot
+            Parsed playlist.
+        """
+        raise NotImplementedError
+
+    async def iter_playlist(
+        self, url: str, items: str | None = None
+    ) -> AsyncIterator[TrackEntry]:
+        """
+        Yield a playlist's flat entries, as early as the backend allows.
+
+        Each entry carries ``playlist_id`` and ``playlist_title``. This
+        default implementation fetches the whole playlist first.
+
+        Parameters
+        ----------
+        url : str
+            Playlist URL.
+        items : str | None, optional
+            yt-dlp ``-I`` item range such as ``"1:50"``, by default every item
+
+        Yields
+        ------
+        TrackEntry
+            Playlist entries, in playlist order.
+        """
+        snapshot: PlaylistSnapshot = await self.fetch_playlist(url, items)
+        for entry in snapshot.entries:
+            entry.playlist_id = entry.playlist_id or snapshot.id
+            entry.playlist_title = entry.playlist_title or snapshot.title
+            yield entry
+
+    def close(self) -> None:
+        """
+        Release any resources held by the backend.
+        """
+
+
+class CliBackend(Backend):
+    """
+    Backend that spawns one yt-dlp CLI process per request.
+    """
+
+    name = "cli"
+
+    async def download(
+        self,
+        video_id: str,
+        audio_only: bool = True,
+        output_dir: str = ".",
+        output_ext: str = "mp3",
+        on_progress: ProgressCallback | None = None,
+    ) -> int:
+        """
+        Download a single track without blocking the event loop.
+
+        Raises
+        ------
+        ChildProcessError :
+            If the yt-dlp process could not be started.
+        subprocess.CalledProcessError :
+            If yt-dlp exits with an error.
+        """
+        try:
+            ensure_valid_destination(output_dir)
+        except OSError as e:
+            print(f"{RED}An error occurred:", e, RESET)
+            return 1
+        await self._run(
+            download_args(
+                video_id,
+                audio_only,
+                output_dir,
+                output_ext,
+                self.simulate,
+                self.fragments,
+            ),
+            on_progress,
+        )
+        return 0
+
+    async def fetch_audio(
+        self,
+        video_id: str,
+        output_dir: str = ".",
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        """
+        Download a track's best audio stream with one yt-dlp process.
+
+        Raises
+        ------
+        OSError :
+            If the output directory is unusable.
+        ChildProcessError :
+            If the yt-dlp process could not be started.
+        subprocess.CalledProcessError :
+            If yt-dlp exits with an error.
+        """
+        ensure_valid_destination(output_dir)
+        _args: list[str] = fetch_audio_args(video_id, output_dir, self.fragments)
+        stdout: str = await self._run(_args, on_progress, task="fetch")
+        if not stdout.strip():
+            raise subprocess.CalledProcessError(
+                1, _args, stderr="yt-dlp did not report the downloaded file"
+            )
+        return stdout.strip().splitlines()[-1]
+
+    async def resolve_audio(self, video_id: str) -> dict[str, Any]:
+        """
+        Find a track's best audio stream with one yt-dlp process.
+
+        Raises
+        ------
+        ChildProcessError :
+            If the yt-dlp process could not be started.
+        subprocess.CalledProcessError :
+            If yt-dlp exits with an error or prints no stream.
+        """
+        _args: list[str] = resolve_audio_args(video_id)
+        stdout: str = await self._run(_args, task="resolve")
+        try:
+            return json.loads(stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            raise subprocess.CalledProcessError(
+                1, _args, stderr="yt-dlp did not report the audio stream"
+            ) from None
+
+    async def _run(
+        self,
+        _args: list[str],
+        on_progress: ProgressCallback | None = None,
+        task: str = "download",
+    ) -> str:
+        spawned_at: float = time.monotonic()
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *_args,
+                *(PROGRESS_ARGS if on_progress is not None else ()),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as e:
+            raise ChildProcessError("Error downloading video:", e) from e
+        self.metrics.observe(
+            "ytdlplist_spawn_seconds", time.monotonic() - spawned_at, program="yt-dlp"
+        )
+        profiling.watch(proc, f"yt-dlp {task}", spawned_at)
+        try:
+            if on_progress is None:
+                stdout, stderr = await proc.communicate()
+            else:
+                # Progress lines go to stderr when yt-dlp is quiet, and to
+                # stdout otherwise; either way they are read as they come.
+                stdout, stderr = await asyncio.gather(
+                    _read_lines(proc.stdout, on_progress),
+                    _read_lines(proc.stderr, on_progress),
+                )
+                await proc.wait()
+        finally:
+            if proc.returncode is None:
+                # The download was cancelled; don't leave yt-dlp running.
+                proc.kill()
+                await proc.wait()
+        errors: str = stderr.decode(errors="replace")
+        # Warnings are silenced, but stderr alone no longer means failure.
+        if proc.returncode or "ERROR:" in errors:
+            raise subprocess.CalledProcessError(
+                proc.returncode or 1, _args, stderr=errors
+            )
+        return stdout.decode(errors="replace")
+
+    async def fetch_playlist(
+        self, url: str, items: str | None = None
+    ) -> PlaylistSnapshot:
+        """
+        Get a playlist's metadata from one ``yt-dlp -j --flat-playlist`` call.
+
+        Raises
+        ------
+        subprocess.CalledProcessError :
+            If an error occurs when running the yt-dlp command.
+        """
+        return await fetch_playlist_metadata(url, items, self.keep_raw)
+
+    async def iter_playlist(
+        self, url: str, items: str | None = None
+    ) -> AsyncIterator[TrackEntry]:
+        """
+        Yield entries as ``yt-dlp -j --flat-playlist`` prints them.
+
+        Raises
+        ------
+        subprocess.CalledProcessError :
+            If an error occurs when running the yt-dlp command.
+        """
+        async for entry in iter_flat_playlist(url, items, self.keep_raw):
+            yield entry
+
+
+async def _read_lines(
+    stream: asyncio.StreamReader | None, on_progress: ProgressCallback
+) -> bytes:
+    # Returns the stream's output without its progress lines.
+    kept: list[bytes] = []
+    if stream is not None:
+        while line := await stream.readline():
+            if not parse_progress(line.decode(errors="replace"), on_progress):
+                kept.append(line)
+    return b"".join(kept)
+
+
+class InProcessBackend(Backend):
+    """
+    Backend that drives ``yt_dlp.YoutubeDL`` inside a pool of worker processes.
+
+    Each worker keeps its YoutubeDL instances alive between tracks, so the
+    extractor registry, HTTP connection pools and cookies are reused instead
+    of being rebuilt for every video.
+
+    Attributes
+    ----------
+    workers : int
+        Number of worker processes.
+    """
+
+    name = "inprocess"
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_CONCURRENCY,
+        simulate: bool = False,
+        keep_raw: bool = False,
+        metrics: RunMetrics | None = None,
+        fragments: int = 1,
+    ) -> None:
+        if importlib.util.find_spec("yt_dlp") is None:
+            raise ImportError("The inprocess backend requires the yt-dlp package.")
+        super().__init__(simulate, keep_raw, metrics, fragments)
+        self.workers: int = max(1, workers)
+        self._pool: "ProcessPoolExecutor | None" = None
+
+    @property
+    def pool(self) -> "ProcessPoolExecutor":
+        if self._pool is None:
+            # Imported here: multiprocessing is slow to import and the CLI
+            # backend never needs it.
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def download(
+        self,
+        video_id: str,
+        audio_only: bool = True,
+        output_dir: str = ".",
+        output_ext: str = "mp3",
+        on_progress: ProgressCallback | None = None,
+    ) -> int:
+        """
+        Download a single track in a worker process. Progress is not
+        reported.
+
+        Raises
+        ------
+        subprocess.CalledProcessError :
+            If yt-dlp fails to download the track.
+        """
+        try:
+            ensure_valid_destination(output_dir)
+        except OSError as e:
+            print(f"{RED}An error occurred:", e, RESET)
+            return 1
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.pool,
+            _inprocess_download,
+            video_id,
+            audio_only,
+            output_dir,
+            output_ext,
+            self.simulate,
+            self.fragments,
+        )
+
+    async def fetch_audio(
+        self,
+        video_id: str,
+        output_dir: str = ".",
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        """
+        Download a track's best audio stream in a worker process. Progress is
+        not reported.
+
+        Raises
+        ------
+        OSError :
+            If the output directory is unusable.
+        subprocess.CalledProcessError :
+            If yt-dlp fails to download the track.
+        """
+        ensure_valid_destination(output_dir)
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.pool, _inprocess_fetch_audio, video_id, output_dir, self.fragments
+        )
+
+    async def resolve_audio(self, video_id: str) -> dict[str, Any]:
+        """
+        Find a track's best audio stream in a worker process.
+
+        Raises
+        ------
+        subprocess.CalledProcessError :
+            If yt-dlp fails to extract the track.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, _inprocess_resolve_audio, video_id)
+
+    async def fetch_playlist(
+        self, url: str, items: str | None = None
+    ) -> PlaylistSnapshot:
+        """
+        Get a playlist's entries in a worker process.
+
+        Raises
+        ------
+        subprocess.CalledProcessError :
+            If yt-dlp fails to extract the playlist.
+        """
+        from yt_dlp.utils import DownloadError
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self.pool, _inprocess_flat_playlist, url, items, self.keep_raw
+            )
+        except DownloadError as e:
+            raise subprocess.CalledProcessError(
+                1, ["yt_dlp", url], stderr=str(e)
+            ) from None
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+def get_backend(
+    name: str = "cli",
+    workers: int = DEFAULT_CONCURRENCY,
+    simulate: bool = False,
+    keep_raw: bool = False,
+    metrics: RunMetrics | None = None,
+    fragments: int = 1,
+) -> Backend:
+    """
+    Create a backend by name.
+
+    Parameters
+    ----------
+    name : str, optional
+        One of ``BACKENDS``, by default "cli"
+    workers : int, optional
+        Worker processes for the inprocess backend, by default DEFAULT_CONCURRENCY
+    simulate : bool, optional
+        Whether to resolve tracks without downloading them, by default False
+    keep_raw : bool, optional
+        Whether playlist entries keep yt-dlp's whole JSON object, by default
+        False
+    metrics : RunMetrics | None, optional
+        Where to record process spawn times, by default nowhere
+    fragments : int, optional
+        Fragments of DASH and HLS audio streams to download at once, by
+        default 1
+
+    Returns
+    -------
+    Backend
+        The requested backend.
+
+    Raises
+    ------
+    ValueError
+        If the backend name is unknown.
+    ImportError
+        If the backend's dependencies are not installed.
+    """
+    if name == "cli":
+        return CliBackend(
+            simulate=simulate, keep_raw=keep_raw, metrics=metrics, fragments=fragments
+        )
+    if name == "inprocess":
+        return InProcessBackend(
+            workers=workers,
+            simulate=simulate,
+            keep_raw=keep_raw,
+            metrics=metrics,
+            fragments=fragments,
+        )
+    raise ValueError(f"Unknown backend: {name}")
@@ -0,0 +1,266 @@
+import json
+import os
+import time
+from typing import Any
+
+from ytdlplist.backends import Backend
+from ytdlplist.constants import (
+    DEFAULT_CACHE_MAX_AGE,
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_FULL_REFRESH,
+    DEFAULT_HEAD_PAGES,
+    DEFAULT_HEAD_SIZE,
+)
+from ytdlplist.models import PlaylistSnapshot, TrackEntry
+from ytdlplist.utils import get_cache_dir
+
+CACHE_VERSION = 1
+
+
+class MetadataCache:
+    """
+    On-disk cache of flat-playlist metadata, keyed by playlist ID.
+
+    Only the entry IDs, titles and durations are kept, along with the time
+    each playlist was fetched and last used, and the number of incremental
+    refreshes since it was fetched in full.
+
+    Attributes
+    ----------
+    path : str
+        Path to the JSON cache file.
+
+    ttl : float
+        Seconds for which a cached playlist is used without any network call.
+
+    max_age : float
+        Seconds after which an unused playlist is evicted.
+
+    max_playlists : int
+        Maximum number of playlists kept; least recently used are evicted first.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl: float = DEFAULT_CACHE_TTL,
+        max_age: float = DEFAULT_CACHE_MAX_AGE,
+        max_playlists: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        self.path: str = path or os.path.join(get_cache_dir(), "metadata.json")
+        self.ttl: float = ttl
+        self.max_age: float = max_age
+        self.max_playlists: int = max_playlists
+        self._playlists: dict[str, dict[str, Any]] = {}
+        self._dirty: bool = False
+        self.load()
+
+    def load(self) -> None:
+        """
+        Load the cache file, starting empty if it is missing or unreadable.
+        """
+        try:
+            with open(self.path, "r") as fp:
+                data: dict[str, Any] = json.load(fp)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("version") == CACHE_VERSION:
+            self._playlists = data.get("playlists", {})
+
+    def save(self) -> None:
+        """
+        Evict stale playlists and atomically write the cache file.
+        """
+        if not self._dirty:
+            return
+        self.evict()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path: str = f"{self.path}.tmp"
+        with open(tmp_path, "w") as fp:
+            json.dump({"version": CACHE_VERSION, "playlists": self._playlists}, fp)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def evict(self) -> None:
+        """
+        Drop playlists unused for longer than ``max_age`` and trim the cache to
+        ``max_playlists`` by last use.
+        """
+        now: float = time.time()
+        for playlist_id in [
+            k
+            for k, v in self._playlists.items()
+            if now - v.get("accessed_at", 0) > self.max_age
+        ]:
+            del self._playlists[playlist_id]
+            self._dirty = True
+        if len(self._playlists) > self.max_playlists:
+            by_use: list[str] = sorted(
+                self._playlists, key=lambda k: self._playlists[k].get("accessed_at", 0)
+            )
+            for playlist_id in by_use[: len(self._playlists) - self.max_playlists]:
+                del self._playlists[playlist_id]
+            self._dirty = True
+
+    def get(self, playlist_id: str) -> PlaylistSnapshot | None:
+        """
+        Get a cached playlist, whether or not it is still fresh.
+
+        Parameters
+        ----------
+        playlist_id : str
+            Playlist ID.
+
+        Returns
+        -------
+        PlaylistSnapshot | None
+            Cached metadata, or None if the playlist is not cached.
+        """
+        cached: dict[str, Any] | None = self._playlists.get(playlist_id)
+        if cached is None:
+            return None
+        cached["accessed_at"] = time.time()
+        self._dirty = True
+        return PlaylistSnapshot(
+            id=playlist_id,
+            title=cached.get("title"),
+            entries=[
+                TrackEntry(e["id"], e.get("title"), e.get("duration"))
+                for e in cached["entries"]
+            ],
+            refreshes=cached.get("refreshes", 0),
+        )
+
+    def video_ids(self, playlist_id: str) -> list[str]:
+        """
+        Get the video IDs of a cached playlist, without building its entries.
+
+        Parameters
+        ----------
+        playlist_id : str
+            Playlist ID.
+
+        Returns
+        -------
+        list[str]
+            Video IDs in playlist order, or an empty list if the playlist is
+            not cached.
+        """
+        cached: dict[str, Any] | None = self._playlists.get(playlist_id)
+        if cached is None:
+            return []
+        return [e["id"] for e in cached["entries"]]
+
+    def is_fresh(self, playlist_id: str) -> bool:
+        """
+        Check whether a cached playlist is younger than the TTL.
+
+        Parameters
+        ----------
+        playlist_id : str
+            Playlist ID.
+
+        Returns
+        -------
+        bool
+            Whether the playlist can be used without a network call.
+        """
+        cached: dict[str, Any] | None = self._playlists.get(playlist_id)
+        return bool(cached) and time.time() - cached["fetched_at"] < self.ttl
+
+    def put(self, playlist_id: str, snapshot: PlaylistSnapshot) -> None:
+        """
+        Store a playlist's metadata.
+
+        Parameters
+        ----------
+        playlist_id : str
+            Playlist ID.
+        snapshot : PlaylistSnapshot
+            Playlist to store.
+        """
+        now: float = time.time()
+        self._playlists[playlist_id] = {
+            "title": snapshot.title,
+            "fetched_at": now,
+            "accessed_at": now,
+            "entries": [e.to_json() for e in snapshot.entries],
+            "refreshes": snapshot.refreshes,
+        }
+        self._dirty = True
+
+
+async def fetch_incremental(
+    backend: Backend,
+    url: str,
+    cached: PlaylistSnapshot,
+    head_size: int = DEFAULT_HEAD_SIZE,
+    max_pages: int = DEFAULT_HEAD_PAGES,
+    full_every: int = DEFAULT_FULL_REFRESH,
+) -> PlaylistSnapshot:
+    """
+    Refresh a cached playlist by fetching only its head.
+
+    Pages of ``head_size`` entries are fetched from the start of the playlist
+    until one contains a video ID that is already cached. The new head is then
+    joined to the cached entries from that video onwards. If no known video
+    turns up within ``max_pages`` pages, the whole playlist is fetched.
+
+    The cached tail is trusted as it is, so videos removed from it, or
+    renamed, only show up once the playlist is fetched in full. That happens
+    on every ``full_every``-th refresh, counted in the snapshot's
+    ``refreshes``.
+
+    Parameters
+    ----------
+    backend : Backend
+        Backend used to run yt-dlp.
+    url : str
+        Playlist URL.
+    cached : PlaylistSnapshot
+        Previously cached metadata for the playlist.
+    head_size : int, optional
+        Entries per page, by default DEFAULT_HEAD_SIZE
+    max_pages : int, optional
+        Pages to fetch before falling back to a full fetch, by default
+        DEFAULT_HEAD_PAGES
+    full_every : int, optional
+        Refreshes per full fetch, by default DEFAULT_FULL_REFRESH
+
+    Returns
+    -------
+    PlaylistSnapshot
+        Up-to-date playlist metadata.
+
+    Raises
+    ------
+    subprocess.CalledProcessError :
+        If an error occurs when running the yt-dlp command.
+    """
+    if cached.refreshes + 1 >= full_every:
+        return await backend.fetch_playlist(url)
+    known: dict[str, int] = {}
+    for i, entry in enumerate(cached.entries):
+        known.setdefault(entry.id, i)
+    head: list[TrackEntry] = []
+    title: str | None = cached.title
+    for page in range(max_pages):
+        start: int = page * head_size + 1
+        page_snapshot: PlaylistSnapshot = await backend.fetch_playlist(
+            url, items=f"{start}:{start + head_size - 1}"
+        )
+        title = page_snapshot.title or title
+        for entry in page_snapshot.entries:
+            if entry.id in known:
+                return PlaylistSnapshot(
+                    id=cached.id,
+                    title=title,
+                    entries=head + cached.entries[known[entry.id] :],
+                    refreshes=cached.refreshes + 1,
+                )
+            head.append(entry)
+        if len(page_snapshot.entries) < head_size:
+            # Reached the end of the playlist without meeting a cached video.
+            return PlaylistSnapshot(id=cached.id, title=title, entries=head)
+    return await backend.fetch_playlist(url)
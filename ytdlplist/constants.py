@@ -14,4 +14,45 @@ RED, GREEN, YELLOW, MAGENTA, CYAN, DARK, WHITE, RESET = [
     colorama.Style.RESET_ALL,
 ]
 
+DEFAULT_CONCURRENCY = 4
+DEFAULT_INTERVAL = 30.0
+DEFAULT_METADATA_CONCURRENCY = 8
+DEFAULT_CACHE_TTL = 3600.0
+DEFAULT_CACHE_MAX_AGE = 30 * 24 * 3600.0
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_HEAD_SIZE = 50
+DEFAULT_HEAD_PAGES = 4
+DEFAULT_FULL_REFRESH = 24
+DEFAULT_JOURNAL_BATCH = 16
+DEFAULT_JOURNAL_DELAY = 1.0
+DEFAULT_RETRIES = 3
+DEFAULT_TRANSIENT_BACKOFF = 5.0
+DEFAULT_RATE_LIMIT_BACKOFF = 60.0
+DEFAULT_BACKOFF_CAP = 900.0
+DEFAULT_SOUND_BACKLOG = 2
+DEFAULT_SOUND_DRAIN = 5.0
+DEFAULT_METRICS_FLUSH = 10.0
+DEFAULT_WATCH_INTERVAL = 3600.0
+DEFAULT_WATCH_RELOAD = 5.0
+DEFAULT_WATCH_RETRIES = 3
+DEFAULT_LEASE = 120.0
+DEFAULT_QUEUE_POLL = 2.0
+DEFAULT_MIN_CONCURRENCY = 1
+DEFAULT_ADAPTIVE_SMOOTHING = 0.3
+DEFAULT_ADAPTIVE_SLOWDOWN = 0.5
+DEFAULT_PACING_STEP = 0.1
+
 BANNER = b"//6IJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCUKAIgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJQoAiCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYglkyWTJZMlkyWTJZMlkyWTJZMlkyWTJZMlkyWTJZMlkyWTJZMlkyWTJZMlkyWTJZMlkyWTJZMlkyWTJZMlkyWTJZMlkyWTJZMliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYgliCWIJYglCgCIJYgliCWIJSAAIAAgACAAIAAgACAAiCWIJZMlIAAgACAAIAAgACAAIAAgAJMlkyWTJSAAIAAgACAAIAAgAJMlkyUgACAAIAAgACAAIAAgACAAkyWTJSAAIAAgACAAIAAgAJMlkyWTJSAAIACTJZMlkyUgACAAiCWIJSAAIAAgACAAIAAgAIgliCWIJYgliCUKAIgliCWIJYglIAAgAIgliCWIJYglIAAgAJMlkyWTJZMlkyWTJSAAIACTJZMlkyWTJSAAIACTJZMlkyWTJZMlkyWTJZMlkyWTJSAAIACTJZMlkyWTJSAAIACTJZMlkyWTJSAAIACTJSAAIAAgAJMlkyUgACAAIACTJSAAIACIJYgliCWIJSAAIACIJYgliCWIJQoAiCWIJYgliCUgACAAiCWIJZMlkyUgACAAkyWTJZMlkyWTJZMlIAAgAJMlkyWTJZMlkyUgACAAIAAgACAAIACTJZMlkyWTJZMlIAAgAJMlkyWTJZMlIAAgAJMlkyWTJZMlIAAgAJMlIAAgACAAIAAgACAAIAAgAJMlIAAgACAAIAAgACAAIACIJYgliCWIJYglCgCIJYgliCWIJSAAIACTJZMlkyWTJSAAIACTJSAAIACTJZMlkyUgACAAkyWTJZIlkiWSJZIlkiWSJZIlkiUgACAAkiWSJZIlkiUgACAAkiWSJZIlkiUgACAAkiWSJZIlkiUgACAAkyUgACAAkyUgACAAkyUgACAAkyUgACAAkyWTJZMlkyWIJYgliCWIJYgliCUKAIgliCWIJYglIAAgACAAIAAgACAAIACTJZMlkyUgACAAIAAgACAAkiWSJZIlkiWSJZIlIAAgACAAIAAgACAAkiWSJZIlkiWSJSAAIACSJZIlkiWSJZIlIAAgACAAIAAgACAAkiWSJSAAIACSJZIlkiWTJSAAIACTJSAAIACTJZMlkyWTJZMlkyWIJYgliCWIJQoAiCWIJZMlkyWTJZMlkyWTJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWTJZMlkyWTJZMlkyWIJYglCgCIJZMlkyWTJZMlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZIlkiWSJZMlkyWTJZMliCUKAJMlkyWTJZIlkiWSJZIlkiWSJZIlkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElIACpAEQASgAgAFMAdABvAG0AcAAgADIAMAAyADQAIACRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWSJZIlkiWSJZIlkiWSJZMlkyWTJQoAkyWTJZIlkiWSJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSUgACIATgBvACAAUgBpAGcAaAB0AHMAIABSAGUAcwBlAHIAdgBlAGQAIgAgAJElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWSJZIlkiWTJZMlCgCTJZIlkiWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWSJZIlkyUKAJIlkiWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkSWRJZElkiWSJQoA"
+DEFAULT_RANGE_CONNECTIONS = 4
+DEFAULT_RANGE_CHUNK = 8 * 2**20
+DEFAULT_RANGE_RETRIES = 3
+DEFAULT_PROGRESS_FPS = 10.0
+DEFAULT_PROGRESS_LOG_INTERVAL = 30.0
+DEFAULT_PLAN_AUDIO_BITRATE = 160_000
+DEFAULT_PLAN_VIDEO_BITRATE = 2_500_000
+DEFAULT_PLAN_DURATION = 240.0
+DEFAULT_PLAN_BANDWIDTH = 2e6
+DEFAULT_PLAN_OVERHEAD = 5.0
+DEFAULT_STALL_THRESHOLD = 0.1
+DEFAULT_PROFILE_SAMPLE_INTERVAL = 0.005
+DEFAULT_PROFILE_TOP = 30
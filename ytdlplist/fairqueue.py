@@ -0,0 +1,231 @@
+import asyncio
+from collections import deque
+from typing import Any, Callable, Generic, Hashable, Iterable, TypeVar
+
+from ytdlplist.playlist_index import normalize_playlist, playlist_url
+
+T = TypeVar("T")
+
+
+class PlaylistPolicy:
+    """
+    How a playlist shares the downloads with the other playlists.
+
+    Attributes
+    ----------
+    priority : int
+        Tracks of playlists with a higher priority are downloaded first.
+
+    weight : float
+        Share of the downloads among playlists of the same priority: a
+        playlist with weight 2 gets two downloads for every one of a playlist
+        with weight 1.
+
+    max_tracks : int | None
+        Most tracks queued from the playlist per run, or None for no limit.
+        The rest are left for later runs.
+    """
+
+    __slots__ = ("priority", "weight", "max_tracks")
+
+    def __init__(
+        self, priority: int = 0, weight: float = 1.0, max_tracks: int | None = None
+    ) -> None:
+        if weight <= 0:
+            raise ValueError(f"Playlist weight must be positive, not {weight}")
+        if max_tracks is not None and max_tracks < 0:
+            raise ValueError(f"Track limit must not be negative, not {max_tracks}")
+        self.priority: int = priority
+        self.weight: float = weight
+        self.max_tracks: int | None = max_tracks
+
+    @classmethod
+    def from_entry(cls, item: str | dict[str, Any]) -> "PlaylistPolicy":
+        """
+        Read a policy from a playlists.json entry.
+
+        Parameters
+        ----------
+        item : str | dict[str, Any]
+            Playlist URL, or an object with optional ``priority``, ``weight``
+            and ``max_tracks`` keys.
+
+        Returns
+        -------
+        PlaylistPolicy
+            The policy; the default one for plain URLs.
+
+        Raises
+        ------
+        ValueError :
+            If a value is out of range or not a number.
+        """
+        if not isinstance(item, dict):
+            return cls()
+        max_tracks: Any = item.get("max_tracks")
+        return cls(
+            priority=int(item.get("priority", 0)),
+            weight=float(item.get("weight", 1.0)),
+            max_tracks=int(max_tracks) if max_tracks is not None else None,
+        )
+
+
+def playlist_policies(
+    inputs: Iterable[str | dict[str, Any]],
+) -> dict[str, PlaylistPolicy]:
+    """
+    Read the policy of every playlist in playlists.json.
+
+    Parameters
+    ----------
+    inputs : Iterable[str | dict[str, Any]]
+        Playlist URLs or IDs, or objects with a ``url`` key.
+
+    Returns
+    -------
+    dict[str, PlaylistPolicy]
+        Policy keyed by canonical playlist URL. Invalid playlists are left
+        out, and a repeated playlist keeps its first policy.
+
+    Raises
+    ------
+    ValueError :
+        If a policy value is out of range or not a number.
+    """
+    policies: dict[str, PlaylistPolicy] = {}
+    for item in inputs:
+        value: Any = item.get("url", "") if isinstance(item, dict) else item
+        playlist_id: str | None = (
+            normalize_playlist(value) if isinstance(value, str) else None
+        )
+        if playlist_id is not None:
+            policies.setdefault(
+                playlist_url(playlist_id), PlaylistPolicy.from_entry(item)
+            )
+    return policies
+
+
+class _Flow(Generic[T]):
+    __slots__ = ("items", "deficit", "priority")
+
+    def __init__(self, priority: int) -> None:
+        self.items: deque[T] = deque()
+        self.deficit: float = 0.0
+        self.priority: int = priority
+
+
+class FairQueue(Generic[T]):
+    """
+    Queue that interleaves items from several flows by deficit round-robin,
+    with an interface like asyncio.Queue's.
+
+    Each item belongs to the flow that ``key`` gives for it, such as the
+    playlist a track comes from. Flows of the highest priority that has
+    items are served in turn. On each turn a flow's deficit grows by its
+    weight, and it hands out one item per whole unit of deficit, so a small
+    flow queued behind a large one is served within one round instead of
+    after the whole backlog. Items of one flow come out in the order they
+    were put in.
+
+    Attributes
+    ----------
+    policies : dict[Hashable, PlaylistPolicy]
+        Policy of each flow. Flows without one get the default policy. A
+        flow's priority is read when it becomes non-empty, and its weight on
+        every turn.
+    """
+
+    def __init__(
+        self,
+        key: Callable[[T], Hashable],
+        policies: dict[Hashable, PlaylistPolicy] | None = None,
+    ) -> None:
+        self.key: Callable[[T], Hashable] = key
+        self.policies: dict[Hashable, PlaylistPolicy] = (
+            policies if policies is not None else {}
+        )
+        self._flows: dict[Hashable, _Flow[T]] = {}
+        # Keys of the non-empty flows at each priority, in serving order.
+        self._rounds: dict[int, deque[Hashable]] = {}
+        self._size: int = 0
+        self._unfinished: int = 0
+        self._nonempty = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return not self._size
+
+    def put_nowait(self, item: T) -> None:
+        """
+        Add an item at the back of its flow.
+        """
+        key: Hashable = self.key(item)
+        flow: _Flow[T] | None = self._flows.get(key)
+        if flow is None:
+            policy: PlaylistPolicy | None = self.policies.get(key)
+            flow = _Flow(policy.priority if policy is not None else 0)
+            self._flows[key] = flow
+            self._rounds.setdefault(flow.priority, deque()).append(key)
+        flow.items.append(item)
+        self._size += 1
+        self._unfinished += 1
+        self._finished.clear()
+        self._nonempty.set()
+
+    async def get(self) -> T:
+        """
+        Remove and return the next item, waiting until there is one.
+        """
+        while not self._size:
+            await self._nonempty.wait()
+        priority: int = max(self._rounds)
+        ring: deque[Hashable] = self._rounds[priority]
+        while True:
+            key: Hashable = ring[0]
+            flow: _Flow[T] = self._flows[key]
+            if flow.deficit < 1:
+                policy: PlaylistPolicy | None = self.policies.get(key)
+                flow.deficit += policy.weight if policy is not None else 1.0
+                if flow.deficit < 1:
+                    # Weights below 1 take several rounds to earn an item.
+                    ring.rotate(-1)
+                    continue
+            item: T = flow.items.popleft()
+            flow.deficit -= 1
+            if not flow.items:
+                ring.popleft()
+                del self._flows[key]
+                if not ring:
+                    del self._rounds[priority]
+            elif flow.deficit < 1:
+                ring.rotate(-1)
+            break
+        self._size -= 1
+        if not self._size:
+            self._nonempty.clear()
+        return item
+
+    def task_done(self) -> None:
+        """
+        Mark an item taken with ``get`` as processed.
+
+        Raises
+        ------
+        ValueError :
+            If called more times than there were items.
+        """
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished -= 1
+        if not self._unfinished:
+            self._finished.set()
+
+    async def join(self) -> None:
+        """
+        Wait until every item put in has been processed.
+        """
+        await self._finished.wait()
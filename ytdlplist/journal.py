@@ -0,0 +1,234 @@
+import asyncio
+import json
+import os
+import time
+from typing import IO, Any
+
+from ytdlplist.constants import DEFAULT_JOURNAL_BATCH, DEFAULT_JOURNAL_DELAY
+from ytdlplist.retry import PERMANENT
+from ytdlplist.utils import get_cache_dir
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JournalKey = tuple[str, str]
+
+
+class RunJournal:
+    """
+    Durable log of per-track download state for the current run.
+
+    Every state change is appended as one JSON line. Lines are written
+    straight away but only fsynced once ``batch_size`` of them are pending or
+    ``max_delay`` seconds have passed since the first of them, so a crash
+    loses at most the last batch of updates. Inside an event loop a timer
+    syncs records that no later record arrives to flush. Tracks are
+    identified by their output directory and video ID.
+
+    A journal left behind by a run that did not finish is replayed on
+    ``open``: finished tracks are not downloaded again and unfinished ones
+    are handed back to the scheduler. The file is removed once a run ends
+    cleanly.
+
+    Attributes
+    ----------
+    path : str
+        Path to the journal file.
+
+    batch_size : int
+        Number of records written between fsyncs.
+
+    max_delay : float
+        Maximum number of seconds a written record may wait for an fsync.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        batch_size: int = DEFAULT_JOURNAL_BATCH,
+        max_delay: float = DEFAULT_JOURNAL_DELAY,
+    ) -> None:
+        self.path: str = path or os.path.join(get_cache_dir(), "journal.jsonl")
+        self.batch_size: int = max(1, batch_size)
+        self.max_delay: float = max_delay
+        self._tracks: dict[JournalKey, dict[str, Any]] = {}
+        self._fp: IO[str] | None = None
+        self._unsynced: int = 0
+        self._unsynced_since: float = time.monotonic()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def open(self, resume: bool = True) -> None:
+        """
+        Replay any journal left by an interrupted run and start appending.
+
+        The replayed state is compacted to one line per track before the file
+        is reopened for appending.
+
+        Parameters
+        ----------
+        resume : bool, optional
+            Whether to replay the existing journal rather than discard it, by
+            default True
+        """
+        self._tracks = {}
+        if not resume:
+            self.close(finished=True)
+        try:
+            with open(self.path, "r") as fp:
+                for line in fp:
+                    try:
+                        record: dict[str, Any] = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-write.
+                        continue
+                    key: JournalKey = (record.pop("dir"), record.pop("id"))
+                    self._tracks.setdefault(key, {}).update(record)
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path: str = f"{self.path}.tmp"
+        with open(tmp_path, "w") as fp:
+            for (output_dir, video_id), track in self._tracks.items():
+                fp.write(_dumps({"dir": output_dir, "id": video_id, **track}))
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_path, self.path)
+        self._fp = open(self.path, "a")
+
+    def record(self, output_dir: str, video_id: str, state: str, **fields: Any) -> None:
+        """
+        Append a state change for a track.
+
+        Parameters
+        ----------
+        output_dir : str
+            Track output directory.
+        video_id : str
+            YouTube video ID.
+        state : str
+            One of QUEUED, RUNNING, DONE or FAILED.
+        **fields : Any
+            Extra fields to store, such as ``attempts`` or ``error``.
+        """
+        fields["state"] = state
+        self._tracks.setdefault((output_dir, video_id), {}).update(fields)
+        if self._fp is None:
+            return
+        self._fp.write(_dumps({"dir": output_dir, "id": video_id, **fields}))
+        if not self._unsynced:
+            self._unsynced_since = time.monotonic()
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.batch_size
+            or time.monotonic() - self._unsynced_since >= self.max_delay
+        ):
+            self.sync()
+        elif self._timer is None:
+            try:
+                loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._timer = loop.call_later(self.max_delay, self.sync)
+
+    def sync(self) -> None:
+        """
+        Flush written records to disk.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._fp is None or not self._unsynced:
+            return
+        self._fp.flush()
+        os.fsync(self._fp.fileno())
+        self._unsynced = 0
+
+    def get(self, output_dir: str, video_id: str) -> dict[str, Any] | None:
+        """
+        Get the last known state of a track.
+
+        Parameters
+        ----------
+        output_dir : str
+            Track output directory.
+        video_id : str
+            YouTube video ID.
+
+        Returns
+        -------
+        dict[str, Any] | None
+            Merged journal fields, or None if the track is not journaled.
+        """
+        return self._tracks.get((output_dir, video_id))
+
+    def is_done(self, output_dir: str, video_id: str) -> bool:
+        """
+        Check whether a track was downloaded earlier in this run.
+        """
+        track: dict[str, Any] | None = self.get(output_dir, video_id)
+        return track is not None and track.get("state") == DONE
+
+    def pending(self) -> list[tuple[str, str, dict[str, Any]]]:
+        """
+        List the tracks that had not finished downloading.
+
+        Tracks that were running when the previous run stopped are included,
+        as are failed ones, unless their error was classed as permanent.
+
+        Returns
+        -------
+        list[tuple[str, str, dict[str, Any]]]
+            Output directory, video ID and journal fields of each track.
+        """
+        return [
+            (output_dir, video_id, track)
+            for (output_dir, video_id), track in self._tracks.items()
+            if track.get("state") != DONE
+            and not (
+                track.get("state") == FAILED and track.get("error_class") == PERMANENT
+            )
+        ]
+
+    def counts(self) -> dict[str, int]:
+        """
+        Count journaled tracks by state.
+
+        Returns
+        -------
+        dict[str, int]
+            Number of tracks in each state.
+        """
+        counts: dict[str, int] = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for track in self._tracks.values():
+            counts[track.get("state", QUEUED)] += 1
+        return counts
+
+    def close(self, finished: bool = False) -> None:
+        """
+        Sync and close the journal.
+
+        Parameters
+        ----------
+        finished : bool, optional
+            Whether the run completed, in which case the journal is deleted,
+            by default False
+        """
+        if self._fp is not None:
+            self.sync()
+            self._fp.close()
+            self._fp = None
+        if finished:
+            self._tracks = {}
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+
+def _dumps(record: dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":")) + "\n"
@@ -0,0 +1,194 @@
+import asyncio
+import json
+import subprocess
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Iterable
+
+from ytdlplist import profiling
+from ytdlplist.models import PlaylistSnapshot, TrackEntry
+from ytdlplist.utils import executable
+
+# yt-dlp prints one JSON object per line; allow for unusually long entries.
+STREAM_LIMIT = 2**20
+
+# Lines of yt-dlp's error output kept for the error raised when it fails.
+STDERR_LINES = 50
+
+
+def flat_playlist_args(url: str, items: str | None = None) -> list[str]:
+    """
+    Build the yt-dlp command line that lists a playlist as JSON lines.
+
+    Parameters
+    ----------
+    url : str
+        Playlist URL.
+    items : str | None, optional
+        yt-dlp ``-I`` item range such as ``"1:50"``, by default every item
+
+    Returns
+    -------
+    list[str]
+        Argument list, starting with the yt-dlp executable.
+    """
+    _args: list[str] = [executable("yt-dlp"), "-j", "--flat-playlist", url]
+    if items:
+        _args.extend(["-I", items])
+    _args.extend(["--quiet", "--no-warnings"])
+    return _args
+
+
+def parse_entry(line: str | bytes, keep_raw: bool = False) -> TrackEntry | None:
+    """
+    Parse one line of yt-dlp flat-playlist output.
+
+    Parameters
+    ----------
+    line : str | bytes
+        A single NDJSON line.
+    keep_raw : bool, optional
+        Whether to keep the whole JSON object on the entry, by default False
+
+    Returns
+    -------
+    TrackEntry | None
+        The entry, or None for blank, malformed or ID-less lines.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        data: Any = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict) or not data.get("id"):
+        return None
+    return TrackEntry.from_json(data, keep_raw)
+
+
+def parse_flat_playlist(
+    lines: Iterable[str], keep_raw: bool = False
+) -> PlaylistSnapshot:
+    """
+    Parse yt-dlp flat-playlist output into playlist metadata.
+
+    Every entry carries ``playlist_id`` and ``playlist_title``, so the
+    playlist's own metadata is taken from the first entry that has them.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        Lines of ``yt-dlp -j --flat-playlist`` output.
+    keep_raw : bool, optional
+        Whether to keep each whole JSON object on its entry, by default False
+
+    Returns
+    -------
+    PlaylistSnapshot
+        Parsed playlist.
+    """
+    snapshot = PlaylistSnapshot()
+    for line in lines:
+        entry: TrackEntry | None = parse_entry(line, keep_raw)
+        if entry is not None:
+            snapshot.add(entry)
+    return snapshot
+
+
+async def iter_flat_playlist(
+    url: str, items: str | None = None, keep_raw: bool = False
+) -> AsyncIterator[TrackEntry]:
+    """
+    Yield playlist entries as yt-dlp prints them.
+
+    Entries are parsed line by line from the running process, so callers can
+    act on the first tracks while the rest of the playlist is still being
+    enumerated.
+
+    Parameters
+    ----------
+    url : str
+        Playlist URL.
+    items : str | None, optional
+        yt-dlp ``-I`` item range such as ``"1:50"``, by default every item
+    keep_raw : bool, optional
+        Whether to keep each whole JSON object on its entry, by default False
+
+    Yields
+    ------
+    TrackEntry
+        Playlist entries, in playlist order.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If yt-dlp exits with a non-zero status.
+    """
+    args: list[str] = flat_playlist_args(url, items)
+    spawned_at: float = time.monotonic()
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=STREAM_LIMIT,
+    )
+    profiling.watch(proc, "yt-dlp playlist", spawned_at)
+    assert proc.stdout is not None and proc.stderr is not None
+    stderr: deque[bytes] = deque(maxlen=STDERR_LINES)
+
+    async def drain(stream: asyncio.StreamReader) -> None:
+        # Read while stdout is consumed, so that a flood of warnings cannot
+        # fill the pipe and stall yt-dlp.
+        async for line in stream:
+            stderr.append(line)
+
+    reader: asyncio.Task[None] = asyncio.create_task(drain(proc.stderr))
+    try:
+        async for line in proc.stdout:
+            entry: TrackEntry | None = parse_entry(line, keep_raw)
+            if entry is not None:
+                yield entry
+        await reader
+        await proc.wait()
+    finally:
+        reader.cancel()
+        if proc.returncode is None:
+            # The consumer stopped early; don't leave yt-dlp running.
+            proc.kill()
+            await proc.wait()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(
+            proc.returncode, args, stderr=b"".join(stderr).decode(errors="replace")
+        )
+
+
+async def fetch_playlist_metadata(
+    url: str, items: str | None = None, keep_raw: bool = False
+) -> PlaylistSnapshot:
+    """
+    Get a playlist's ID, title and entries with one yt-dlp invocation.
+
+    Parameters
+    ----------
+    url : str
+        Playlist URL.
+    items : str | None, optional
+        yt-dlp ``-I`` item range such as ``"1:50"``, by default every item
+    keep_raw : bool, optional
+        Whether to keep each whole JSON object on its entry, by default False
+
+    Returns
+    -------
+    PlaylistSnapshot
+        Parsed playlist.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If an error occurs when running the yt-dlp command.
+    """
+    snapshot = PlaylistSnapshot()
+    async for entry in iter_flat_playlist(url, items, keep_raw):
+        snapshot.add(entry)
+    return snapshot
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import os
+import time
+from typing import IO, Any
+
+from ytdlplist.constants import DEFAULT_METRICS_FLUSH
+
+# Upper bounds, in seconds, of the histogram buckets.
+BUCKETS: tuple[float, ...] = (0.05, 0.25, 1, 2.5, 5, 10, 30, 60, 120, 300, 900)
+
+LabelSet = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """
+    Cumulative histogram in the Prometheus sense.
+
+    Attributes
+    ----------
+    counts : list[int]
+        Number of observations at or below each bucket bound.
+
+    total : float
+        Sum of all observations.
+
+    count : int
+        Number of observations.
+    """
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self) -> None:
+        self.counts: list[int] = [0] * len(BUCKETS)
+        self.total: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class RunMetrics:
+    """
+    Counters, gauges, histograms and per-track events for a download run.
+
+    Events are appended to a JSON lines file as they happen. Counters, gauges
+    and histograms can be rendered in the Prometheus text format, written to a
+    file (for node_exporter's textfile collector, say) or served over HTTP.
+
+    Attributes
+    ----------
+    jsonl_path : str | None
+        File that events are appended to.
+
+    prometheus_path : str | None
+        File that the Prometheus text format is written to.
+
+    flush_interval : float
+        Minimum number of seconds between rewrites of the Prometheus file.
+    """
+
+    def __init__(
+        self,
+        jsonl_path: str | None = None,
+        prometheus_path: str | None = None,
+        flush_interval: float = DEFAULT_METRICS_FLUSH,
+    ) -> None:
+        self.jsonl_path: str | None = jsonl_path
+        self.prometheus_path: str | None = prometheus_path
+        self.flush_interval: float = flush_interval
+        self.counters: dict[tuple[str, LabelSet], float] = {}
+        self.gauges: dict[tuple[str, LabelSet], float] = {}
+        self.histograms: dict[tuple[str, LabelSet], Histogram] = {}
+        self.started_at: float = time.time()
+        self._fp: IO[str] | None = None
+        self._flushed_at: float = 0.0
+        self._server: asyncio.Server | None = None
+        if jsonl_path:
+            os.makedirs(os.path.dirname(os.path.abspath(jsonl_path)), exist_ok=True)
+            self._fp = open(jsonl_path, "a", buffering=1)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """
+        Add to a counter.
+
+        Parameters
+        ----------
+        name : str
+            Metric name.
+        value : float, optional
+            Amount to add, by default 1
+        **labels : str
+            Metric labels.
+        """
+        key: tuple[str, LabelSet] = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """
+        Set a gauge.
+
+        Parameters
+        ----------
+        name : str
+            Metric name.
+        value : float
+            Current value.
+        **labels : str
+            Metric labels.
+        """
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Record a duration in a histogram.
+
+        Parameters
+        ----------
+        name : str
+            Metric name.
+        value : float
+            Observed value, in seconds.
+        **labels : str
+            Metric labels.
+        """
+        key: tuple[str, LabelSet] = (name, tuple(sorted(labels.items())))
+        if key not in self.histograms:
+            self.histograms[key] = Histogram()
+        self.histograms[key].observe(value)
+
+    def event(self, kind: str, **fields: Any) -> None:
+        """
+        Append an event to the JSON lines file.
+
+        Parameters
+        ----------
+        kind : str
+            Event type, such as ``"track"`` or ``"playlist"``.
+        **fields : Any
+            Event fields.
+        """
+        if self._fp is not None:
+            record: dict[str, Any] = {"event": kind, "ts": round(time.time(), 3)}
+            record.update(fields)
+            self._fp.write(json.dumps(record, separators=(",", ":")) + "\n")
+        if (
+            self.prometheus_path
+            and time.monotonic() - self._flushed_at >= self.flush_interval
+        ):
+            self.write_prometheus()
+
+    def render(self) -> str:
+        """
+        Render every counter, gauge and histogram in the Prometheus text format.
+
+        Returns
+        -------
+        str
+            Exposition text.
+        """
+        lines: list[str] = []
+        typed: set[str] = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels(labels)} {value:g}")
+        for (name, labels), value in sorted(self.gauges.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} gauge")
+                typed.add(name)
+            lines.append(f"{name}{_labels(labels)} {value:g}")
+        for (name, labels), hist in sorted(self.histograms.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            for bound, count in zip(BUCKETS, hist.counts):
+                lines.append(
+                    f"{name}_bucket{_labels(labels + (('le', f'{bound:g}'),))} {count}"
+                )
+            lines.append(
+                f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {hist.count}"
+            )
+            lines.append(f"{name}_sum{_labels(labels)} {hist.total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+        lines.append("# TYPE ytdlplist_run_start_time_seconds gauge")
+        lines.append(f"ytdlplist_run_start_time_seconds {self.started_at:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self) -> None:
+        """
+        Atomically rewrite the Prometheus file, if one is configured.
+        """
+        self._flushed_at = time.monotonic()
+        if not self.prometheus_path:
+            return
+        tmp_path: str = f"{self.prometheus_path}.tmp"
+        with open(tmp_path, "w") as fp:
+            fp.write(self.render())
+        os.replace(tmp_path, self.prometheus_path)
+
+    async def serve(self, port: int, host: str = "127.0.0.1") -> None:
+        """
+        Serve the Prometheus text format over HTTP until ``close`` is called.
+
+        Parameters
+        ----------
+        port : int
+            TCP port to listen on.
+        host : str, optional
+            Address to listen on, by default "127.0.0.1"
+        """
+
+        async def handle(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                writer.close()
+                return
+            body: bytes = self.render().encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4\r\n"
+                + f"Content-Length: {len(body)}\r\n".encode()
+                + b"Connection: close\r\n\r\n"
+                + body
+            )
+            await writer.drain()
+            writer.close()
+
+        self._server = await asyncio.start_server(handle, host, port)
+
+    def close(self) -> None:
+        """
+        Write the final Prometheus file and close every output.
+        """
+        if self.prometheus_path:
+            self.write_prometheus()
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+
+def _labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
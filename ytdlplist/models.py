@@ -0,0 +1,149 @@
+import sys
+from typing import Any
+
+
+class TrackEntry:
+    """
+    The parts of a flat-playlist entry that the pipeline uses.
+
+    yt-dlp reports dozens of keys per entry (thumbnails, uploader details and
+    so on). Only the fields below are kept, unless ``raw`` is requested.
+
+    Attributes
+    ----------
+    id : str
+        YouTube video ID.
+
+    title : str
+        Track title.
+
+    duration : float | None
+        Duration in seconds, if known.
+
+    playlist_id : str | None
+        ID of the playlist the entry was listed in.
+
+    playlist_title : str | None
+        Title of the playlist the entry was listed in.
+
+    raw : dict[str, Any] | None
+        The original JSON object, only kept when asked for.
+    """
+
+    __slots__ = ("id", "title", "duration", "playlist_id", "playlist_title", "raw")
+
+    def __init__(
+        self,
+        id: str,
+        title: str | None = None,
+        duration: float | None = None,
+        playlist_id: str | None = None,
+        playlist_title: str | None = None,
+        raw: dict[str, Any] | None = None,
+    ) -> None:
+        self.id: str = id
+        self.title: str = title or id
+        self.duration: float | None = duration
+        self.playlist_id: str | None = playlist_id
+        self.playlist_title: str | None = playlist_title
+        self.raw: dict[str, Any] | None = raw
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any], keep_raw: bool = False) -> "TrackEntry":
+        """
+        Build an entry from a yt-dlp JSON object.
+
+        Playlist IDs and titles repeat on every entry, so they are interned and
+        shared between entries.
+
+        Parameters
+        ----------
+        data : dict[str, Any]
+            Flat-playlist JSON object. Must contain ``id``.
+        keep_raw : bool, optional
+            Whether to keep the whole JSON object on the entry, by default False
+
+        Returns
+        -------
+        TrackEntry
+            The parsed entry.
+        """
+        playlist_id: str | None = data.get("playlist_id")
+        playlist_title: str | None = data.get("playlist_title")
+        return cls(
+            id=data["id"],
+            title=data.get("title"),
+            duration=data.get("duration"),
+            playlist_id=sys.intern(playlist_id) if playlist_id else None,
+            playlist_title=sys.intern(playlist_title) if playlist_title else None,
+            raw=data if keep_raw else None,
+        )
+
+    def to_json(self) -> dict[str, Any]:
+        """
+        Serialize the fields worth caching.
+
+        Returns
+        -------
+        dict[str, Any]
+            ``id``, ``title`` and, when known, ``duration``.
+        """
+        data: dict[str, Any] = {"id": self.id, "title": self.title}
+        if self.duration is not None:
+            data["duration"] = self.duration
+        return data
+
+    def __repr__(self) -> str:
+        return f"TrackEntry(id={self.id!r}, title={self.title!r})"
+
+
+class PlaylistSnapshot:
+    """
+    A playlist's ID, title and entries at one point in time.
+
+    Attributes
+    ----------
+    id : str | None
+        Playlist ID.
+
+    title : str | None
+        Playlist title.
+
+    entries : list[TrackEntry]
+        Tracks, in playlist order.
+
+    refreshes : int
+        Incremental refreshes since the playlist was last fetched in full.
+    """
+
+    __slots__ = ("id", "title", "entries", "refreshes")
+
+    def __init__(
+        self,
+        id: str | None = None,
+        title: str | None = None,
+        entries: list[TrackEntry] | None = None,
+        refreshes: int = 0,
+    ) -> None:
+        self.id: str | None = id
+        self.title: str | None = title
+        self.entries: list[TrackEntry] = entries or []
+        self.refreshes: int = refreshes
+
+    def add(self, entry: TrackEntry) -> None:
+        """
+        Append an entry, taking the playlist ID and title from it if unknown.
+
+        Parameters
+        ----------
+        entry : TrackEntry
+            Track to append.
+        """
+        if self.id is None and entry.playlist_id:
+            self.id = entry.playlist_id
+        if self.title is None and entry.playlist_title:
+            self.title = entry.playlist_title
+        self.entries.append(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,584 @@
+import asyncio
+import os
+import re
+from subprocess import CalledProcessError
+
+from yt_dlp.utils import sanitize_filename
+
+from ytdlplist.archive import DownloadArchive
+from ytdlplist.constants import (
+    DARK,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_INTERVAL,
+    DEFAULT_METADATA_CONCURRENCY,
+    DEFAULT_PLAN_AUDIO_BITRATE,
+    DEFAULT_PLAN_BANDWIDTH,
+    DEFAULT_PLAN_DURATION,
+    DEFAULT_PLAN_OVERHEAD,
+    DEFAULT_PLAN_VIDEO_BITRATE,
+    GREEN,
+    MAGENTA,
+    RED,
+    RESET,
+    YELLOW,
+)
+from ytdlplist.models import PlaylistSnapshot, TrackEntry
+from ytdlplist.playlist_util import Playlist
+from ytdlplist.progress import ProgressView
+from ytdlplist.scheduler import DownloadJob, DownloadScheduler
+from ytdlplist.store import TrackStore, safe_filename
+
+# What a planned track needs.
+DOWNLOAD = "download"
+LINK = "link"
+PRESENT = "present"
+DEFERRED = "deferred"
+
+# "<title> [<id>].<ext>", the name TrackStore.link gives a track when another
+# track already has its title.
+_LINKED_NAME = re.compile(r"^(?P<name>.*) \[(?P<id>[\w-]+)\]\.(?P<ext>\w+)$")
+
+
+class DirectoryIndex:
+    """
+    Names of the files in directories, each listed with one scan on first use.
+
+    Checking a playlist's tracks against a listing takes a set lookup per
+    track instead of an ``os.path.exists`` call per file name.
+    """
+
+    def __init__(self) -> None:
+        self._names: dict[str, frozenset[str]] = {}
+
+    def names(self, path: str) -> frozenset[str]:
+        """
+        Get the names in a directory.
+
+        Parameters
+        ----------
+        path : str
+            Directory.
+
+        Returns
+        -------
+        frozenset[str]
+            Names of its entries, or an empty set if it does not exist.
+        """
+        names: frozenset[str] | None = self._names.get(path)
+        if names is None:
+            try:
+                with os.scandir(path) as entries:
+                    names = frozenset(entry.name for entry in entries)
+            except OSError:
+                names = frozenset()
+            self._names[path] = names
+        return names
+
+    def has_track(
+        self, output_dir: str, video_id: str, title: str, output_ext: str
+    ) -> bool:
+        """
+        Check whether a playlist directory holds a track, under either of the
+        names TrackStore.link gives it or the one yt-dlp's ``%(title)s``
+        output template gives it.
+        """
+        names: frozenset[str] = self.names(output_dir)
+        name: str = safe_filename(title)
+        return (
+            f"{name}.{output_ext}" in names
+            or f"{name} [{video_id}].{output_ext}" in names
+            or f"{sanitize_filename(title)}.{output_ext}" in names
+        )
+
+    def linked_tracks(self, output_dir: str, output_ext: str) -> dict[str, str]:
+        """
+        Find the tracks in a playlist directory whose file name carries their
+        video ID.
+
+        Returns
+        -------
+        dict[str, str]
+            File name without the ID and extension, keyed by video ID.
+        """
+        tracks: dict[str, str] = {}
+        for name in self.names(output_dir):
+            match: re.Match[str] | None = _LINKED_NAME.match(name)
+            if match is not None and match["ext"] == output_ext:
+                tracks[match["id"]] = match["name"]
+        return tracks
+
+    def in_store(
+        self, store: TrackStore, video_id: str, output_ext: str, audio_only: bool
+    ) -> bool:
+        """
+        Check whether a track is in the store.
+        """
+        path: str = store.path(video_id, output_ext, audio_only)
+        return os.path.basename(path) in self.names(os.path.dirname(path))
+
+
+class PlannedTrack:
+    """
+    A playlist entry and what the sync has to do for it.
+
+    Attributes
+    ----------
+    entry : TrackEntry
+        Playlist entry.
+
+    position : int
+        Position in the playlist, starting at 1.
+
+    action : str
+        DOWNLOAD, LINK from the store, PRESENT on disk already, or DEFERRED
+        to a later run by the playlist's track limit.
+
+    size : float
+        Estimated download size in bytes; 0 unless the track is downloaded.
+    """
+
+    __slots__ = ("entry", "position", "action", "size")
+
+    def __init__(
+        self, entry: TrackEntry, position: int, action: str, size: float = 0.0
+    ) -> None:
+        self.entry: TrackEntry = entry
+        self.position: int = position
+        self.action: str = action
+        self.size: float = size
+
+
+class PlaylistPlan:
+    """
+    The difference between a playlist and its directory on disk.
+
+    Attributes
+    ----------
+    playlist : Playlist
+        The playlist, with its title settled.
+
+    output_dir : str
+        Playlist directory.
+
+    tracks : list[PlannedTrack]
+        Every entry of the playlist, in order.
+
+    removed : list[TrackEntry]
+        Tracks synced to the directory before that the playlist no longer
+        lists. Their files are left alone.
+
+    renamed : list[tuple[TrackEntry, str]]
+        Entries whose file on disk is named after an older title, with that
+        name. Their files keep the old name.
+
+    error : str | None
+        Why the playlist could not be enumerated, if it could not.
+    """
+
+    def __init__(self, playlist: Playlist, output_dir: str = "") -> None:
+        self.playlist: Playlist = playlist
+        self.output_dir: str = output_dir
+        self.tracks: list[PlannedTrack] = []
+        self.removed: list[TrackEntry] = []
+        self.renamed: list[tuple[TrackEntry, str]] = []
+        self.error: str | None = None
+
+    def count(self, action: str) -> int:
+        """
+        Count the tracks with an action.
+        """
+        return sum(track.action == action for track in self.tracks)
+
+
+class SyncPlan:
+    """
+    What a sync of several playlists will do, worked out before it starts.
+
+    Attributes
+    ----------
+    playlists : list[PlaylistPlan]
+        One plan per playlist, in input order.
+
+    audio_only : bool
+        Whether only audio is downloaded.
+
+    output_ext : str
+        Output file extension.
+    """
+
+    def __init__(
+        self,
+        playlists: list[PlaylistPlan],
+        audio_only: bool = True,
+        output_ext: str = "mp3",
+    ) -> None:
+        self.playlists: list[PlaylistPlan] = playlists
+        self.audio_only: bool = audio_only
+        self.output_ext: str = output_ext
+
+    def count(self, action: str) -> int:
+        """
+        Count the tracks with an action across every playlist.
+        """
+        return sum(plan.count(action) for plan in self.playlists)
+
+    @property
+    def size(self) -> float:
+        """
+        Estimated bytes to download.
+        """
+        return sum(t.size for plan in self.playlists for t in plan.tracks)
+
+    def seconds(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        interval: float = DEFAULT_INTERVAL,
+        bandwidth: float = DEFAULT_PLAN_BANDWIDTH,
+    ) -> float:
+        """
+        Estimate how long the downloads take.
+
+        Each download is assumed to take DEFAULT_PLAN_OVERHEAD seconds plus
+        its size at ``bandwidth``. Downloads run ``concurrency`` at a time,
+        and start no faster than the rate limiter's ``interval`` allows.
+
+        Parameters
+        ----------
+        concurrency : int, optional
+            Downloads at once, by default DEFAULT_CONCURRENCY
+        interval : float, optional
+            Average seconds between download starts, by default
+            DEFAULT_INTERVAL
+        bandwidth : float, optional
+            Bytes per second per download, by default DEFAULT_PLAN_BANDWIDTH
+
+        Returns
+        -------
+        float
+            Estimated seconds.
+        """
+        downloads: int = self.count(DOWNLOAD)
+        if not downloads:
+            return 0.0
+        work: float = downloads * DEFAULT_PLAN_OVERHEAD + self.size / bandwidth
+        # The rate limiter lets a burst of ``concurrency`` start at once.
+        paced: float = max(0, downloads - concurrency) * interval
+        return max(work / max(1, concurrency), paced)
+
+    def report(
+        self,
+        progress: ProgressView,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        interval: float = DEFAULT_INTERVAL,
+        verbose: bool = False,
+    ) -> None:
+        """
+        Show the plan.
+
+        Parameters
+        ----------
+        progress : ProgressView
+            Where to show it.
+        concurrency : int, optional
+            Downloads at once, for the time estimate, by default
+            DEFAULT_CONCURRENCY
+        interval : float, optional
+            Average seconds between download starts, for the time estimate,
+            by default DEFAULT_INTERVAL
+        verbose : bool, optional
+            Whether to list the tracks to download, removed and renamed, by
+            default only the counts
+        """
+        for plan in self.playlists:
+            title: str = plan.playlist.title
+            if plan.error is not None:
+                progress.log(
+                    f"  {YELLOW}[{RED}SKIP{YELLOW}] {RED}Error retrieving playlist information for playlist id {MAGENTA}{plan.playlist.id}{YELLOW}: {RED}{plan.error}{RESET}"
+                )
+                continue
+            deferred: int = plan.count(DEFERRED)
+            progress.log(
+                f"  {MAGENTA}{title}{YELLOW}: {GREEN}{plan.count(DOWNLOAD)} to download{YELLOW}, {plan.count(LINK)} to link from the store, {DARK}{plan.count(PRESENT)} on disk{YELLOW}, {len(plan.removed)} removed, {len(plan.renamed)} renamed"
+                + (f", {deferred} left for later runs" if deferred else "")
+                + f".{RESET}"
+            )
+            if not verbose:
+                continue
+            for track in plan.tracks:
+                if track.action in (DOWNLOAD, LINK):
+                    progress.log(
+                        f"    {GREEN}+ {track.entry.title}{DARK} ({track.action}){RESET}"
+                    )
+            for entry in plan.removed:
+                progress.log(f"    {RED}- {entry.title}{RESET}")
+            for entry, old_title in plan.renamed:
+                progress.log(
+                    f"    {YELLOW}~ {old_title}{DARK} -> {YELLOW}{entry.title}{RESET}"
+                )
+        seconds: float = self.seconds(concurrency, interval)
+        deferred = self.count(DEFERRED)
+        minutes, secs = divmod(round(seconds), 60)
+        progress.log(
+            f"{YELLOW}Plan: {GREEN}{self.count(DOWNLOAD)} tracks to download{YELLOW} (about {MAGENTA}{self.size / 1e6:.0f} MB{YELLOW} in {MAGENTA}{minutes // 60}:{minutes % 60:02d}:{secs:02d}{YELLOW}), {self.count(LINK)} to link from the store, {DARK}{self.count(PRESENT)} already on disk{YELLOW}"
+            + (f", {deferred} left for later runs" if deferred else "")
+            + f".{RESET}"
+        )
+
+    def enqueue(self, scheduler: DownloadScheduler, use_archive: bool = True) -> int:
+        """
+        Queue the tracks that need a download or a link, with their
+        playlist's policy. Tracks already on disk are counted as skipped in
+        the scheduler's results.
+
+        Parameters
+        ----------
+        scheduler : DownloadScheduler
+            Scheduler to submit the tracks to.
+        use_archive : bool, optional
+            Whether downloaded tracks are recorded in each playlist's
+            download archive, by default True
+
+        Returns
+        -------
+        int
+            Number of tracks queued.
+        """
+        queued: int = 0
+        for plan in self.playlists:
+            archive: DownloadArchive | None = (
+                DownloadArchive.for_directory(plan.output_dir) if use_archive else None
+            )
+            scheduler.set_policy(plan.output_dir, plan.playlist.policy)
+            for track in plan.tracks:
+                if track.action == PRESENT:
+                    scheduler.results["skipped"] += 1
+                if track.action not in (DOWNLOAD, LINK):
+                    continue
+                queued += scheduler.submit(
+                    DownloadJob(
+                        video_id=track.entry.id,
+                        title=track.entry.title,
+                        output_dir=plan.output_dir,
+                        audio_only=self.audio_only,
+                        output_ext=self.output_ext,
+                        position=track.position,
+                        total=len(plan.tracks),
+                        archive=archive,
+                    )
+                )
+        return queued
+
+
+def diff_directory(
+    plan: PlaylistPlan,
+    entries: list[TrackEntry],
+    previous: PlaylistSnapshot | None,
+    archive: DownloadArchive | None,
+    index: DirectoryIndex,
+    output_ext: str,
+) -> None:
+    """
+    Fill in a plan's removed and renamed tracks from its directory.
+
+    Parameters
+    ----------
+    plan : PlaylistPlan
+        Plan of the playlist, with its tracks.
+    entries : list[TrackEntry]
+        Entries the playlist lists now.
+    previous : PlaylistSnapshot | None
+        Cached listing from before the playlist was enumerated, if any, for
+        the titles files were named after.
+    archive : DownloadArchive | None
+        Download archive of the directory, if one is used.
+    index : DirectoryIndex
+        Listings of the playlist directory.
+    output_ext : str
+        Output file extension.
+    """
+    output_dir: str = plan.output_dir
+    linked: dict[str, str] = index.linked_tracks(output_dir, output_ext)
+    old_titles: dict[str, str] = (
+        {old.id: old.title for old in previous.entries} if previous else {}
+    )
+
+    def on_disk(video_id: str, title: str | None) -> bool:
+        return title is not None and index.has_track(
+            output_dir, video_id, title, output_ext
+        )
+
+    synced: set[str] = set(linked)
+    if archive is not None:
+        synced.update(archive)
+    synced.update(
+        video_id for video_id, title in old_titles.items() if on_disk(video_id, title)
+    )
+    current: set[str] = {entry.id for entry in entries}
+    for video_id in sorted(synced - current):
+        plan.removed.append(
+            TrackEntry(video_id, old_titles.get(video_id) or linked.get(video_id))
+        )
+    for entry in entries:
+        if entry.id not in synced or on_disk(entry.id, entry.title):
+            continue
+        old_name: str | None = linked.get(entry.id)
+        old_title: str | None = old_titles.get(entry.id)
+        if (
+            old_name is None
+            and old_title != entry.title
+            and on_disk(entry.id, old_title)
+        ):
+            old_name = old_title
+        if old_name is not None:
+            plan.renamed.append((entry, old_name))
+
+
+def estimate_size(entry: TrackEntry, audio_only: bool, duration: float) -> float:
+    """
+    Estimate how many bytes a track's download takes.
+
+    Parameters
+    ----------
+    entry : TrackEntry
+        Playlist entry.
+    audio_only : bool
+        Whether only the audio is downloaded.
+    duration : float
+        Seconds to assume when the entry's duration is unknown.
+
+    Returns
+    -------
+    float
+        Estimated bytes.
+    """
+    bitrate: float = (
+        DEFAULT_PLAN_AUDIO_BITRATE if audio_only else DEFAULT_PLAN_VIDEO_BITRATE
+    )
+    return (entry.duration or duration) * bitrate / 8
+
+
+async def build_plan(
+    playlists: list[Playlist],
+    output_root: str,
+    store: TrackStore | None = None,
+    use_archive: bool = True,
+    title_lookup: bool = True,
+    audio_only: bool = True,
+    output_ext: str = "mp3",
+) -> SyncPlan:
+    """
+    Enumerate playlists and work out what syncing them would do.
+
+    Playlists are enumerated through their metadata cache, as a sync would
+    enumerate them. Each entry is then checked, in this order, against the
+    playlist's download archive, one scan of the playlist directory and one
+    scan of the store shard it would be stored in. A track listed in several
+    playlists is downloaded once when a store is used, and linked elsewhere.
+    Tracks past a playlist's ``max_tracks`` are deferred to later runs.
+
+    Removed and renamed tracks are found against what the directory holds,
+    since the cache may hold the very listing that was just enumerated:
+    tracks in the download archive, files named with their video ID and
+    files named after a title the cache had before enumeration. Those the
+    playlist no longer lists are reported as removed, and those on disk only
+    under another name as renamed. Each playlist's entries are kept in its
+    ``json``, for playlist files.
+
+    Parameters
+    ----------
+    playlists : list[Playlist]
+        Playlists to plan, with their backend and cache.
+    output_root : str
+        Directory that holds one subdirectory per playlist.
+    store : TrackStore | None, optional
+        Shared store, if tracks are downloaded into one, by default None
+    use_archive : bool, optional
+        Whether tracks recorded in a download archive count as present, by
+        default True
+    title_lookup : bool, optional
+        Whether to fall back to a separate yt-dlp title lookup, by default
+        True
+    audio_only : bool, optional
+        Whether only audio is downloaded, by default True
+    output_ext : str, optional
+        Output file extension, by default "mp3"
+
+    Returns
+    -------
+    SyncPlan
+        The plan, with one PlaylistPlan per playlist in input order.
+    """
+    slots = asyncio.Semaphore(DEFAULT_METADATA_CONCURRENCY)
+
+    async def enumerate_playlist(
+        playlist: Playlist,
+    ) -> tuple[PlaylistPlan, list[TrackEntry], PlaylistSnapshot | None]:
+        plan = PlaylistPlan(playlist)
+        previous: PlaylistSnapshot | None = (
+            playlist.cache.get(playlist.id) if playlist.cache else None
+        )
+        entries: list[TrackEntry] = []
+        async with slots:
+            try:
+                async for entry in playlist.iter_entries(title_lookup=title_lookup):
+                    entries.append(entry)
+            except CalledProcessError as e:
+                plan.error = str(e)
+        playlist.json = entries
+        plan.output_dir = playlist.output_dir(output_root)
+        return plan, entries, previous
+
+    enumerated = await asyncio.gather(*(enumerate_playlist(p) for p in playlists))
+    known: list[float] = [
+        entry.duration
+        for _, entries, _ in enumerated
+        for entry in entries
+        if entry.duration
+    ]
+    duration: float = sum(known) / len(known) if known else DEFAULT_PLAN_DURATION
+    index = DirectoryIndex()
+    planned: set[str] = set()
+    plans: list[PlaylistPlan] = []
+    for plan, entries, previous in enumerated:
+        plans.append(plan)
+        if plan.error is not None:
+            continue
+        archive: DownloadArchive | None = (
+            DownloadArchive.for_directory(plan.output_dir) if use_archive else None
+        )
+        limit: int | None = plan.playlist.policy.max_tracks
+        queued: int = 0
+        for position, entry in enumerate(entries, start=1):
+            action: str
+            if (archive is not None and entry.id in archive) or index.has_track(
+                plan.output_dir, entry.id, entry.title, output_ext
+            ):
+                action = PRESENT
+            elif store is not None and (
+                entry.id in planned
+                or index.in_store(store, entry.id, output_ext, audio_only)
+            ):
+                action = LINK
+            else:
+                action = DOWNLOAD
+            if action != PRESENT:
+                if limit is not None and queued >= limit:
+                    action = DEFERRED
+                else:
+                    queued += 1
+            if action == DOWNLOAD:
+                planned.add(entry.id)
+            plan.tracks.append(
+                PlannedTrack(
+                    entry,
+                    position,
+                    action,
+                    (
+                        estimate_size(entry, audio_only, duration)
+                        if action == DOWNLOAD
+                        else 0.0
+                    ),
+                )
+            )
+        diff_directory(plan, entries, previous, archive, index, output_ext)
+    return SyncPlan(plans, audio_only, output_ext)
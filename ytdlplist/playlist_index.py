@@ -0,0 +1,182 @@
+import re
+from typing import Any, Iterable
+
+# Playlist URLs on YouTube and YouTube Music, with the list parameter in any
+# position of the query string.
+_URL = re.compile(
+    r"https?://(?:(?:www|m|music)\.)?(?:youtube\.com|youtu\.be)/[^?#]*\?"
+    r"(?:[^#]*?&)?list=(?P<id>[A-Za-z0-9_-]+)",
+    re.IGNORECASE,
+)
+# Bare playlist IDs, by the prefixes YouTube gives its playlist kinds.
+_ID = re.compile(r"(?:PL|UU|LL|FL|RD|OL|UL)[A-Za-z0-9_-]{6,}")
+
+
+def normalize_playlist(value: str) -> str | None:
+    """
+    Get the playlist ID from a playlist URL or a bare playlist ID.
+
+    Parameters
+    ----------
+    value : str
+        Playlist URL, on www, m or music.youtube.com, or playlist ID.
+
+    Returns
+    -------
+    str | None
+        Playlist ID, or None if the value is neither.
+    """
+    value = value.strip()
+    match: re.Match[str] | None = _URL.match(value)
+    if match is not None:
+        return match.group("id")
+    if _ID.fullmatch(value):
+        return value
+    return None
+
+
+def playlist_url(playlist_id: str) -> str:
+    """
+    Get the canonical URL of a playlist.
+
+    Parameters
+    ----------
+    playlist_id : str
+        Playlist ID.
+
+    Returns
+    -------
+    str
+        ``https://www.youtube.com/playlist?list=<id>``.
+    """
+    return f"https://www.youtube.com/playlist?list={playlist_id}"
+
+
+class PlaylistIndex:
+    """
+    Playlists keyed by ID, and the playlists each known video is listed in.
+
+    Inputs are normalized to playlist IDs as they are added, so the same
+    playlist written as a music.youtube.com URL, with extra query parameters
+    or as a bare ID is kept once, in the order it was first seen.
+
+    Attributes
+    ----------
+    urls : dict[str, str]
+        Canonical URL of each playlist, keyed by ID, in input order.
+
+    duplicates : int
+        Number of inputs that named a playlist already in the index.
+
+    invalid : list[str]
+        Inputs that are not playlist URLs or IDs.
+    """
+
+    def __init__(self) -> None:
+        self.urls: dict[str, str] = {}
+        self.duplicates: int = 0
+        self.invalid: list[str] = []
+        self._tracks: dict[str, list[str]] = {}
+
+    @classmethod
+    def from_inputs(cls, inputs: Iterable[str | dict[str, Any]]) -> "PlaylistIndex":
+        """
+        Build an index from playlists.json entries.
+
+        Parameters
+        ----------
+        inputs : Iterable[str | dict[str, Any]]
+            Playlist URLs or IDs, or objects with a ``url`` key.
+
+        Returns
+        -------
+        PlaylistIndex
+            The index.
+        """
+        index = cls()
+        for value in inputs:
+            if isinstance(value, dict):
+                value = value.get("url", "")
+            index.add(value)
+        return index
+
+    def add(self, value: str) -> str | None:
+        """
+        Add a playlist.
+
+        Parameters
+        ----------
+        value : str
+            Playlist URL or ID.
+
+        Returns
+        -------
+        str | None
+            Playlist ID if the playlist was added, or None if it is invalid or
+            already in the index.
+        """
+        playlist_id: str | None = (
+            normalize_playlist(value) if isinstance(value, str) else None
+        )
+        if playlist_id is None:
+            self.invalid.append(str(value))
+            return None
+        if playlist_id in self.urls:
+            self.duplicates += 1
+            return None
+        self.urls[playlist_id] = playlist_url(playlist_id)
+        return playlist_id
+
+    def add_tracks(self, playlist_id: str, video_ids: Iterable[str]) -> None:
+        """
+        Record the videos listed in a playlist. Call it once per playlist.
+
+        Parameters
+        ----------
+        playlist_id : str
+            Playlist ID.
+        video_ids : Iterable[str]
+            IDs of the playlist's videos.
+        """
+        tracks: dict[str, list[str]] = self._tracks
+        for video_id in video_ids:
+            listed: list[str] | None = tracks.get(video_id)
+            if listed is None:
+                tracks[video_id] = [playlist_id]
+            elif listed[-1] != playlist_id:
+                listed.append(playlist_id)
+
+    def playlists_of(self, video_id: str) -> list[str]:
+        """
+        Get the IDs of the playlists a video is known to be listed in.
+
+        Parameters
+        ----------
+        video_id : str
+            Video ID.
+
+        Returns
+        -------
+        list[str]
+            Playlist IDs, in the order they were recorded.
+        """
+        return self._tracks.get(video_id, [])
+
+    def shared(self) -> dict[str, list[str]]:
+        """
+        Get the videos listed in more than one playlist.
+
+        Returns
+        -------
+        dict[str, list[str]]
+            IDs of the playlists each shared video is listed in, keyed by
+            video ID.
+        """
+        return {
+            video_id: listed
+            for video_id, listed in self._tracks.items()
+            if len(listed) > 1
+        }
+
+    def __len__(self) -> int:
+        return len(self.urls)
@@ -1,13 +1,29 @@
-import asyncio
-import json
-import re
-import subprocess
-import time
+import os
 from subprocess import CalledProcessError
-from typing import Any, Callable, Coroutine
-
-from ytdlplist.constants import DARK, GREEN, MAGENTA, RED, RESET, WHITE, YELLOW
-from ytdlplist.utils import ensure_valid_destination
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Coroutine
+
+from ytdlplist.archive import DownloadArchive
+from ytdlplist.backends import Backend, CliBackend
+from ytdlplist.cache import MetadataCache, fetch_incremental
+from ytdlplist.constants import (
+    DARK,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_INTERVAL,
+    GREEN,
+    MAGENTA,
+    RED,
+    RESET,
+    YELLOW,
+)
+from ytdlplist.fairqueue import PlaylistPolicy
+from ytdlplist.models import PlaylistSnapshot, TrackEntry
+from ytdlplist.playlist_index import PlaylistIndex, normalize_playlist, playlist_url
+from ytdlplist.progress import ProgressView
+from ytdlplist.scheduler import DownloadJob, DownloadScheduler
+from ytdlplist.utils import check_output_async, executable
+
+if TYPE_CHECKING:
+    from ytdlplist.workqueue import WorkQueue
 
 
 class Playlist:
@@ -25,49 +41,93 @@ class Playlist:
     title : str
         Playlist title.
 
-    json : list[dict[str, str]] | None
-        List of JSON objects from the playlist.
+    json : list[TrackEntry] | None
+        Entries of the playlist.
 
     audio_player : Callable[..., Coroutine[Any, Any, None]]
         Coroutine to play a sound file.
 
+    backend : Backend
+        Engine used to run yt-dlp, by default a CliBackend.
+
+    cache : MetadataCache | None
+        Metadata cache consulted before fetching the playlist, if any.
+
+    incremental : bool
+        Whether stale cached playlists are refreshed by fetching only new
+        entries at the head of the playlist.
+
+    progress : ProgressView
+        Where progress messages are shown, by default as plain lines.
+
+    policy : PlaylistPolicy
+        Priority, weight and track limit of the playlist's downloads.
+
     Methods
     -------
     is_valid_plist_url(url: str) -> bool
         Check if a URL is a valid YouTube playlist URL.
 
     validate_playlists(input_playlists: list[str]) -> list[str]
-        Remove duplicate playlists from a list.
+        Remove duplicate and invalid playlists from a list.
 
     get_title() -> str
         Get the title of a YouTube playlist using yt-dlp.
 
-    get_playlist_id() -> str
-        Get the ID of a YouTube playlist from a URL.
-
-    get_json_from_playlist() -> list[dict[str, str]]
-        Get a list of JSON objects from a YouTube playlist using yt-dlp.
+    get_json_from_playlist() -> list[TrackEntry]
+        Get the entries of a YouTube playlist using yt-dlp.
     """
 
     def __init__(
-        self, url: str, audio_player: Callable[..., Coroutine[Any, Any, None]]
+        self,
+        url: str,
+        audio_player: Callable[..., Coroutine[Any, Any, None]],
+        backend: Backend | None = None,
+        cache: MetadataCache | None = None,
+        incremental: bool = True,
+        progress: ProgressView | None = None,
+        policy: PlaylistPolicy | None = None,
     ) -> None:
-        self.url: str = url.strip().replace("//music.youtube.", "//www.youtube.")
-        if "&" in self.url:
-            self.url = self.url.split("&")[0]
-        self.id: str = self.get_playlist_id()
+        playlist_id: str | None = normalize_playlist(url)
+        if playlist_id is None:
+            raise ValueError("Invalid playlist URL.")
+        self.url: str = playlist_url(playlist_id)
+        self.id: str = playlist_id
         self.audio_player: Callable[..., Coroutine[Any, Any, None]] = audio_player
-        self.json: list[dict[str, str]] | None = None
+        self.backend: Backend = backend or CliBackend()
+        self.cache: MetadataCache | None = cache
+        self.incremental: bool = incremental
+        self.progress: ProgressView = progress or ProgressView()
+        self.policy: PlaylistPolicy = policy or PlaylistPolicy()
+        self.json: list[TrackEntry] | None = None
+        self.title: str = self.id
+        self._title_found: bool = False
+        super().__init__()
+
+    async def async_init(self, title_lookup: bool = True):
+        """
+        Fetch the playlist entries and title.
+
+        The title is taken from the flat-playlist JSON, so a second yt-dlp
+        invocation is only needed when the entries do not carry it.
+
+        Parameters
+        ----------
+        title_lookup : bool, optional
+            Whether to fall back to a separate yt-dlp title lookup when the
+            entries do not include the title, by default True
+
+        Raises
+        ------
+        subprocess.CalledProcessError :
+            If an error occurs when running the yt-dlp command for the title.
+        """
         try:
-            self.json = self.get_json_from_playlist()
+            self.json = await self.get_json_from_playlist()
         except CalledProcessError:
             pass
-        super().__init__()
-
-    async def async_init(self):
-        title_task = asyncio.create_task(self.get_title())
-        await title_task
-        self.title: str = title_task.result()
+        if not self._title_found and title_lookup:
+            self.title = await self.get_title()
 
     async def get_title(self) -> str:
         """
@@ -88,107 +148,211 @@ class Playlist:
         subprocess.CalledProcessError :
             If an error occurs when running the yt-dlp command.
         """
-        if "https" in self.url:
-            url = self.url
-        else:
-            url = f"https://www.youtube.com/playlist?list={self.id}"
-        print(f"{YELLOW}Getting playlist title... ", end="", flush=True)
+        self.progress.log(
+            f"{YELLOW}Getting playlist title for {MAGENTA}{self.id}{YELLOW}...{RESET}"
+        )
         title: str = (
-            subprocess.check_output(
-                args=f"yt-dlp {url} --skip-download -I 1:1 --print playlist_title --quiet --no-warnings",
-                shell=True,
+            (
+                await check_output_async(
+                    [
+                        executable("yt-dlp"),
+                        self.url,
+                        "--skip-download",
+                        "-I",
+                        "1:1",
+                        "--print",
+                        "playlist_title",
+                        "--quiet",
+                        "--no-warnings",
+                    ],
+                    name="yt-dlp title",
+                )
             )
             .decode()
             .strip()
         )
-        print(
-            f"{GREEN}Done.",
-            "\n",
-            f"{YELLOW}Title: {MAGENTA}{title}{RESET}",
-            "\n",
-            sep="",
-            flush=True,
+        self.progress.log(
+            f"{YELLOW}Title for {MAGENTA}{self.id}{YELLOW}: {MAGENTA}{title}{RESET}"
         )
         return title
 
-    def get_playlist_id(self) -> str:
+    async def get_json_from_playlist(self) -> list[TrackEntry]:
         """
-        Get the ID of a YouTube playlist from a URL.
+        Get the entries of a YouTube playlist using yt-dlp.
+
+        The playlist title is updated from the same output when available.
 
         Returns
         -------
-        str
-            Playlist ID.
+        list[TrackEntry]
+            Entries of the playlist.
 
         Raises
         ------
-        ValueError :
-            If the URL is invalid.
+        subprocess.CalledProcessError :
+            If an error occurs when running the yt-dlp command.
         """
-        playlist_id_matches: re.Match[str] | None = re.search(
-            pattern=r"list=(?P<id>[a-zA-Z0-9_-]+)", string=self.url
+        snapshot: PlaylistSnapshot = await self.fetch_metadata(self.url)
+        if snapshot.title:
+            self.title = snapshot.title
+            self._title_found = True
+        self.progress.log(
+            f"  {YELLOW}Found {MAGENTA}{len(snapshot.entries)}{YELLOW} tracks in {MAGENTA}{self.title}{YELLOW}.{RESET}"
         )
-        if (
-            not playlist_id_matches
-            or not playlist_id_matches.group("id")
-            or type(playlist_id_matches.group("id")) is not str
-        ):
-            raise ValueError("Invalid playlist URL.")
-        else:
-            playlist_id: str = playlist_id_matches.group("id")
-            return playlist_id
+        return snapshot.entries
 
-    def get_json_from_playlist(self) -> list[dict[str, str]]:
+    async def fetch_metadata(self, url: str) -> PlaylistSnapshot:
         """
-        Get a list of JSON objects from a YouTube playlist using yt-dlp.
+        Get the playlist's metadata, using the metadata cache when possible.
+
+        Fresh cache entries are used as-is. Stale ones are refreshed
+        incrementally if enabled, otherwise the whole playlist is fetched.
+
+        Parameters
+        ----------
+        url : str
+            Playlist URL.
 
         Returns
         -------
-        list[dict[str, str]]
-            List of JSON objects from the playlist.
+        PlaylistSnapshot
+            The playlist's ID, title and entries.
 
         Raises
         ------
         subprocess.CalledProcessError :
             If an error occurs when running the yt-dlp command.
         """
-        if "https" in self.url:
-            url: str = self.url
-        else:
-            url = f"https://www.youtube.com/playlist?list={self.id}"
-        print(f"  {YELLOW}Downloading playlist information... ", end="", flush=True)
-        plist_data: list[str] = []
-        plist_data = (
-            subprocess.check_output(
-                f"yt-dlp -j --flat-playlist {url} --quiet --no-warnings",
-                shell=True,
+        cached: PlaylistSnapshot | None = (
+            self.cache.get(self.id) if self.cache else None
+        )
+        if cached and self.cache and self.cache.is_fresh(self.id):
+            self.progress.log(
+                f"  {YELLOW}Using cached playlist information for {MAGENTA}{self.id}{YELLOW}.{RESET}"
             )
-            .decode()
-            .split("\n")
+            return cached
+        self.progress.log(
+            f"  {YELLOW}Downloading playlist information for {MAGENTA}{self.id}{YELLOW}...{RESET}"
         )
-        playlist_entries: list[str] = [j.strip() for j in plist_data if j]
-        results_json: list[dict[str, Any]] = []
-        for entry in playlist_entries:
-            try:
-                results_json.append(json.loads(entry))
-            except json.JSONDecodeError:
-                continue
-        print(
-            f"{GREEN}Done.{RESET}",
-            f"  {YELLOW}Found {MAGENTA}{len(results_json)}{YELLOW} tracks.{RESET}",
-            "\n",
-            sep="",
-            end="\n",
-            flush=True,
+        if cached and self.incremental:
+            snapshot: PlaylistSnapshot = await fetch_incremental(
+                self.backend, url, cached
+            )
+        else:
+            snapshot = await self.backend.fetch_playlist(url)
+        if self.cache:
+            self.cache.put(self.id, snapshot)
+        return snapshot
+
+    async def iter_entries(
+        self, title_lookup: bool = True, keep_entries: bool = False
+    ) -> AsyncIterator[TrackEntry]:
+        """
+        Yield the playlist's entries as soon as they are available.
+
+        Uncached playlists are streamed from yt-dlp while it enumerates them.
+        The playlist title is settled before the first entry is yielded.
+
+        Parameters
+        ----------
+        title_lookup : bool, optional
+            Whether to fall back to a separate yt-dlp title lookup when the
+            entries do not include the title, by default True
+        keep_entries : bool, optional
+            Whether to keep the entries in ``json`` once they are all
+            yielded, by default False
+
+        Yields
+        ------
+        TrackEntry
+            Playlist entries, in playlist order.
+
+        Raises
+        ------
+        subprocess.CalledProcessError :
+            If an error occurs when running the yt-dlp command.
+        """
+        if self.cache and self.cache.get(self.id):
+            snapshot: PlaylistSnapshot = await self.fetch_metadata(self.url)
+            await self.settle_title(snapshot.title, title_lookup)
+            for entry in snapshot.entries:
+                yield entry
+            if keep_entries:
+                self.json = snapshot.entries
+            return
+        self.progress.log(
+            f"  {YELLOW}Streaming playlist information for {MAGENTA}{self.id}{YELLOW}...{RESET}"
         )
-        return results_json
+        # Entries are only retained when the cache or ``json`` needs them, and
+        # then in one list for both.
+        seen = PlaylistSnapshot(id=self.id)
+        keep: bool = bool(self.cache) or keep_entries
+        count: int = 0
+        async for entry in self.backend.iter_playlist(self.url):
+            if not count:
+                await self.settle_title(entry.playlist_title, title_lookup)
+                seen.title = self.title
+            count += 1
+            if keep:
+                seen.entries.append(entry)
+            yield entry
+        if self.cache:
+            self.cache.put(self.id, seen)
+        if keep_entries:
+            self.json = seen.entries
+        self.progress.log(
+            f"  {YELLOW}Found {MAGENTA}{count}{YELLOW} tracks in {MAGENTA}{self.title}{YELLOW}.{RESET}"
+        )
+
+    async def settle_title(self, title: str | None, title_lookup: bool = True) -> None:
+        """
+        Take the playlist title from fetched metadata.
+
+        Parameters
+        ----------
+        title : str | None
+            Title found in the metadata, if any.
+        title_lookup : bool, optional
+            Whether to fall back to a separate yt-dlp title lookup when no
+            title was found and none is known yet, by default True
+
+        Raises
+        ------
+        subprocess.CalledProcessError :
+            If an error occurs when running the yt-dlp command for the title.
+        """
+        if title:
+            self.title = title
+            self._title_found = True
+        elif title_lookup and not self._title_found:
+            self.title = await self.get_title()
+            self._title_found = True
+
+    def output_dir(self, output_root: str) -> str:
+        """
+        Get the playlist's output directory under a root directory.
+
+        Parameters
+        ----------
+        output_root : str
+            Directory that holds one subdirectory per playlist.
+
+        Returns
+        -------
+        str
+            Output directory, named after the playlist title.
+        """
+        return os.path.join(output_root, self.title.replace(" ", "_"))
 
     async def download(
         self,
         audio_only: bool = True,
         output_dir: str = ".",
         output_ext: str = "mp3",
-        interval: int = 30,
+        interval: float = DEFAULT_INTERVAL,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        use_archive: bool = True,
+        work_queue: "WorkQueue | None" = None,
     ) -> None:
         """
         Download all videos in a YouTube playlist using yt-dlp.
@@ -201,8 +365,17 @@ class Playlist:
             Output directory, by default "."
         output_ext : str, optional
             Output file extension, by default "mp3"
-        interval : int, optional
-            Interval between downloads in seconds, by default 30
+        interval : float, optional
+            Average interval between download starts per host in seconds,
+            by default DEFAULT_INTERVAL
+        concurrency : int, optional
+            Number of downloads to run at once, by default DEFAULT_CONCURRENCY
+        use_archive : bool, optional
+            Whether to skip tracks recorded in the output directory's download
+            archive, by default True
+        work_queue : WorkQueue | None, optional
+            Queue shared with other processes, to download the playlist
+            together with them, by default None
 
         Raises
         ------
@@ -212,123 +385,209 @@ class Playlist:
             If the output directory does not exist.
         """
         if self.json:
-            video_json: list[dict[str, str]] = self.json
+            video_json: list[TrackEntry] = self.json
         else:
             try:
-                video_json = self.get_json_from_playlist()
+                video_json = await self.get_json_from_playlist()
             except CalledProcessError as e:
                 raise ValueError(
                     f"  {YELLOW}[{RED}SKIP{YELLOW}] {RED}Error retrieving playlist information for playlist id {MAGENTA}{self.id}{YELLOW}: {RED}{e}{RESET}"
                 )
 
-        results: dict[str, int] = {"success": 0, "error": 0}
-        for i, video in enumerate(video_json):
-            progress = (
-                f"{WHITE}[{DARK}{i+1}{WHITE}/{DARK}{len(video_json)}{WHITE}]{RESET}"
-            )
-            print(
-                f"  {progress} {YELLOW}Downloading {MAGENTA}{video['title']}{YELLOW}... ",
-                end=RESET,
-                flush=True,
-            )
-
-            try:
-                _result: int = self.download_track(
-                    video_id=video["id"],
-                    audio_only=audio_only,
-                    output_dir=output_dir,
-                    output_ext=output_ext,
-                )
-                if _result > 0:
-                    await self.audio_player("failbeep.wav")
-                    results["error"] += 1
-                    continue
-                else:
-                    results["success"] += 1
-                    time.sleep(interval)
-                    await self.audio_player("successbeep.wav")
-                    print(f"{GREEN}Done.{RESET}")
-            except subprocess.CalledProcessError as e:
-                print(f"{RED}An error occurred:", e, RESET)
-                await self.audio_player("failbeep.wav")
-                results["error"] += 1
-                continue
-            except ChildProcessError as e:
-                print(f"{RED}An error occurred:", e, RESET)
-                await self.audio_player("failbeep.wav")
-                results["error"] += 1
-                continue
-            except OSError as e:
-                print(f"{RED}An error occurred:", e, RESET)
-                await self.audio_player("failbeep.wav")
-                results["error"] += 1
-                continue
+        scheduler = DownloadScheduler(
+            downloader=self.backend.download,
+            audio_player=self.audio_player,
+            concurrency=concurrency,
+            interval=interval,
+            work_queue=work_queue,
+            progress=self.progress,
+        )
+        opened: bool = self.progress.open()
+        scheduler.start()
+        self.enqueue(
+            scheduler,
+            audio_only=audio_only,
+            output_dir=output_dir,
+            output_ext=output_ext,
+            entries=video_json,
+            archive=DownloadArchive.for_directory(output_dir) if use_archive else None,
+        )
+        try:
+            results: dict[str, int] = await scheduler.join()
+        finally:
+            if opened:
+                await self.progress.close()
         await self.audio_player("slidebeep.wav")
         print(
-            f"{YELLOW}Downloaded {GREEN}{results['success']} tracks{YELLOW} with {RED}{results['error']} errors.{RESET}"
+            f"{YELLOW}Downloaded {GREEN}{results['success']} tracks{YELLOW} with {RED}{results['error']} errors{YELLOW}, skipped {DARK}{results['skipped']} already downloaded.{RESET}"
         )
 
-    @staticmethod
-    def download_track(
-        video_id: str,
+    def enqueue(
+        self,
+        scheduler: DownloadScheduler,
         audio_only: bool = True,
         output_dir: str = ".",
         output_ext: str = "mp3",
+        entries: list[TrackEntry] | None = None,
+        archive: DownloadArchive | None = None,
+        deferred: list[TrackEntry] | None = None,
     ) -> int:
         """
-        Download a single track from YouTube using yt-dlp.
+        Queue every track in the playlist on a download scheduler.
+
+        Tracks already recorded in the download archive are skipped without
+        invoking yt-dlp. No more than the policy's ``max_tracks`` are queued.
 
         Parameters
         ----------
-        video_id : str
-            YouTube video ID.
+        scheduler : DownloadScheduler
+            Scheduler to submit the tracks to.
         audio_only : bool, optional
             Whether to download only the audio, by default True
         output_dir : str, optional
             Output directory, by default "."
         output_ext : str, optional
             Output file extension, by default "mp3"
+        entries : list[TrackEntry] | None, optional
+            Playlist entries to queue, by default the fetched playlist JSON
+        archive : DownloadArchive | None, optional
+            Archive of tracks already downloaded to output_dir, by default None
+        deferred : list[TrackEntry] | None, optional
+            List that the entries left out by the track limit are appended
+            to, by default None
+
+        Returns
+        -------
+        int
+            Number of tracks queued.
+        """
+        video_json: list[TrackEntry] = entries or self.json or []
+        scheduler.set_policy(output_dir, self.policy)
+        queued: int = 0
+        for i, video in enumerate(video_json):
+            if self._capped(queued):
+                self._report_cap()
+                if deferred is not None:
+                    deferred.extend(video_json[i:])
+                break
+            queued += self._submit(
+                scheduler,
+                video,
+                position=i + 1,
+                total=len(video_json),
+                audio_only=audio_only,
+                output_dir=output_dir,
+                output_ext=output_ext,
+                archive=archive,
+            )
+        return queued
+
+    async def enqueue_streaming(
+        self,
+        scheduler: DownloadScheduler,
+        output_root: str,
+        audio_only: bool = True,
+        output_ext: str = "mp3",
+        use_archive: bool = True,
+        title_lookup: bool = True,
+        keep_entries: bool = False,
+    ) -> int:
+        """
+        Queue tracks on a download scheduler while the playlist is enumerated.
+
+        No more than the policy's ``max_tracks`` are queued; the playlist is
+        still enumerated to the end.
+
+        Parameters
+        ----------
+        scheduler : DownloadScheduler
+            Scheduler to submit the tracks to.
+        output_root : str
+            Directory that holds one subdirectory per playlist.
+        audio_only : bool, optional
+            Whether to download only the audio, by default True
+        output_ext : str, optional
+            Output file extension, by default "mp3"
+        use_archive : bool, optional
+            Whether to skip tracks recorded in the output directory's download
+            archive, by default True
+        title_lookup : bool, optional
+            Whether to fall back to a separate yt-dlp title lookup when the
+            entries do not include the title, by default True
+        keep_entries : bool, optional
+            Whether to keep the entries in ``json`` afterwards, by default
+            False
+
+        Returns
+        -------
+        int
+            Number of tracks queued.
 
         Raises
         ------
-        OSError :
-            If the output directory does not exist.
-        ChildProcessError :
-            If an error occurs when downloading the video.
         subprocess.CalledProcessError :
             If an error occurs when running the yt-dlp command.
         """
-        try:
-            ensure_valid_destination(output_dir)
-        except OSError as e:
-            print(f"{RED}An error occurred:", e, RESET)
-            return 1
-        video_url = f"https://www.youtube.com/watch?v={video_id}"
-
-        # Download the video
-        _args: list[str] = ["yt-dlp", video_url]
-        if audio_only:
-            _args.append("--extract-audio")
-            _args.append("--audio-format")
-            _args.append(output_ext)
-        else:
-            _args.append("--format")
-            _args.append(output_ext)
-        _args.append("--output")
-        _args.append(f"{output_dir}/%(title)s.%(ext)s")
-        _args.append("--quiet")
-        _args.append("--no-warnings")
-        try:
-            result: subprocess.CompletedProcess[bytes] = subprocess.run(
-                args=_args, capture_output=True
+        output_dir: str | None = None
+        archive: DownloadArchive | None = None
+        queued: int = 0
+        position: int = 0
+        capped: bool = False
+        async for video in self.iter_entries(title_lookup, keep_entries):
+            if output_dir is None:
+                output_dir = self.output_dir(output_root)
+                scheduler.set_policy(output_dir, self.policy)
+                if use_archive:
+                    archive = DownloadArchive.for_directory(output_dir)
+            position += 1
+            if self._capped(queued):
+                if not capped:
+                    self._report_cap()
+                    capped = True
+                continue
+            queued += self._submit(
+                scheduler,
+                video,
+                position=position,
+                audio_only=audio_only,
+                output_dir=output_dir,
+                output_ext=output_ext,
+                archive=archive,
+            )
+        return queued
+
+    def _capped(self, queued: int) -> bool:
+        # Whether the policy's track limit stops more tracks being queued.
+        return self.policy.max_tracks is not None and queued >= self.policy.max_tracks
+
+    def _report_cap(self) -> None:
+        self.progress.log(
+            f"  {YELLOW}Queued the limit of {MAGENTA}{self.policy.max_tracks}{YELLOW} tracks from {MAGENTA}{self.title}{YELLOW}; the rest are left for later runs.{RESET}"
+        )
+
+    @staticmethod
+    def _submit(
+        scheduler: DownloadScheduler,
+        video: TrackEntry,
+        position: int,
+        total: int = 0,
+        audio_only: bool = True,
+        output_dir: str = ".",
+        output_ext: str = "mp3",
+        archive: DownloadArchive | None = None,
+    ) -> bool:
+        return scheduler.submit(
+            DownloadJob(
+                video_id=video.id,
+                title=video.title,
+                output_dir=output_dir,
+                audio_only=audio_only,
+                output_ext=output_ext,
+                position=position,
+                total=total,
+                archive=archive,
             )
-            if result.stderr:
-                print(f"{RED}Error downloading video.", result.stderr.decode())
-                return 1
-            else:
-                return 0
-        except subprocess.CalledProcessError as e:
-            raise ChildProcessError("Error downloading video:", e, e.__traceback__)
+        )
 
     @staticmethod
     def is_valid_plist_url(url: str) -> bool:
@@ -338,32 +597,32 @@ class Playlist:
         Parameters
         ----------
         url : str
-            URL to check.
+            URL to check. Bare playlist IDs are accepted too.
 
         Returns
         -------
         bool
             Whether the URL is a valid YouTube playlist URL.
         """
-        return all([url and "https://" in url and "?list=" in url])
+        return bool(url) and normalize_playlist(url) is not None
 
     @staticmethod
-    def validate_playlists(input_playlists: list[str]) -> list[str]:
+    def validate_playlists(input_playlists: list[str | dict[str, Any]]) -> list[str]:
         """
-        Remove duplicate playlists from a list.
+        Remove duplicate and invalid playlists from a list.
+
+        Every playlist is normalized to its ID first, so the same playlist
+        written in different ways is kept once.
 
         Parameters
         ----------
-        playlists : list[str]
-            List of playlists.
+        playlists : list[str | dict[str, Any]]
+            List of playlists, as URLs or IDs, or as objects with a ``url``
+            key.
 
         Returns
         -------
         list[str]
-            List of playlists with duplicates removed.
+            Canonical playlist URLs, in input order, with duplicates removed.
         """
-        playlists: list[str] = []
-        for playlist in input_playlists:
-            if Playlist.is_valid_plist_url(playlist) and playlist not in playlists:
-                playlists.append(playlist)
-        return playlists
+        return list(PlaylistIndex.from_inputs(input_playlists).urls.values())
@@ -0,0 +1,327 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import FrameType
+from typing import TYPE_CHECKING
+
+from ytdlplist.constants import (
+    DEFAULT_PROFILE_SAMPLE_INTERVAL,
+    DEFAULT_PROFILE_TOP,
+    DEFAULT_STALL_THRESHOLD,
+)
+
+# Every download reports its processes through ``watch``, so this module is
+# always imported; cProfile and pstats are only imported when used.
+if TYPE_CHECKING:
+    import cProfile
+
+PROFILE_MODES: tuple[str, ...] = ("cprofile", "sample")
+
+_PACKAGE: str = os.path.dirname(os.path.abspath(__file__))
+
+# Profiler of the running sync, if any; ``watch`` reports child processes to it.
+_active: "Profiler | None" = None
+
+
+def watch(proc: asyncio.subprocess.Process, name: str, spawned_at: float) -> None:
+    """
+    Time a child process from spawn to exit, if a profiler is running.
+
+    Parameters
+    ----------
+    proc : asyncio.subprocess.Process
+        The process, just started.
+    name : str
+        What the process is for, such as ``"yt-dlp download"``.
+    spawned_at : float
+        ``time.monotonic()`` from just before the process was started.
+    """
+    if _active is not None:
+        _active.child(proc, name, spawned_at)
+
+
+def _where(frame: FrameType | None) -> str:
+    # Innermost frame of this package, and the innermost frame overall when
+    # that is elsewhere, such as in the standard library.
+    if frame is None:
+        return "unknown"
+    inner: str = _frame_name(frame)
+    while frame is not None:
+        if frame.f_code.co_filename.startswith(_PACKAGE):
+            own: str = _frame_name(frame)
+            return own if own == inner else f"{own} ({inner})"
+        frame = frame.f_back
+    return inner
+
+
+def _frame_name(frame: FrameType) -> str:
+    path: str = frame.f_code.co_filename
+    if path.startswith(_PACKAGE):
+        path = os.path.relpath(path, os.path.dirname(_PACKAGE))
+    else:
+        path = os.path.join(*path.split(os.sep)[-2:]) if os.sep in path else path
+    return f"{path}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+class _Totals:
+    __slots__ = ("count", "total", "longest", "extra", "failed")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total: float = 0.0
+        self.longest: float = 0.0
+        self.extra: float = 0.0
+        self.failed: int = 0
+
+    def add(self, seconds: float, extra: float = 0.0, failed: bool = False) -> None:
+        self.count += 1
+        self.total += seconds
+        self.longest = max(self.longest, seconds)
+        self.extra += extra
+        self.failed += failed
+
+
+class Profiler:
+    """
+    Opt-in profile of a sync: child processes, event loop stalls and,
+    optionally, where the event loop thread spends its time.
+
+    Every child process reported through ``watch`` is timed from spawn to
+    exit. A heartbeat task measures how late the event loop runs it, and a
+    watchdog thread records where the loop thread is while a heartbeat is
+    overdue, so each stall is attributed to the code that caused it.
+
+    Attributes
+    ----------
+    mode : str | None
+        None, "cprofile" to run cProfile on the event loop thread, or
+        "sample" to sample the loop thread's stack from the watchdog thread.
+
+    stall_threshold : float
+        Seconds a heartbeat must be late by to count as a stall.
+
+    sample_interval : float
+        Seconds between stack samples in "sample" mode.
+
+    children : dict[str, _Totals]
+        Spawn-to-exit times of child processes, by name. ``extra`` holds the
+        time spent spawning them.
+
+    stalls : dict[str, _Totals]
+        Event loop stalls, by where the loop thread was.
+
+    samples : dict[str, list[int]]
+        Stack samples per function, as samples with the function anywhere
+        on the stack and samples with it innermost.
+    """
+
+    def __init__(
+        self,
+        mode: str | None = None,
+        stall_threshold: float = DEFAULT_STALL_THRESHOLD,
+        sample_interval: float = DEFAULT_PROFILE_SAMPLE_INTERVAL,
+    ) -> None:
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiler: {mode}")
+        self.mode: str | None = mode
+        self.stall_threshold: float = stall_threshold
+        self.sample_interval: float = sample_interval
+        self.children: dict[str, _Totals] = {}
+        self.stalls: dict[str, _Totals] = {}
+        self.samples: dict[str, list[int]] = {}
+        self._sampled: int = 0
+        self._started_at: float = 0.0
+        self._stopped_at: float = 0.0
+        self._beat: float = 0.0
+        self._stalled_at: str | None = None
+        self._loop_thread: int = 0
+        self._heartbeat: asyncio.Task[None] | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+        self._waits: set[asyncio.Task[None]] = set()
+        self._cprofile: cProfile.Profile | None = None
+
+    def start(self) -> None:
+        """
+        Start profiling. Must be called from the running event loop, which is
+        the one profiled.
+        """
+        global _active
+        _active = self
+        self._started_at = self._beat = time.monotonic()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = asyncio.create_task(self._run_heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._run_watchdog, name="profile-watchdog", daemon=True
+        )
+        self._watchdog.start()
+        if self.mode == "cprofile":
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        """
+        Stop profiling. Processes still running are left out of the report.
+        """
+        global _active
+        if _active is self:
+            _active = None
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self._stopped_at = time.monotonic()
+        self._stopping.set()
+        if self._watchdog is not None:
+            self._watchdog.join()
+        for task in [self._heartbeat, *self._waits]:
+            if task is not None:
+                task.cancel()
+
+    def child(
+        self, proc: asyncio.subprocess.Process, name: str, spawned_at: float
+    ) -> None:
+        """
+        Time a child process until it exits. See ``watch``.
+        """
+        spawn: float = time.monotonic() - spawned_at
+
+        async def wait() -> None:
+            returncode: int = await proc.wait()
+            self.children.setdefault(name, _Totals()).add(
+                time.monotonic() - spawned_at, spawn, returncode != 0
+            )
+
+        # proc.wait() may be awaited by several tasks; this one only times it.
+        task: asyncio.Task[None] = asyncio.create_task(wait())
+        self._waits.add(task)
+        task.add_done_callback(self._waits.discard)
+
+    async def _run_heartbeat(self) -> None:
+        tick: float = self.stall_threshold / 4
+        while True:
+            expected: float = time.monotonic() + tick
+            self._beat = expected
+            await asyncio.sleep(tick)
+            late: float = time.monotonic() - expected
+            if late >= self.stall_threshold:
+                where: str = self._stalled_at or "unknown"
+                self.stalls.setdefault(where, _Totals()).add(late)
+            self._stalled_at = None
+
+    def _run_watchdog(self) -> None:
+        tick: float = self.stall_threshold / 4
+        if self.mode == "sample":
+            tick = min(tick, self.sample_interval)
+        while not self._stopping.wait(tick):
+            frame: FrameType | None = sys._current_frames().get(self._loop_thread)
+            if self.mode == "sample":
+                self._sample(frame)
+            overdue: bool = time.monotonic() - self._beat >= self.stall_threshold / 2
+            if overdue and self._stalled_at is None:
+                self._stalled_at = _where(frame)
+
+    def _sample(self, frame: FrameType | None) -> None:
+        self._sampled += 1
+        seen: set[str] = set()
+        innermost: bool = True
+        while frame is not None:
+            name: str = f"{_frame_name(frame).split(':')[0]} {frame.f_code.co_name}"
+            counts: list[int] = self.samples.setdefault(name, [0, 0])
+            if name not in seen:
+                seen.add(name)
+                counts[0] += 1
+            if innermost:
+                counts[1] += 1
+                innermost = False
+            frame = frame.f_back
+
+    def report(self, top: int = DEFAULT_PROFILE_TOP) -> str:
+        """
+        Summarize the profile, each section sorted by total time.
+
+        Parameters
+        ----------
+        top : int, optional
+            Most rows per section, by default DEFAULT_PROFILE_TOP
+
+        Returns
+        -------
+        str
+            The report, as plain text.
+        """
+        wall: float = (self._stopped_at or time.monotonic()) - self._started_at
+        lines: list[str] = [f"Profile of a {wall:.1f} s run", ""]
+        children: list[tuple[str, _Totals]] = sorted(
+            self.children.items(), key=lambda item: -item[1].total
+        )
+        lines += [
+            "Child processes, spawn to exit",
+            f"{'total s':>10} {'count':>6} {'mean s':>8} {'max s':>8} {'spawn ms':>9} {'failed':>6}  process",
+        ]
+        for name, totals in children[:top]:
+            lines.append(
+                f"{totals.total:>10.3f} {totals.count:>6} {totals.total / totals.count:>8.3f}"
+                f" {totals.longest:>8.3f} {1000 * totals.extra / totals.count:>9.1f}"
+                f" {totals.failed:>6}  {name}"
+            )
+        stalls: list[tuple[str, _Totals]] = sorted(
+            self.stalls.items(), key=lambda item: -item[1].total
+        )
+        lines += [
+            "",
+            f"Event loop stalls over {1000 * self.stall_threshold:.0f} ms:"
+            f" {sum(t.count for _, t in stalls)},"
+            f" {sum(t.total for _, t in stalls):.3f} s in total",
+        ]
+        if stalls:
+            lines.append(f"{'total s':>10} {'count':>6} {'max s':>8}  where")
+        for where, totals in stalls[:top]:
+            lines.append(
+                f"{totals.total:>10.3f} {totals.count:>6} {totals.longest:>8.3f}  {where}"
+            )
+        if self._cprofile is not None:
+            import io
+            import pstats
+
+            out = io.StringIO()
+            stats = pstats.Stats(self._cprofile, stream=out)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+            lines += [
+                "",
+                "Event loop thread, cProfile by cumulative time",
+                out.getvalue(),
+            ]
+        if self.samples:
+            lines += [
+                "",
+                f"Event loop thread, {self._sampled} samples every"
+                f" {1000 * self.sample_interval:.0f} ms",
+                f"{'total s':>10} {'self s':>8}  function",
+            ]
+            ranked: list[tuple[str, list[int]]] = sorted(
+                self.samples.items(), key=lambda item: -item[1][0]
+            )
+            for name, (total, own) in ranked[:top]:
+                lines.append(
+                    f"{total * self.sample_interval:>10.3f}"
+                    f" {own * self.sample_interval:>8.3f}  {name}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """
+        Write the report to a file, and cProfile's raw statistics next to it
+        as ``<path>.prof`` in "cprofile" mode.
+
+        Parameters
+        ----------
+        path : str
+            Report file.
+        """
+        with open(path, "w") as fp:
+            fp.write(self.report())
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(f"{path}.prof")
@@ -0,0 +1,413 @@
+import asyncio
+import os
+import re
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import IO, Any, Callable, Hashable
+
+from ytdlplist.constants import (
+    DARK,
+    DEFAULT_PROGRESS_FPS,
+    DEFAULT_PROGRESS_LOG_INTERVAL,
+    MAGENTA,
+    RESET,
+    YELLOW,
+)
+
+PROGRESS_MODES: tuple[str, ...] = ("auto", "live", "plain")
+
+# Called with bytes downloaded, total bytes, bytes per second and seconds
+# left, each None when unknown. May be called from any thread.
+ProgressCallback = Callable[[int, int | None, float | None, float | None], None]
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+
+def _visible(text: str) -> int:
+    return len(_ANSI.sub("", text))
+
+
+def _bytes(count: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if count < 1000:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1000
+    return f"{count:.1f} GB"
+
+
+def _duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return (
+        f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+    )
+
+
+class _Track:
+    __slots__ = ("title", "label", "stage", "downloaded", "total", "speed", "eta")
+
+    def __init__(self, title: str, label: str) -> None:
+        self.title: str = title
+        self.label: str = label
+        self.stage: str = "Downloading"
+        self.downloaded: int = 0
+        self.total: int | None = None
+        self.speed: float | None = None
+        self.eta: float | None = None
+
+
+class ProgressView:
+    """
+    Collects progress from every download and writes it out as plain lines.
+
+    Messages are buffered and written in batches, at most ``fps`` times a
+    second, on a dedicated writer thread. A slow terminal or a full pipe then
+    delays the output, not the event loop. A summary line of the tracks in
+    flight is added every DEFAULT_PROGRESS_LOG_INTERVAL seconds. Before
+    ``open`` is called, and after ``close``, messages are written straight
+    away, as ``print`` would.
+
+    Attributes
+    ----------
+    stream : IO[str]
+        Where progress is written.
+
+    fps : float
+        Highest number of writes per second.
+
+    tracks : dict[Hashable, _Track]
+        Tracks in flight, keyed by the key given to ``start``.
+
+    status_line : str
+        Run totals, shown with the tracks in flight.
+    """
+
+    def __init__(
+        self, stream: IO[str] | None = None, fps: float = DEFAULT_PROGRESS_FPS
+    ) -> None:
+        self.stream: IO[str] = stream or sys.stdout
+        self.fps: float = fps
+        self.tracks: dict[Hashable, _Track] = {}
+        self.status_line: str = ""
+        self._lines: list[str] = []
+        self._task: asyncio.Task[None] | None = None
+        self._writer: ThreadPoolExecutor | None = None
+        self._summarized_at: float = time.monotonic()
+
+    def open(self) -> bool:
+        """
+        Start writing in the background. Must be called from a running event
+        loop.
+
+        Returns
+        -------
+        bool
+            Whether the view was started by this call, rather than already
+            running.
+        """
+        if self._task is not None:
+            return False
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="progress")
+        self._task = asyncio.create_task(self._render())
+        return True
+
+    async def close(self) -> None:
+        """
+        Write out what is buffered and stop writing in the background.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        text: str = self._frame(final=True)
+        if text:
+            await asyncio.get_running_loop().run_in_executor(
+                self._writer, self._write, text
+            )
+        self._writer.shutdown()
+        self._writer = None
+
+    def log(self, message: str) -> None:
+        """
+        Write a line that stays in the output.
+
+        Parameters
+        ----------
+        message : str
+            The line, without a trailing newline.
+        """
+        if self._task is None:
+            self._write(message + "\n")
+        else:
+            self._lines.append(message)
+
+    def start(self, key: Hashable, title: str, label: str = "", note: str = "") -> None:
+        """
+        Show that a track started downloading.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key that identifies the track in later calls.
+        title : str
+            Track title.
+        label : str, optional
+            Position of the track, such as ``[3/20]``, by default none
+        note : str, optional
+            Extra information for the start line, by default none
+        """
+        self.tracks[key] = _Track(title, label)
+        self.log(
+            f"  {label} {YELLOW}Downloading {MAGENTA}{title}{YELLOW}...{RESET}{note}"
+        )
+
+    def update(
+        self,
+        key: Hashable,
+        downloaded: int,
+        total: int | None = None,
+        speed: float | None = None,
+        eta: float | None = None,
+    ) -> None:
+        """
+        Record how far a track's download got. Safe to call from any thread.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key given to ``start``.
+        downloaded : int
+            Bytes downloaded.
+        total : int | None, optional
+            Size of the download in bytes, by default unknown
+        speed : float | None, optional
+            Bytes per second, by default unknown
+        eta : float | None, optional
+            Seconds left, by default unknown
+        """
+        track: _Track | None = self.tracks.get(key)
+        if track is not None:
+            track.downloaded, track.total = downloaded, total
+            track.speed, track.eta = speed, eta
+
+    def callback(self, key: Hashable) -> ProgressCallback:
+        """
+        Get a function that records a track's progress, for a backend.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key given to ``start``.
+
+        Returns
+        -------
+        ProgressCallback
+            ``update`` bound to the key.
+        """
+        return partial(self.update, key)
+
+    def stage(self, key: Hashable, stage: str) -> None:
+        """
+        Show that a track moved on to another stage, such as converting.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key given to ``start``.
+        stage : str
+            Name of the stage.
+        """
+        track: _Track | None = self.tracks.get(key)
+        if track is not None:
+            track.stage = stage
+            track.speed = track.eta = None
+
+    def finish(self, key: Hashable) -> None:
+        """
+        Stop showing a track.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key given to ``start``.
+        """
+        self.tracks.pop(key, None)
+
+    def status(self, text: str) -> None:
+        """
+        Set the run totals shown with the tracks in flight.
+
+        Parameters
+        ----------
+        text : str
+            Totals, such as tracks done and left.
+        """
+        self.status_line = text
+
+    def summary(self) -> str:
+        """
+        Summarize the tracks in flight and the run totals.
+
+        Returns
+        -------
+        str
+            One line, with colors.
+        """
+        speed: float = sum(t.speed or 0.0 for t in list(self.tracks.values()))
+        line: str = f"{YELLOW}{len(self.tracks)} in flight"
+        if speed:
+            line += f", {_bytes(speed)}/s"
+        if self.status_line:
+            line += f"{YELLOW}; {self.status_line}"
+        return line + RESET
+
+    async def _render(self) -> None:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(1 / self.fps)
+            text: str = self._frame()
+            if text:
+                # Frames are composed on the event loop and written on the
+                # writer thread; a slow write only makes the next frame hold
+                # more.
+                await loop.run_in_executor(self._writer, self._write, text)
+
+    def _frame(self, final: bool = False) -> str:
+        lines, self._lines = self._lines, []
+        now: float = time.monotonic()
+        if (
+            not final
+            and self.tracks
+            and now - self._summarized_at >= DEFAULT_PROGRESS_LOG_INTERVAL
+        ):
+            self._summarized_at = now
+            lines.append(f"  {self.summary()}")
+        return "".join(line + "\n" for line in lines)
+
+    def _write(self, text: str) -> None:
+        self.stream.write(text)
+        self.stream.flush()
+
+
+class LiveProgressView(ProgressView):
+    """
+    ProgressView for terminals, which keeps a block of status lines at the
+    bottom of the screen.
+
+    The block holds a line per track in flight, with its percentage, size,
+    speed and time left, and a line of run totals. It is redrawn in place at
+    most ``fps`` times a second, and only when it changed. Messages scroll
+    past above it.
+    """
+
+    def __init__(
+        self, stream: IO[str] | None = None, fps: float = DEFAULT_PROGRESS_FPS
+    ) -> None:
+        super().__init__(stream, fps)
+        self._drawn: int = 0
+        self._block: str = ""
+
+    def start(self, key: Hashable, title: str, label: str = "", note: str = "") -> None:
+        if self._task is None:
+            super().start(key, title, label, note)
+        else:
+            # The block shows the track, so the start line would be clutter.
+            self.tracks[key] = _Track(title, label)
+
+    def _frame(self, final: bool = False) -> str:
+        lines, self._lines = self._lines, []
+        block: list[str] = [] if final else self._rows()
+        text: str = "".join(row + "\n" for row in block)
+        if not lines and text == self._block:
+            return ""
+        # Moves to the start of the old block and clears the screen below.
+        parts: list[str] = [f"\r\x1b[{self._drawn}A\x1b[J"] if self._drawn else []
+        parts += [line + "\n" for line in lines]
+        parts.append(text)
+        self._drawn, self._block = len(block), text
+        return "".join(parts)
+
+    def _rows(self) -> list[str]:
+        if not self.tracks and not self.status_line:
+            return []
+        width, height = shutil.get_terminal_size()
+        tracks: list[_Track] = list(self.tracks.values())
+        # Leaves room for the totals, a possible overflow line and a message.
+        room: int = max(1, height - 3)
+        rows: list[str] = [self._row(track, width) for track in tracks[:room]]
+        if len(tracks) > room:
+            rows.append(f"  {DARK}... and {len(tracks) - room} more{RESET}")
+        rows.append(f"  {self.summary()}")
+        return rows
+
+    @staticmethod
+    def _row(track: _Track, width: int) -> str:
+        numbers: str
+        if track.stage != "Downloading":
+            numbers = f"{track.stage}..."
+        elif track.total:
+            numbers = (
+                f"{min(100.0, 100 * track.downloaded / track.total):5.1f}%"
+                f" of {_bytes(track.total)}"
+            )
+        elif track.downloaded:
+            numbers = _bytes(track.downloaded)
+        else:
+            numbers = "starting..."
+        if track.speed:
+            numbers += f" at {_bytes(track.speed)}/s"
+        if track.eta is not None and track.stage == "Downloading":
+            numbers += f", {_duration(track.eta)} left"
+        room: int = width - 5 - _visible(track.label) - len(numbers)
+        title: str = track.title
+        if len(title) > room:
+            title = title[: max(0, room - 1)] + "…" if room > 1 else ""
+        return f"  {track.label} {MAGENTA}{title}{RESET} {DARK}{numbers}{RESET}"
+
+
+def get_progress_view(
+    mode: str = "auto", stream: IO[str] | None = None
+) -> ProgressView:
+    """
+    Create the progress view for an output stream.
+
+    Parameters
+    ----------
+    mode : str, optional
+        One of ``PROGRESS_MODES``: "live" for a status block, "plain" for
+        plain lines, or "auto" for a status block on terminals only, by
+        default "auto"
+    stream : IO[str] | None, optional
+        Where progress is written, by default sys.stdout
+
+    Returns
+    -------
+    ProgressView
+        The view.
+
+    Raises
+    ------
+    ValueError
+        If the mode is unknown.
+    """
+    if mode not in PROGRESS_MODES:
+        raise ValueError(f"Unknown progress mode: {mode}")
+    stream = stream or sys.stdout
+    live: bool = mode == "live" or (
+        mode == "auto" and _isatty(stream) and os.environ.get("TERM") != "dumb"
+    )
+    return LiveProgressView(stream) if live else ProgressView(stream)
+
+
+def _isatty(stream: Any) -> bool:
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
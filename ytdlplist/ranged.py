@@ -0,0 +1,516 @@
+import asyncio
+import http.client
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+from ytdlplist.backends import Backend
+from ytdlplist.constants import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_RANGE_CHUNK,
+    DEFAULT_RANGE_CONNECTIONS,
+    DEFAULT_RANGE_RETRIES,
+)
+from ytdlplist.progress import ProgressCallback
+from ytdlplist.store import safe_filename
+from ytdlplist.utils import ensure_valid_destination
+
+# Protocols whose stream is a single file that answers HTTP range requests.
+RANGE_PROTOCOLS: tuple[str, ...] = ("http", "https")
+
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+|\*)")
+_READ_SIZE = 256 * 1024
+
+
+class RangeError(Exception):
+    """
+    Raised when a range of a stream cannot be fetched.
+
+    Attributes
+    ----------
+    status : int | None
+        HTTP status of the failed response, if there was one.
+    """
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status: int | None = status
+
+
+class _Range:
+    __slots__ = ("start", "end", "crc")
+
+    def __init__(self, start: int, end: int) -> None:
+        self.start: int = start
+        self.end: int = end
+        self.crc: int | None = None
+
+    def __len__(self) -> int:
+        return self.end - self.start + 1
+
+
+class _Connection:
+    """
+    One keep-alive HTTP connection, reopened whenever the server drops it.
+    """
+
+    def __init__(self, url: str, timeout: float) -> None:
+        parts = urlsplit(url)
+        self.https: bool = parts.scheme == "https"
+        self.netloc: str = parts.netloc
+        self.path: str = parts.path + (f"?{parts.query}" if parts.query else "")
+        self.timeout: float = timeout
+        self._conn: http.client.HTTPConnection | None = None
+
+    def get(
+        self, headers: dict[str, str], start: int, end: int
+    ) -> http.client.HTTPResponse:
+        if self._conn is None:
+            cls = (
+                http.client.HTTPSConnection
+                if self.https
+                else http.client.HTTPConnection
+            )
+            self._conn = cls(self.netloc, timeout=self.timeout)
+        try:
+            self._conn.request(
+                "GET", self.path, headers={**headers, "Range": f"bytes={start}-{end}"}
+            )
+            return self._conn.getresponse()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def _write_at(fd: int, data: bytes | memoryview, offset: int) -> None:
+    if hasattr(os, "pwrite"):
+        while data:
+            written: int = os.pwrite(fd, data, offset)
+            data, offset = data[written:], offset + written
+        return
+    # Windows has no pwrite; fall back to a positioned write under a lock.
+    with _seek_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+
+
+def _read_at(fd: int, size: int, offset: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    with _seek_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, size)
+
+
+_seek_lock = threading.Lock()
+
+
+def _preallocate(fd: int, size: int) -> None:
+    os.ftruncate(fd, size)
+    if hasattr(os, "posix_fallocate") and size:
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except OSError:
+            # Not every file system supports it; the file is sized already.
+            pass
+
+
+def _transient(e: RangeError) -> bool:
+    # Client errors, such as an expired URL, do not go away by asking again.
+    return e.status is None or e.status >= 500
+
+
+def _crc_of(fd: int, chunk: _Range) -> int:
+    crc: int = 0
+    offset: int = chunk.start
+    while offset <= chunk.end:
+        data: bytes = _read_at(fd, min(_READ_SIZE, chunk.end - offset + 1), offset)
+        if not data:
+            break
+        crc = zlib.crc32(data, crc)
+        offset += len(data)
+    return crc
+
+
+class RangedFetcher:
+    """
+    Downloads audio streams over several HTTP connections at once, one byte
+    range per request.
+
+    YouTube caps the throughput of each connection, so a long stream, such as
+    a mix or a full album, downloads several times faster in parallel ranges.
+    The stream's URL is resolved with yt-dlp. The file is preallocated, and
+    every range is written at its offset with ``pwrite`` as it arrives. A
+    verification pass then reads every range back and compares its CRC32 with
+    the one computed on arrival, fetching ranges that differ again. Streams
+    that are not single files, such as DASH or HLS fragments, are left to
+    yt-dlp, which downloads ``connections`` fragments at once.
+
+    Attributes
+    ----------
+    backend : Backend
+        Backend that resolves streams, and downloads the ones that cannot be
+        fetched in ranges.
+
+    connections : int
+        Connections per stream.
+
+    chunk_size : int
+        Bytes per range request.
+
+    retries : int
+        Times a range is requested again after it failed.
+
+    timeout : float
+        Seconds to wait for the server before a request fails.
+    """
+
+    def __init__(
+        self,
+        backend: Backend,
+        connections: int = DEFAULT_RANGE_CONNECTIONS,
+        chunk_size: int = DEFAULT_RANGE_CHUNK,
+        retries: int = DEFAULT_RANGE_RETRIES,
+        timeout: float = 30.0,
+        streams: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        self.backend: Backend = backend
+        self.connections: int = max(1, connections)
+        self.chunk_size: int = max(_READ_SIZE, chunk_size)
+        self.retries: int = retries
+        self.timeout: float = timeout
+        # Enough threads for every connection of every concurrent stream.
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.connections * max(1, streams),
+            thread_name_prefix="ranged",
+        )
+
+    async def fetch_audio(
+        self,
+        video_id: str,
+        output_dir: str = ".",
+        on_progress: ProgressCallback | None = None,
+    ) -> str:
+        """
+        Download a track's best audio stream without converting it.
+
+        Parameters
+        ----------
+        video_id : str
+            YouTube video ID.
+        output_dir : str, optional
+            Output directory, by default "."
+        on_progress : ProgressCallback | None, optional
+            Called as ranges arrive, by default never
+
+        Returns
+        -------
+        str
+            Path to the downloaded file.
+
+        Raises
+        ------
+        OSError :
+            If the output directory or file is unusable.
+        subprocess.CalledProcessError :
+            If yt-dlp fails, or the stream cannot be fetched, with the error
+            in ``stderr``.
+        """
+        ensure_valid_destination(output_dir)
+        stream: dict[str, Any] = await self.backend.resolve_audio(video_id)
+        if stream.get("protocol") not in RANGE_PROTOCOLS or not stream.get("url"):
+            return await self.backend.fetch_audio(video_id, output_dir, on_progress)
+        name: str = safe_filename(stream.get("title") or video_id)
+        path: str = os.path.join(output_dir, f"{name}.{stream.get('ext') or 'webm'}")
+        try:
+            await self.fetch(
+                stream["url"],
+                path,
+                stream.get("http_headers") or {},
+                stream.get("filesize"),
+                on_progress,
+            )
+        except RangeError as e:
+            status: str = f"HTTP Error {e.status}: " if e.status else ""
+            raise subprocess.CalledProcessError(
+                1,
+                ["ranged", video_id],
+                stderr=f"ERROR: unable to download video data: {status}{e}",
+            ) from None
+        return path
+
+    async def fetch(
+        self,
+        url: str,
+        path: str,
+        headers: dict[str, str],
+        size: int | None = None,
+        on_progress: ProgressCallback | None = None,
+    ) -> int:
+        """
+        Download a URL into a file, in parallel ranges.
+
+        The file is written as ``<path>.part`` and renamed once verified.
+
+        Parameters
+        ----------
+        url : str
+            URL of the stream.
+        path : str
+            File to write.
+        headers : dict[str, str]
+            HTTP headers to send with every request.
+        size : int | None, optional
+            Size of the stream in bytes, if known, by default asked from the
+            server first
+        on_progress : ProgressCallback | None, optional
+            Called from the connection threads as ranges arrive, by default
+            never
+
+        Returns
+        -------
+        int
+            Size of the file in bytes.
+
+        Raises
+        ------
+        RangeError :
+            If a range cannot be fetched, or the file does not verify.
+        OSError :
+            If the file cannot be written.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        part: str = f"{path}.part"
+        received: int = 0
+        lock = threading.Lock()
+        began: float = time.monotonic()
+
+        def report(count: int) -> None:
+            nonlocal received
+            if on_progress is None:
+                return
+            with lock:
+                received += count
+                done: int = min(received, size) if size else received
+            speed: float = done / max(time.monotonic() - began, 1e-3)
+            on_progress(done, size, speed, (size - done) / speed if size else None)
+
+        fd: int = os.open(part, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            chunks: list[_Range]
+            if size is None:
+                size, chunks = await loop.run_in_executor(
+                    self._pool, self._probe, url, headers, fd, report
+                )
+            else:
+                chunks = []
+            if not chunks:
+                _preallocate(fd, size)
+                chunks = [
+                    _Range(start, min(start + self.chunk_size, size) - 1)
+                    for start in range(0, size, self.chunk_size)
+                ]
+            pending: list[_Range] = [c for c in chunks if c.crc is None]
+            for _ in range(2):
+                await self._fetch_ranges(url, headers, fd, pending, report)
+                pending = await loop.run_in_executor(
+                    self._pool, self._verify, fd, size, chunks
+                )
+                if not pending:
+                    break
+                for chunk in pending:
+                    chunk.crc = None
+            else:
+                raise RangeError(f"{len(pending)} ranges did not verify.")
+        except BaseException:
+            os.close(fd)
+            os.remove(part)
+            raise
+        os.close(fd)
+        os.replace(part, path)
+        return size
+
+    def _probe(
+        self,
+        url: str,
+        headers: dict[str, str],
+        fd: int,
+        report: Callable[[int], None],
+    ) -> tuple[int, list[_Range]]:
+        # Asks for the first byte, to learn the stream's size. A server that
+        # ignores ranges sends the whole stream instead, which is written out
+        # and returned as a single range that needs no fetching.
+        attempt: int = 0
+        while True:
+            try:
+                return self._probe_once(url, headers, fd, report)
+            except RangeError as e:
+                attempt += 1
+                if attempt > self.retries or not _transient(e):
+                    raise
+
+    def _probe_once(
+        self,
+        url: str,
+        headers: dict[str, str],
+        fd: int,
+        report: Callable[[int], None],
+    ) -> tuple[int, list[_Range]]:
+        conn = _Connection(url, self.timeout)
+        try:
+            response = conn.get(headers, 0, 0)
+            if response.status == 206:
+                match = _CONTENT_RANGE.match(response.getheader("Content-Range") or "")
+                response.read()
+                if match is None or match.group(3) == "*":
+                    raise RangeError("The server did not report the stream size.")
+                return int(match.group(3)), []
+            if response.status != 200:
+                raise RangeError(response.reason, response.status)
+            crc: int = 0
+            offset: int = 0
+            while data := response.read(_READ_SIZE):
+                _write_at(fd, data, offset)
+                crc = zlib.crc32(data, crc)
+                offset += len(data)
+                report(len(data))
+            whole = _Range(0, offset - 1)
+            whole.crc = crc
+            return offset, [whole] if offset else []
+        except (OSError, http.client.HTTPException) as e:
+            raise RangeError(str(e)) from e
+        finally:
+            conn.close()
+
+    async def _fetch_ranges(
+        self,
+        url: str,
+        headers: dict[str, str],
+        fd: int,
+        chunks: list[_Range],
+        report: Callable[[int], None],
+    ) -> None:
+        work: queue.SimpleQueue[_Range] = queue.SimpleQueue()
+        for chunk in chunks:
+            work.put(chunk)
+        stop = threading.Event()
+        futures: list[Future[None]] = [
+            self._pool.submit(
+                self._connection_worker, url, headers, fd, work, stop, report
+            )
+            for _ in range(min(self.connections, len(chunks)))
+        ]
+        try:
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+        finally:
+            # Stops the other connections after a failure or cancellation.
+            # Threads cannot be interrupted, so wait until none of them can
+            # write to the file any more.
+            stop.set()
+            await asyncio.get_running_loop().run_in_executor(
+                None, wait_futures, futures
+            )
+
+    def _connection_worker(
+        self,
+        url: str,
+        headers: dict[str, str],
+        fd: int,
+        work: queue.SimpleQueue[_Range],
+        stop: threading.Event,
+        report: Callable[[int], None],
+    ) -> None:
+        conn = _Connection(url, self.timeout)
+        try:
+            while not stop.is_set():
+                try:
+                    chunk: _Range = work.get_nowait()
+                except queue.Empty:
+                    return
+                for attempt in range(self.retries + 1):
+                    if stop.is_set():
+                        return
+                    try:
+                        chunk.crc = self._fetch_range(
+                            conn, headers, fd, chunk, stop, report
+                        )
+                        break
+                    except (OSError, http.client.HTTPException, RangeError) as e:
+                        conn.close()
+                        if attempt < self.retries and (
+                            not isinstance(e, RangeError) or _transient(e)
+                        ):
+                            continue
+                        stop.set()
+                        if isinstance(e, RangeError):
+                            raise
+                        raise RangeError(str(e)) from e
+        finally:
+            conn.close()
+
+    def _fetch_range(
+        self,
+        conn: _Connection,
+        headers: dict[str, str],
+        fd: int,
+        chunk: _Range,
+        stop: threading.Event,
+        report: Callable[[int], None],
+    ) -> int:
+        response = conn.get(headers, chunk.start, chunk.end)
+        if response.status != 206:
+            response.read()
+            raise RangeError(response.reason, response.status)
+        match = _CONTENT_RANGE.match(response.getheader("Content-Range") or "")
+        if match is None or int(match.group(1)) != chunk.start:
+            raise RangeError("The server sent the wrong range.")
+        crc: int = 0
+        offset: int = chunk.start
+        while offset <= chunk.end:
+            if stop.is_set():
+                raise RangeError("Cancelled.")
+            data: bytes = response.read(min(_READ_SIZE, chunk.end - offset + 1))
+            if not data:
+                raise RangeError(
+                    f"The connection closed {chunk.end - offset + 1} bytes early."
+                )
+            _write_at(fd, data, offset)
+            crc = zlib.crc32(data, crc)
+            offset += len(data)
+            report(len(data))
+        if response.will_close:
+            conn.close()
+        else:
+            # Drains the end of the response so the connection can be reused.
+            response.read()
+        return crc
+
+    @staticmethod
+    def _verify(fd: int, size: int, chunks: list[_Range]) -> list[_Range]:
+        # Returns the ranges whose bytes on disk differ from those received.
+        if os.fstat(fd).st_size != size:
+            return chunks
+        bad: list[_Range] = []
+        for chunk in chunks:
+            if chunk.crc is None or _crc_of(fd, chunk) != chunk.crc:
+                bad.append(chunk)
+        return bad
+
+    def close(self) -> None:
+        """
+        Stop the connection threads.
+        """
+        self._pool.shutdown(wait=False, cancel_futures=True)
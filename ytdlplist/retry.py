@@ -0,0 +1,155 @@
+import random
+import re
+
+from ytdlplist.constants import (
+    DEFAULT_BACKOFF_CAP,
+    DEFAULT_RATE_LIMIT_BACKOFF,
+    DEFAULT_RETRIES,
+    DEFAULT_TRANSIENT_BACKOFF,
+)
+
+TRANSIENT = "transient"
+RATE_LIMITED = "rate-limited"
+PERMANENT = "permanent"
+
+# Checked in order; the first class with a matching pattern wins.
+_PATTERNS: tuple[tuple[str, re.Pattern[str]], ...] = (
+    (
+        RATE_LIMITED,
+        re.compile(
+            r"HTTP Error 429|Too Many Requests|rate[- ]limit"
+            r"|confirm you.re not a bot|try again later",
+            re.IGNORECASE,
+        ),
+    ),
+    (
+        PERMANENT,
+        re.compile(
+            r"Video unavailable|Private video|has been removed|is not available"
+            r"|members[- ]only|Join this channel|copyright|has been terminated"
+            r"|confirm your age|Unsupported URL|is not a valid URL|HTTP Error 404"
+            r"|Requested format is not available",
+            re.IGNORECASE,
+        ),
+    ),
+)
+
+
+def classify(returncode: int, stderr: str | None) -> str:
+    """
+    Classify a failed yt-dlp run.
+
+    Parameters
+    ----------
+    returncode : int
+        yt-dlp exit code.
+    stderr : str | None
+        yt-dlp error output.
+
+    Returns
+    -------
+    str
+        RATE_LIMITED or PERMANENT if the error output says so, otherwise
+        TRANSIENT.
+    """
+    if returncode == 2:
+        # yt-dlp exits with 2 on invalid options; retrying cannot help.
+        return PERMANENT
+    for error_class, pattern in _PATTERNS:
+        if stderr and pattern.search(stderr):
+            return error_class
+    return TRANSIENT
+
+
+def summarize(stderr: str | None) -> str:
+    """
+    Pick the most useful line of yt-dlp's error output.
+
+    Parameters
+    ----------
+    stderr : str | None
+        yt-dlp error output.
+
+    Returns
+    -------
+    str
+        The last ``ERROR:`` line, else the last non-empty line.
+    """
+    lines: list[str] = [line.strip() for line in (stderr or "").splitlines()]
+    lines = [line for line in lines if line]
+    errors: list[str] = [line for line in lines if line.startswith("ERROR:")]
+    return (errors or lines or ["yt-dlp reported an error"])[-1]
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff, per error class.
+
+    Attributes
+    ----------
+    retries : int
+        Number of retries after the first attempt. Permanent errors are never
+        retried.
+
+    base_delays : dict[str, float]
+        Delay before the first retry, per error class.
+
+    cap : float
+        Maximum delay before any retry.
+    """
+
+    def __init__(
+        self,
+        retries: int = DEFAULT_RETRIES,
+        transient_delay: float = DEFAULT_TRANSIENT_BACKOFF,
+        rate_limit_delay: float = DEFAULT_RATE_LIMIT_BACKOFF,
+        cap: float = DEFAULT_BACKOFF_CAP,
+    ) -> None:
+        self.retries: int = max(0, retries)
+        self.base_delays: dict[str, float] = {
+            TRANSIENT: transient_delay,
+            RATE_LIMITED: rate_limit_delay,
+        }
+        self.cap: float = cap
+
+    def should_retry(self, error_class: str, attempts: int) -> bool:
+        """
+        Decide whether a failed track gets another attempt.
+
+        Parameters
+        ----------
+        error_class : str
+            Class of the last failure.
+        attempts : int
+            Attempts made so far, including the one that failed.
+
+        Returns
+        -------
+        bool
+            Whether to retry.
+        """
+        return error_class in self.base_delays and attempts <= self.retries
+
+    def delay(self, error_class: str, attempts: int) -> float:
+        """
+        Get the time to wait before the next attempt.
+
+        The exponential delay is halved and the other half drawn at random,
+        so retries of tracks that failed together spread out.
+
+        Parameters
+        ----------
+        error_class : str
+            Class of the last failure.
+        attempts : int
+            Attempts made so far, including the one that failed.
+
+        Returns
+        -------
+        float
+            Seconds to wait.
+        """
+        backoff: float = min(
+            self.cap, self.base_delays[error_class] * 2 ** max(0, attempts - 1)
+        )
+        return backoff / 2 + random.uniform(0, backoff / 2)
@@ -0,0 +1,1019 @@
+import asyncio
+import os
+import socket
+import subprocess
+import time
+from math import inf
+from typing import TYPE_CHECKING, Any, Callable, Coroutine
+from urllib.parse import urlparse
+
+from ytdlplist.archive import DownloadArchive
+from ytdlplist.constants import (
+    DARK,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_INTERVAL,
+    DEFAULT_LEASE,
+    DEFAULT_PACING_STEP,
+    DEFAULT_QUEUE_POLL,
+    GREEN,
+    MAGENTA,
+    RED,
+    RESET,
+    WHITE,
+    YELLOW,
+)
+from ytdlplist.fairqueue import FairQueue, PlaylistPolicy
+from ytdlplist.journal import DONE, FAILED, QUEUED, RUNNING, RunJournal
+from ytdlplist.metrics import RunMetrics
+from ytdlplist.progress import ProgressView
+from ytdlplist.retry import (
+    PERMANENT,
+    RATE_LIMITED,
+    TRANSIENT,
+    RetryPolicy,
+    classify,
+    summarize,
+)
+
+# Named in annotations only; whoever builds these objects imports them.
+if TYPE_CHECKING:
+    from ytdlplist.adaptive import ConcurrencyController
+    from ytdlplist.store import TrackStore
+    from ytdlplist.transcode import Transcoder
+    from ytdlplist.workqueue import QueueKey, WorkQueue
+
+
+class TokenBucket:
+    """
+    Non-blocking token bucket rate limiter.
+
+    Attributes
+    ----------
+    rate : float
+        Tokens added per second.
+
+    capacity : float
+        Maximum number of tokens the bucket can hold.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive.")
+        self.rate: float = rate
+        self.capacity: float = max(capacity, 1.0)
+        self._tokens: float = self.capacity
+        self._updated: float = time.monotonic()
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """
+        Wait until the requested number of tokens is available, then take them.
+
+        Parameters
+        ----------
+        tokens : float, optional
+            Number of tokens to take, by default 1.0
+        """
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= tokens
+
+
+class HostRateLimiter:
+    """
+    Per-host collection of token buckets.
+
+    Attributes
+    ----------
+    interval : float
+        Average number of seconds between requests to the same host.
+
+    burst : int
+        Number of requests a host may receive back to back.
+
+    min_interval : float
+        Shortest average interval that ``relax`` may speed a host up to, in
+        small steps, once it is back at ``interval``. 0 lets it speed up
+        without bound.
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        burst: int = 1,
+        min_interval: float | None = None,
+    ) -> None:
+        self.interval: float = interval
+        self.burst: int = burst
+        self.min_interval: float = interval if min_interval is None else min_interval
+        self._buckets: dict[str, TokenBucket] = {}
+        self._paused_until: dict[str, float] = {}
+
+    async def acquire(self, url: str) -> None:
+        """
+        Wait for a request slot for the host of a URL.
+
+        Parameters
+        ----------
+        url : str
+            URL about to be requested.
+        """
+        host: str = urlparse(url).hostname or ""
+        while (delay := self._paused_until.get(host, 0) - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+        if self.interval <= 0:
+            return
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(1 / self.interval, self.burst)
+        await self._buckets[host].acquire()
+
+    def throttle(self, url: str, pause: float) -> None:
+        """
+        Back off from a host that rate-limited a request.
+
+        No request goes to the host for ``pause`` seconds, and its request
+        rate is halved until ``relax`` restores it.
+
+        Parameters
+        ----------
+        url : str
+            URL that was rate-limited.
+        pause : float
+            Seconds to stop sending requests to the host.
+        """
+        host: str = urlparse(url).hostname or ""
+        self._paused_until[host] = max(
+            self._paused_until.get(host, 0), time.monotonic() + pause
+        )
+        if host in self._buckets:
+            bucket: TokenBucket = self._buckets[host]
+            bucket.rate /= 2
+
+    def relax(self, url: str) -> None:
+        """
+        Step a throttled host's request rate back towards the configured one,
+        then on towards ``min_interval``.
+
+        Parameters
+        ----------
+        url : str
+            URL that was requested successfully.
+        """
+        bucket: TokenBucket | None = self._buckets.get(urlparse(url).hostname or "")
+        if bucket is None or self.interval <= 0:
+            return
+        rate: float = 1 / self.interval
+        if bucket.rate < rate:
+            bucket.rate = min(rate, bucket.rate * 1.25)
+        elif self.min_interval < self.interval:
+            ceiling: float = 1 / self.min_interval if self.min_interval > 0 else inf
+            bucket.rate = min(ceiling, bucket.rate + rate * DEFAULT_PACING_STEP)
+
+    def current_interval(self, url: str) -> float:
+        """
+        Get the average interval currently kept between requests to the host
+        of a URL.
+
+        Parameters
+        ----------
+        url : str
+            URL of the host.
+
+        Returns
+        -------
+        float
+            Seconds between requests.
+        """
+        bucket: TokenBucket | None = self._buckets.get(urlparse(url).hostname or "")
+        return 1 / bucket.rate if bucket is not None else self.interval
+
+
+class DownloadJob:
+    """
+    A single track queued for download.
+
+    Attributes
+    ----------
+    video_id : str
+        YouTube video ID.
+
+    title : str
+        Track title, used for progress output.
+
+    output_dir : str
+        Output directory.
+
+    audio_only : bool
+        Whether to download only the audio.
+
+    output_ext : str
+        Output file extension.
+
+    position : int
+        Position of the track in its playlist, starting at 1.
+
+    total : int
+        Number of tracks in the playlist, or 0 while it is still unknown.
+
+    archive : DownloadArchive | None
+        Archive to record the track in once it is downloaded.
+
+    attempts : int
+        Number of times a download of the track has been started.
+
+    timings : dict[str, float]
+        Seconds spent in each stage so far, across attempts.
+
+    size : int | None
+        Size of the downloaded file in bytes, when known.
+    """
+
+    __slots__ = (
+        "video_id",
+        "title",
+        "output_dir",
+        "audio_only",
+        "output_ext",
+        "position",
+        "total",
+        "archive",
+        "attempts",
+        "timings",
+        "size",
+        "queued_at",
+    )
+
+    def __init__(
+        self,
+        video_id: str,
+        title: str,
+        output_dir: str = ".",
+        audio_only: bool = True,
+        output_ext: str = "mp3",
+        position: int = 0,
+        total: int = 0,
+        archive: DownloadArchive | None = None,
+        attempts: int = 0,
+    ) -> None:
+        self.video_id: str = video_id
+        self.title: str = title
+        self.output_dir: str = output_dir
+        self.audio_only: bool = audio_only
+        self.output_ext: str = output_ext
+        self.position: int = position
+        self.total: int = total
+        self.archive: DownloadArchive | None = archive
+        self.attempts: int = attempts
+        self.timings: dict[str, float] = {}
+        self.size: int | None = None
+        self.queued_at: float = 0.0
+
+    @property
+    def url(self) -> str:
+        return f"https://www.youtube.com/watch?v={self.video_id}"
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return (self.output_dir, self.video_id)
+
+    def to_record(self) -> dict[str, Any]:
+        """
+        Get the fields that journal and work queue records keep for the job.
+
+        Returns
+        -------
+        dict[str, Any]
+            Title, format, position, archive flag and attempts.
+        """
+        return {
+            "title": self.title,
+            "audio": self.audio_only,
+            "ext": self.output_ext,
+            "pos": self.position,
+            "total": self.total,
+            "archive": self.archive is not None,
+            "attempts": self.attempts,
+        }
+
+    @classmethod
+    def from_record(
+        cls, output_dir: str, video_id: str, track: dict[str, Any]
+    ) -> "DownloadJob":
+        """
+        Rebuild a job from a journal or work queue record.
+
+        Parameters
+        ----------
+        output_dir : str
+            Output directory.
+        video_id : str
+            YouTube video ID.
+        track : dict[str, Any]
+            Fields written by ``to_record``.
+
+        Returns
+        -------
+        DownloadJob
+            The job.
+        """
+        return cls(
+            video_id=video_id,
+            title=track.get("title", video_id),
+            output_dir=output_dir,
+            audio_only=track.get("audio", True),
+            output_ext=track.get("ext", "mp3"),
+            position=track.get("pos", 0),
+            total=track.get("total", 0),
+            archive=(
+                DownloadArchive.for_directory(output_dir)
+                if track.get("archive")
+                else None
+            ),
+            attempts=track.get("attempts", 0),
+        )
+
+
+class DownloadScheduler:
+    """
+    Bounded pool of asyncio workers that download queued tracks.
+
+    Attributes
+    ----------
+    downloader : Callable[..., Coroutine[Any, Any, int]]
+        Coroutine that downloads a single track and returns 0 on success. It
+        may raise subprocess.CalledProcessError with yt-dlp's error output.
+
+    audio_player : Callable[..., Coroutine[Any, Any, None]]
+        Coroutine to play a sound file.
+
+    concurrency : int
+        Maximum number of downloads running at once.
+
+    limiter : HostRateLimiter
+        Rate limiter applied before every download.
+
+    results : dict[str, int]
+        Success, error, skipped and retried counters.
+
+    failures : dict[tuple[str, str], int]
+        Number of times each track failed for good in this process, keyed by
+        output directory and video ID, until it succeeds.
+
+    retry : RetryPolicy
+        Decides which failed tracks are retried, and when.
+
+    journal : RunJournal | None
+        Journal that every state change is written to.
+
+    fetcher : Callable[..., Coroutine[Any, Any, str]] | None
+        Coroutine that downloads a track's best audio stream as is and returns
+        its path. Used instead of ``downloader`` for audio-only jobs when a
+        transcoder is set.
+
+    transcoder : Transcoder | None
+        Converts fetched audio on its own pool of workers, so downloads and
+        conversions overlap.
+
+    metrics : RunMetrics
+        Where stage timings, sizes and outcomes are recorded.
+
+    store : TrackStore | None
+        Shared store that tracks are downloaded into once and linked from
+        into each playlist directory. Tracks already stored are linked
+        without a download, and a track queued for several playlists at once
+        is downloaded by the first job while the others wait for it.
+
+    work_queue : WorkQueue | None
+        Queue shared with other processes, possibly on other hosts. Submitted
+        tracks go to it, and workers download the tracks this process claims
+        from it, so that several processes drain the same playlists without
+        downloading a track twice.
+
+    worker_id : str
+        Name that this process claims tracks under.
+
+    lease : float
+        Seconds a claimed track stays reserved without a heartbeat.
+
+    controller : ConcurrencyController | None
+        Adapts the number of downloads running at once to their speed and
+        errors, between its minimum and maximum. ``concurrency`` workers are
+        started, so it should be at least the controller's maximum.
+
+    progress : ProgressView
+        Where download progress and messages are shown. ``downloader`` and
+        ``fetcher`` are given an ``on_progress`` callback for it.
+
+    policies : dict[str, PlaylistPolicy]
+        Priority and weight of each output directory. Queued tracks are
+        handed to the workers by priority, and by deficit round-robin between
+        the directories of the same priority, so that a large playlist does
+        not hold up the others.
+    """
+
+    def __init__(
+        self,
+        downloader: Callable[..., Coroutine[Any, Any, int]],
+        audio_player: Callable[..., Coroutine[Any, Any, None]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        interval: float = DEFAULT_INTERVAL,
+        journal: RunJournal | None = None,
+        retry: RetryPolicy | None = None,
+        fetcher: Callable[..., Coroutine[Any, Any, str]] | None = None,
+        transcoder: "Transcoder | None" = None,
+        metrics: RunMetrics | None = None,
+        store: "TrackStore | None" = None,
+        work_queue: "WorkQueue | None" = None,
+        worker_id: str | None = None,
+        lease: float = DEFAULT_LEASE,
+        controller: "ConcurrencyController | None" = None,
+        min_interval: float | None = None,
+        progress: ProgressView | None = None,
+    ) -> None:
+        self.downloader: Callable[..., Coroutine[Any, Any, int]] = downloader
+        self.audio_player: Callable[..., Coroutine[Any, Any, None]] = audio_player
+        self.concurrency: int = max(1, concurrency)
+        self.limiter: HostRateLimiter = HostRateLimiter(
+            interval, self.concurrency, min_interval
+        )
+        self.controller: ConcurrencyController | None = controller
+        self.results: dict[str, int] = {
+            "success": 0,
+            "error": 0,
+            "skipped": 0,
+            "retried": 0,
+        }
+        self.retry: RetryPolicy = retry or RetryPolicy()
+        self.journal: RunJournal | None = journal
+        self.failures: dict[tuple[str, str], int] = {}
+        # Tracks queued or in flight; finished ones are known to the archive
+        # and the journal instead, so that this stays small in watch mode.
+        self._seen: set[tuple[str, str]] = set()
+        self._pending: int = 0
+        self.policies: dict[str, PlaylistPolicy] = {}
+        self._queue: FairQueue[DownloadJob] = FairQueue(
+            lambda job: job.output_dir, self.policies
+        )
+        self._workers: list[asyncio.Task[None]] = []
+        self._retrying: set[asyncio.Task[None]] = set()
+        self.fetcher: Callable[..., Coroutine[Any, Any, str]] | None = fetcher
+        self.transcoder: Transcoder | None = transcoder
+        self.metrics: RunMetrics = metrics or RunMetrics()
+        # Bounded, so that downloads wait for the transcoders to catch up
+        # instead of piling up unconverted files.
+        self._transcode_queue: asyncio.Queue[tuple[DownloadJob, str]] = asyncio.Queue(
+            maxsize=transcoder.workers if transcoder else 0
+        )
+        self._transcode_workers: list[asyncio.Task[None]] = []
+        self.store: TrackStore | None = store
+        # Job downloading each stored track, and the jobs waiting on it.
+        self._leaders: dict[
+            tuple[str, bool, str], tuple[DownloadJob, list[DownloadJob]]
+        ] = {}
+        self.work_queue: WorkQueue | None = work_queue
+        self.worker_id: str = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease: float = lease
+        # Jobs claimed from the work queue, and records waiting to be written
+        # to it in the next batch.
+        self._claimed: dict[QueueKey, DownloadJob] = {}
+        self._outbox: list[dict[str, Any]] = []
+        self._settled: list[tuple[str, str, dict[str, Any]]] = []
+        self._wake = asyncio.Event()
+        self._queue_tasks: list[asyncio.Task[None]] = []
+        self.progress: ProgressView = progress or ProgressView()
+
+    def start(self) -> None:
+        """
+        Start the worker tasks. Must be called from a running event loop.
+        """
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+        if self.transcoder is not None:
+            self._transcode_workers = [
+                asyncio.create_task(self._transcode_worker(self.transcoder))
+                for _ in range(self.transcoder.workers)
+            ]
+        if self.work_queue is not None:
+            self._queue_tasks = [
+                asyncio.create_task(self._feed(self.work_queue)),
+                asyncio.create_task(self._heartbeat(self.work_queue)),
+            ]
+
+    def set_policy(self, output_dir: str, policy: PlaylistPolicy) -> None:
+        """
+        Set how the tracks of an output directory share the workers with the
+        other directories. Set it before submitting the directory's tracks,
+        since its priority only changes once none of them is queued.
+
+        Parameters
+        ----------
+        output_dir : str
+            Output directory of a playlist.
+        policy : PlaylistPolicy
+            Priority and weight of the playlist.
+        """
+        self.policies[output_dir] = policy
+
+    def submit(self, job: DownloadJob) -> bool:
+        """
+        Queue a track for download.
+
+        Tracks queued or in flight, finished according to the journal, or
+        recorded in the job's download archive are not queued again. A track
+        that failed may be submitted again. With a work queue, the track is
+        added to it instead, unless it is already there.
+
+        Parameters
+        ----------
+        job : DownloadJob
+            Track to download.
+
+        Returns
+        -------
+        bool
+            Whether the track was queued.
+        """
+        key: tuple[str, str] = (job.output_dir, job.video_id)
+        if key in self._seen:
+            return False
+        if self.journal is not None and self.journal.is_done(*key):
+            return False
+        if job.archive is not None and job.video_id in job.archive:
+            self.results["skipped"] += 1
+            self.metrics.inc("ytdlplist_tracks_total", status="skipped")
+            return False
+        if self.work_queue is not None:
+            # The work queue ignores tracks it already holds, unless they
+            # failed with an error that is not permanent.
+            self._outbox.append(
+                {"dir": job.output_dir, "id": job.video_id, **job.to_record()}
+            )
+            self._wake.set()
+            return True
+        self._seen.add(key)
+        if self.journal is not None:
+            self.journal.record(job.output_dir, job.video_id, QUEUED, **job.to_record())
+        job.queued_at = time.monotonic()
+        self._pending += 1
+        self._queue.put_nowait(job)
+        return True
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of submitted tracks that have not succeeded or failed yet,
+        including those waiting to be retried or converted.
+        """
+        return self._pending
+
+    def resume(self) -> int:
+        """
+        Queue the tracks an interrupted run left unfinished in the journal.
+
+        Tracks the interrupted run finished are counted as successes, so the
+        final summary covers the whole run.
+
+        Returns
+        -------
+        int
+            Number of tracks queued.
+        """
+        if self.journal is None:
+            return 0
+        self.results["success"] += self.journal.counts()[DONE]
+        queued: int = 0
+        for output_dir, video_id, track in self.journal.pending():
+            queued += self.submit(DownloadJob.from_record(output_dir, video_id, track))
+        return queued
+
+    async def join(self) -> dict[str, int]:
+        """
+        Wait for every queued track to finish, including retries, then stop
+        the workers.
+
+        With a work queue, this waits until no track in the queue is left
+        queued or claimed by any process.
+
+        Returns
+        -------
+        dict[str, int]
+            Success, error, skipped and retried counters.
+        """
+        await self._queue.join()
+        while self._retrying:
+            await asyncio.wait(self._retrying)
+            await self._queue.join()
+        await self._transcode_queue.join()
+        while self.work_queue is not None:
+            try:
+                await self._flush(self.work_queue)
+                remaining: int = await asyncio.to_thread(self.work_queue.remaining)
+            except Exception as e:
+                self.progress.log(f"{RED}Work queue error: {e}{RESET}")
+                remaining = 1
+            if not self._claimed and not remaining:
+                break
+            self._wake.set()
+            await asyncio.sleep(DEFAULT_QUEUE_POLL)
+            await self._queue.join()
+            await self._transcode_queue.join()
+        await self.stop()
+        return self.results
+
+    async def stop(self) -> None:
+        """
+        Cancel the workers and pending retries and wait for them to exit,
+        which kills the child processes of downloads in progress. Tracks not
+        finished are left to the journal or the work queue.
+        """
+        tasks: list[asyncio.Task[None]] = [
+            *self._workers,
+            *self._transcode_workers,
+            *self._queue_tasks,
+            *self._retrying,
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._transcode_workers = []
+        self._queue_tasks = []
+
+    async def _feed(self, work_queue: "WorkQueue") -> None:
+        # Keeps enough tracks claimed to occupy the download and transcode
+        # workers, and writes submissions and outcomes in batches.
+        capacity: int = self.concurrency + (
+            self.transcoder.workers if self.transcoder else 0
+        )
+        while True:
+            self._wake.clear()
+            try:
+                await self._flush(work_queue)
+                tracks: list[dict[str, Any]] = await asyncio.to_thread(
+                    work_queue.claim,
+                    self.worker_id,
+                    capacity - len(self._claimed),
+                    self.lease,
+                )
+            except Exception as e:
+                self.progress.log(f"{RED}Work queue error: {e}{RESET}")
+                tracks = []
+            for track in tracks:
+                job = DownloadJob.from_record(track["dir"], track["id"], track)
+                self._claimed[(job.output_dir, job.video_id)] = job
+                self._pending += 1
+                job.queued_at = time.monotonic()
+                self._queue.put_nowait(job)
+            try:
+                await asyncio.wait_for(self._wake.wait(), DEFAULT_QUEUE_POLL)
+            except TimeoutError:
+                pass
+
+    async def _heartbeat(self, work_queue: "WorkQueue") -> None:
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                await asyncio.to_thread(
+                    work_queue.heartbeat,
+                    self.worker_id,
+                    list(self._claimed),
+                    self.lease,
+                )
+            except Exception as e:
+                self.progress.log(f"{RED}Work queue heartbeat failed: {e}{RESET}")
+
+    async def _flush(self, work_queue: "WorkQueue") -> None:
+        # A batch that could not be written goes back in front of the records
+        # added meanwhile, so that the next flush retries it.
+        outbox, self._outbox = self._outbox, []
+        settled, self._settled = self._settled, []
+        if outbox:
+            try:
+                await asyncio.to_thread(work_queue.put, outbox)
+            except Exception:
+                self._outbox[:0] = outbox
+                self._settled[:0] = settled
+                raise
+        if settled:
+            try:
+                await asyncio.to_thread(work_queue.settle, self.worker_id, settled)
+            except Exception:
+                self._settled[:0] = settled
+                raise
+
+    def _hand_back(self, job: DownloadJob, **fields: Any) -> None:
+        # Queues the outcome of a claimed job for the work queue.
+        if self._claimed.pop((job.output_dir, job.video_id), None) is None:
+            return
+        self._settled.append((job.output_dir, job.video_id, fields))
+        self._wake.set()
+
+    async def _worker(self) -> None:
+        while True:
+            job: DownloadJob = await self._queue.get()
+            try:
+                await self._run(job)
+            except Exception as e:
+                # Never let one track take a worker down with it; join() would
+                # otherwise wait forever on the jobs it left behind.
+                self.results["error"] += 1
+                self._record(job, FAILED, error=str(e))
+                self._report(job, "error")
+                self.progress.log(
+                    f"{RED}Unexpected error downloading {job.video_id}: {e}{RESET}"
+                )
+            finally:
+                self._queue.task_done()
+
+    async def _transcode_worker(self, transcoder: "Transcoder") -> None:
+        while True:
+            job, source = await self._transcode_queue.get()
+            started_at: float = time.monotonic()
+            self._time(job, "transcode_wait", started_at - job.queued_at)
+            try:
+                await transcoder.transcode(source, job.output_ext)
+            except (subprocess.CalledProcessError, ChildProcessError, OSError) as e:
+                self._time(job, "transcode", time.monotonic() - started_at)
+                error: str = (
+                    summarize(e.stderr)
+                    if isinstance(e, subprocess.CalledProcessError)
+                    else str(e)
+                )
+                self.progress.log(
+                    f"  {self._progress(job)} {RED}Converting failed: {error}{RESET}"
+                )
+                self._record(job, FAILED, error=error, error_class=TRANSIENT)
+                await self._fail(job, "transcode")
+            except Exception as e:
+                self.results["error"] += 1
+                self._record(job, FAILED, error=str(e))
+                self._report(job, "error")
+                self.progress.log(
+                    f"{RED}Unexpected error converting {job.video_id}: {e}{RESET}"
+                )
+            else:
+                self._time(job, "transcode", time.monotonic() - started_at)
+                await self._succeed(job)
+            finally:
+                self._transcode_queue.task_done()
+
+    @staticmethod
+    def _progress(job: DownloadJob) -> str:
+        total: int | str = job.total or "?"
+        return f"{WHITE}[{DARK}{job.position}{WHITE}/{DARK}{total}{WHITE}]{RESET}"
+
+    async def _run(self, job: DownloadJob) -> None:
+        progress: str = self._progress(job)
+        split: bool = (
+            job.audio_only and self.fetcher is not None and self.transcoder is not None
+        )
+        source: str | None = None
+        started_at: float = time.monotonic()
+        self._time(job, "queue_wait", started_at - job.queued_at)
+        if self.store is not None and await self._claim(job, self.store):
+            return
+        controller: ConcurrencyController | None = self.controller
+        if controller is not None:
+            await controller.acquire()
+        try:
+            await self.limiter.acquire(job.url)
+            download_at: float = time.monotonic()
+            self._time(job, "rate_wait", download_at - started_at)
+            state: str = ""
+            if controller is not None:
+                state = controller.describe()
+                if self.limiter.interval > 0:
+                    state += f", one start every {self.limiter.current_interval(job.url):.1f}s"
+                state = f" {DARK}({state}){RESET}"
+            self.progress.start(job.key, job.title, progress, state)
+            job.attempts += 1
+            self._record(job, RUNNING)
+            try:
+                output_dir: str = (
+                    self.store.staging(job.video_id, job.output_ext, job.audio_only)
+                    if self.store is not None
+                    else job.output_dir
+                )
+                if split:
+                    source = await self.fetcher(
+                        video_id=job.video_id,
+                        output_dir=output_dir,
+                        on_progress=self.progress.callback(job.key),
+                    )
+                    _result: int = 0
+                else:
+                    _result = await self.downloader(
+                        video_id=job.video_id,
+                        audio_only=job.audio_only,
+                        output_dir=output_dir,
+                        output_ext=job.output_ext,
+                        on_progress=self.progress.callback(job.key),
+                    )
+            except subprocess.CalledProcessError as e:
+                self._time(job, "download", time.monotonic() - download_at)
+                error_class: str = classify(e.returncode, e.stderr)
+                error: str = summarize(e.stderr)
+                if controller is not None and error_class == RATE_LIMITED:
+                    controller.throttled(download_at)
+                elif controller is not None and error_class == TRANSIENT:
+                    controller.failed(download_at)
+                if self.retry.should_retry(error_class, job.attempts):
+                    delay: float = self.retry.delay(error_class, job.attempts)
+                    if error_class == RATE_LIMITED:
+                        self.limiter.throttle(job.url, delay)
+                    self.progress.finish(job.key)
+                    self.progress.log(
+                        f"  {progress} {YELLOW}Retrying in {delay:.0f}s ({error_class}): {DARK}{error}{RESET}"
+                    )
+                    self.metrics.inc("ytdlplist_retries_total", error_class=error_class)
+                    self._record(job, QUEUED, error=error, error_class=error_class)
+                    self._retry_later(job, delay)
+                    return
+                self.progress.log(
+                    f"  {progress} {RED}Failed ({error_class}): {error}{RESET}"
+                )
+                self._record(job, FAILED, error=error, error_class=error_class)
+                await self._fail(job, error_class)
+                return
+            except (ChildProcessError, OSError) as e:
+                self._time(job, "download", time.monotonic() - download_at)
+                self.progress.log(f"  {progress} {RED}An error occurred: {e}{RESET}")
+                self._record(job, FAILED, error=str(e), error_class=PERMANENT)
+                await self._fail(job, PERMANENT)
+                return
+            seconds: float = time.monotonic() - download_at
+            self._time(job, "download", seconds)
+            if source is not None:
+                try:
+                    job.size = os.path.getsize(source)
+                except OSError:
+                    pass
+            if controller is not None and _result <= 0:
+                controller.succeeded(download_at, seconds, job.size)
+        finally:
+            if controller is not None:
+                controller.release()
+                self.metrics.set("ytdlplist_download_limit", int(controller.limit))
+        if _result > 0:
+            self._record(job, FAILED, error="could not prepare the output dir")
+            await self._fail(job, PERMANENT)
+            return
+        self.limiter.relax(job.url)
+        if source is None:
+            await self._succeed(job)
+            return
+        self._record(job, RUNNING, stage="transcode")
+        self.progress.stage(job.key, "Converting")
+        job.queued_at = time.monotonic()
+        await self._transcode_queue.put((job, source))
+
+    async def _claim(self, job: DownloadJob, store: "TrackStore") -> bool:
+        # Returns whether the job was settled without a download of its own.
+        key: tuple[str, bool, str] = (job.video_id, job.audio_only, job.output_ext)
+        leader: tuple[DownloadJob, list[DownloadJob]] | None = self._leaders.get(key)
+        if leader is not None and leader[0] is not job:
+            leader[1].append(job)
+            self.metrics.inc("ytdlplist_store_hits_total")
+            return True
+        if leader is None:
+            if store.has(job.video_id, job.output_ext, job.audio_only):
+                self.metrics.inc("ytdlplist_store_hits_total")
+                await self._succeed(job)
+                return True
+            self._leaders[key] = (job, [])
+        # A leader coming back from a retry keeps the jobs waiting on it.
+        return False
+
+    def _release(self, job: DownloadJob) -> list[DownloadJob]:
+        # Stop the job leading its key and hand back the jobs waiting on it.
+        key: tuple[str, bool, str] = (job.video_id, job.audio_only, job.output_ext)
+        leader: tuple[DownloadJob, list[DownloadJob]] | None = self._leaders.get(key)
+        if leader is None or leader[0] is not job:
+            return []
+        del self._leaders[key]
+        return leader[1]
+
+    async def _publish(self, job: DownloadJob, store: "TrackStore") -> bool:
+        # Commits a finished download to the store and links it into the
+        # job's playlist directory, then settles the jobs waiting on it.
+        followers: list[DownloadJob] = self._release(job)
+        try:
+            if not store.has(job.video_id, job.output_ext, job.audio_only):
+                store.commit(job.video_id, job.output_ext, job.audio_only)
+            store.link(
+                job.video_id, job.output_ext, job.output_dir, job.title, job.audio_only
+            )
+            published: bool = True
+        except OSError as e:
+            self.progress.log(
+                f"  {self._progress(job)} {RED}Could not store the track: {e}{RESET}"
+            )
+            self._record(job, FAILED, error=str(e), error_class=PERMANENT)
+            await self._fail(job, PERMANENT)
+            published = False
+        for follower in followers:
+            await self._succeed(follower)
+        return published
+
+    async def _succeed(self, job: DownloadJob) -> None:
+        if self.store is not None and not await self._publish(job, self.store):
+            return
+        self.results["success"] += 1
+        if job.archive is not None:
+            job.archive.add(job.video_id)
+        self._record(job, DONE)
+        self._report(job, "success")
+        await self.audio_player("successbeep.wav")
+        self.progress.log(
+            f"  {self._progress(job)} {GREEN}Done: {MAGENTA}{job.title}{RESET}"
+        )
+
+    async def _fail(self, job: DownloadJob, error_class: str) -> None:
+        self.results["error"] += 1
+        self.metrics.inc("ytdlplist_failures_total", error_class=error_class)
+        self._report(job, "error")
+        await self.audio_player("failbeep.wav")
+        for follower in self._release(job):
+            self._record(
+                follower, FAILED, error="download failed", error_class=error_class
+            )
+            await self._fail(follower, error_class)
+
+    def _time(self, job: DownloadJob, stage: str, seconds: float) -> None:
+        job.timings[stage] = job.timings.get(stage, 0.0) + seconds
+        self.metrics.observe("ytdlplist_stage_seconds", seconds, stage=stage)
+
+    def _report(self, job: DownloadJob, status: str) -> None:
+        self._pending -= 1
+        key: tuple[str, str] = (job.output_dir, job.video_id)
+        self._seen.discard(key)
+        if status == "error":
+            self.failures[key] = self.failures.get(key, 0) + 1
+        else:
+            self.failures.pop(key, None)
+        self.progress.finish(job.key)
+        self.progress.status(
+            f"{GREEN}{self.results['success']} done{YELLOW}, {RED}{self.results['error']} failed{YELLOW}, {MAGENTA}{self._pending} left"
+        )
+        self.metrics.inc("ytdlplist_tracks_total", status=status)
+        download: float = job.timings.get("download", 0.0)
+        if job.size is not None:
+            self.metrics.inc("ytdlplist_downloaded_bytes_total", job.size)
+        self.metrics.event(
+            "track",
+            id=job.video_id,
+            title=job.title,
+            output_dir=job.output_dir,
+            status=status,
+            attempts=job.attempts,
+            bytes=job.size,
+            throughput=(
+                round(job.size / download) if job.size and download > 0 else None
+            ),
+            timings={k: round(v, 3) for k, v in job.timings.items()},
+        )
+
+    def _record(self, job: DownloadJob, state: str, **fields: Any) -> None:
+        if self.journal is not None:
+            self.journal.record(
+                job.output_dir, job.video_id, state, attempts=job.attempts, **fields
+            )
+        if self.work_queue is not None and state in (DONE, FAILED):
+            self._hand_back(job, state=state, attempts=job.attempts, **fields)
+
+    def _retry_later(self, job: DownloadJob, delay: float) -> None:
+        if self.work_queue is not None:
+            # Any process may take the retry, once the delay has passed. Jobs
+            # waiting on this download go back with it, since the job that
+            # comes back from the queue is a new one.
+            self.results["retried"] += 1
+            for waiting in [job, *self._release(job)]:
+                self._pending -= 1
+                self._hand_back(
+                    waiting, state=QUEUED, attempts=waiting.attempts, delay=delay
+                )
+            return
+
+        async def requeue() -> None:
+            await asyncio.sleep(delay)
+            self.results["retried"] += 1
+            job.queued_at = time.monotonic()
+            self._queue.put_nowait(job)
+
+        self._time(job, "backoff", delay)
+        task: asyncio.Task[None] = asyncio.create_task(requeue())
+        self._retrying.add(task)
+        task.add_done_callback(self._retrying.discard)
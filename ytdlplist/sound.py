@@ -0,0 +1,198 @@
+import queue
+import threading
+from typing import Any
+
+from ytdlplist.constants import DEFAULT_SOUND_BACKLOG, DEFAULT_SOUND_DRAIN
+from ytdlplist.utils import find_sound
+
+CUES: tuple[str, ...] = ("ps1.wav", "successbeep.wav", "failbeep.wav", "slidebeep.wav")
+
+_CHUNK_FRAMES = 1024
+
+
+class Cue:
+    """
+    A sound file decoded into memory.
+
+    Attributes
+    ----------
+    frames : bytes
+        Raw PCM frames.
+
+    sample_width : int
+        Bytes per sample.
+
+    channels : int
+        Number of channels.
+
+    rate : int
+        Frames per second.
+    """
+
+    __slots__ = ("frames", "sample_width", "channels", "rate")
+
+    def __init__(self, frames: bytes, sample_width: int, channels: int, rate: int):
+        self.frames: bytes = frames
+        self.sample_width: int = sample_width
+        self.channels: int = channels
+        self.rate: int = rate
+
+    @property
+    def format(self) -> tuple[int, int, int]:
+        return (self.sample_width, self.channels, self.rate)
+
+
+class SoundService:
+    """
+    Fire-and-forget player for the audio cues.
+
+    Every cue is decoded once on ``start``. A single background thread plays
+    them through output streams that stay open for the life of the service,
+    one per sample format. Requests never block the caller: a cue that is
+    already waiting to be played is not queued twice, and cues are dropped
+    once ``backlog`` of them are waiting.
+
+    Calling the service like a coroutine function queues a cue, so it can be
+    passed anywhere an ``audio_player`` is expected.
+
+    Attributes
+    ----------
+    cues : dict[str, Cue]
+        Decoded cues, by file name.
+
+    backlog : int
+        Maximum number of cues waiting to be played.
+
+    enabled : bool
+        Whether audio output is available.
+    """
+
+    def __init__(
+        self, names: tuple[str, ...] = CUES, backlog: int = DEFAULT_SOUND_BACKLOG
+    ) -> None:
+        self.names: tuple[str, ...] = names
+        self.cues: dict[str, Cue] = {}
+        self.backlog: int = max(1, backlog)
+        self.enabled: bool = False
+        self._pending: queue.Queue[str | None] = queue.Queue()
+        self._waiting: set[str] = set()
+        self._lock: threading.Lock = threading.Lock()
+        self._stop: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pyaudio: Any = None
+        self._streams: dict[tuple[int, int, int], Any] = {}
+
+    def start(self) -> bool:
+        """
+        Decode the cues, open the audio device and start the player thread.
+
+        Returns
+        -------
+        bool
+            Whether sound is enabled. False if PyAudio is missing, no cue file
+            is found, or the audio device cannot be opened.
+        """
+        if self.enabled:
+            return True
+        try:
+            import wave
+
+            import pyaudio
+        except ImportError:
+            return False
+        for name in self.names:
+            try:
+                with wave.open(find_sound(name), "rb") as f:
+                    self.cues[name] = Cue(
+                        f.readframes(f.getnframes()),
+                        f.getsampwidth(),
+                        f.getnchannels(),
+                        f.getframerate(),
+                    )
+            except (FileNotFoundError, wave.Error, EOFError):
+                continue
+        if not self.cues:
+            return False
+        try:
+            self._pyaudio = pyaudio.PyAudio()
+        except OSError:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="ytdlplist-sound", daemon=True
+        )
+        self._thread.start()
+        self.enabled = True
+        return True
+
+    def play(self, name: str) -> None:
+        """
+        Queue a cue without waiting for it to play.
+
+        Parameters
+        ----------
+        name : str
+            Cue file name, such as ``"successbeep.wav"``.
+        """
+        if not self.enabled or name not in self.cues:
+            return
+        with self._lock:
+            if name in self._waiting or len(self._waiting) >= self.backlog:
+                return
+            self._waiting.add(name)
+        self._pending.put(name)
+
+    async def __call__(self, sound_file: str) -> None:
+        self.play(sound_file)
+
+    def close(self, drain: float = DEFAULT_SOUND_DRAIN) -> None:
+        """
+        Stop the player thread and release the audio device.
+
+        Parameters
+        ----------
+        drain : float, optional
+            Seconds to let queued cues finish playing before cutting them off,
+            by default DEFAULT_SOUND_DRAIN
+        """
+        if self._thread is not None:
+            self._pending.put(None)
+            self._thread.join(drain)
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        for stream in self._streams.values():
+            stream.stop_stream()
+            stream.close()
+        self._streams = {}
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
+            self._pyaudio = None
+        self.enabled = False
+
+    def _run(self) -> None:
+        while (name := self._pending.get()) is not None:
+            with self._lock:
+                self._waiting.discard(name)
+            cue: Cue = self.cues[name]
+            step: int = _CHUNK_FRAMES * cue.sample_width * cue.channels
+            try:
+                stream: Any = self._stream(cue)
+                for i in range(0, len(cue.frames), step):
+                    if self._stop.is_set():
+                        return
+                    stream.write(cue.frames[i : i + step])
+            except OSError:
+                # The device went away; stay quiet rather than fail downloads.
+                self.enabled = False
+                return
+
+    def _stream(self, cue: Cue) -> Any:
+        if cue.format not in self._streams:
+            self._streams[cue.format] = self._pyaudio.open(
+                format=self._pyaudio.get_format_from_width(cue.sample_width),
+                channels=cue.channels,
+                rate=cue.rate,
+                output=True,
+            )
+        return self._streams[cue.format]
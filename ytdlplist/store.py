@@ -0,0 +1,284 @@
+import filecmp
+import os
+import re
+import shutil
+
+from ytdlplist.models import TrackEntry
+
+LINK_MODES: tuple[str, ...] = ("hardlink", "symlink", "copy")
+
+# Characters that are not allowed in file names on at least one of the
+# platforms ytdlplist runs on.
+_UNSAFE = re.compile(r'[\x00-\x1f<>:"/\\|?*]')
+
+
+def safe_filename(title: str, max_length: int = 200) -> str:
+    """
+    Turn a track title into a file name that is valid on every platform.
+
+    Parameters
+    ----------
+    title : str
+        Track title.
+    max_length : int, optional
+        Maximum length of the result, by default 200
+
+    Returns
+    -------
+    str
+        File name without an extension.
+    """
+    name: str = _UNSAFE.sub("_", title).strip().rstrip(". ")
+    return name[:max_length] or "_"
+
+
+class TrackStore:
+    """
+    Content-addressed store that holds each track once, whichever playlists
+    list it.
+
+    Tracks are stored as ``<root>/<kind>/<id[:2]>/<id>.<ext>``, where kind is
+    ``audio`` or ``video``. Playlist directories get links named after the
+    track titles. Hard links are tried first, then symbolic links, then
+    copies, starting from ``link_mode``.
+
+    Attributes
+    ----------
+    root : str
+        Store directory.
+
+    link_mode : str
+        One of LINK_MODES.
+    """
+
+    def __init__(self, root: str, link_mode: str = "hardlink") -> None:
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode: {link_mode}")
+        self.root: str = root
+        self.link_mode: str = link_mode
+
+    def path(self, video_id: str, output_ext: str, audio_only: bool = True) -> str:
+        """
+        Get where a track is kept in the store.
+
+        Parameters
+        ----------
+        video_id : str
+            YouTube video ID.
+        output_ext : str
+            Output file extension.
+        audio_only : bool, optional
+            Whether the track is audio only, by default True
+
+        Returns
+        -------
+        str
+            Path to the stored file, which may not exist yet.
+        """
+        kind: str = "audio" if audio_only else "video"
+        return os.path.join(self.root, kind, video_id[:2], f"{video_id}.{output_ext}")
+
+    def has(self, video_id: str, output_ext: str, audio_only: bool = True) -> bool:
+        """
+        Check whether a track is already in the store.
+        """
+        return os.path.isfile(self.path(video_id, output_ext, audio_only))
+
+    def staging(self, video_id: str, output_ext: str, audio_only: bool = True) -> str:
+        """
+        Get, and create, the directory a track is downloaded into before it is
+        committed to the store.
+
+        Parameters
+        ----------
+        video_id : str
+            YouTube video ID.
+        output_ext : str
+            Output file extension.
+        audio_only : bool, optional
+            Whether the track is audio only, by default True
+
+        Returns
+        -------
+        str
+            Staging directory for the track.
+        """
+        kind: str = "audio" if audio_only else "video"
+        staging: str = os.path.join(
+            self.root, ".staging", f"{video_id}.{kind}.{output_ext}"
+        )
+        os.makedirs(staging, exist_ok=True)
+        return staging
+
+    def commit(self, video_id: str, output_ext: str, audio_only: bool = True) -> str:
+        """
+        Move a finished download from its staging directory into the store.
+
+        Parameters
+        ----------
+        video_id : str
+            YouTube video ID.
+        output_ext : str
+            Output file extension.
+        audio_only : bool, optional
+            Whether the track is audio only, by default True
+
+        Returns
+        -------
+        str
+            Path to the stored file.
+
+        Raises
+        ------
+        OSError :
+            If the staging directory does not hold exactly one finished file
+            with the expected extension, or it cannot be moved.
+        """
+        staging: str = self.staging(video_id, output_ext, audio_only)
+        names: list[str] = [
+            name
+            for name in os.listdir(staging)
+            if not name.endswith((".part", ".ytdl"))
+        ]
+        matches: list[str] = [
+            name for name in names if name.lower().endswith(f".{output_ext.lower()}")
+        ] or names
+        if len(matches) != 1:
+            raise OSError(
+                f"Expected one downloaded file in {staging}, found {len(matches)}."
+            )
+        target: str = self.path(video_id, output_ext, audio_only)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(os.path.join(staging, matches[0]), target)
+        shutil.rmtree(staging, ignore_errors=True)
+        return target
+
+    def link(
+        self,
+        video_id: str,
+        output_ext: str,
+        output_dir: str,
+        title: str,
+        audio_only: bool = True,
+    ) -> str:
+        """
+        Make a stored track appear in a playlist directory.
+
+        The link is named after the track title. If a different file already
+        has that name, the video ID is added to it.
+
+        Parameters
+        ----------
+        video_id : str
+            YouTube video ID.
+        output_ext : str
+            Output file extension.
+        output_dir : str
+            Playlist directory.
+        title : str
+            Track title.
+        audio_only : bool, optional
+            Whether the track is audio only, by default True
+
+        Returns
+        -------
+        str
+            Path to the file in the playlist directory.
+
+        Raises
+        ------
+        OSError :
+            If the track is not in the store or cannot be linked or copied.
+        """
+        source: str = self.path(video_id, output_ext, audio_only)
+        os.makedirs(output_dir, exist_ok=True)
+        name: str = safe_filename(title)
+        for target in (
+            os.path.join(output_dir, f"{name}.{output_ext}"),
+            os.path.join(output_dir, f"{name} [{video_id}].{output_ext}"),
+        ):
+            if not os.path.lexists(target):
+                self._materialize(source, target)
+                return target
+            if _same_file(source, target):
+                return target
+        raise FileExistsError(f"Cannot link {video_id} into {output_dir}.")
+
+    def _materialize(self, source: str, target: str) -> None:
+        modes: tuple[str, ...] = LINK_MODES[LINK_MODES.index(self.link_mode) :]
+        for mode in modes:
+            try:
+                if mode == "hardlink":
+                    os.link(source, target)
+                elif mode == "symlink":
+                    # Relative, so that the library can be moved as a whole.
+                    os.symlink(os.path.relpath(source, os.path.dirname(target)), target)
+                else:
+                    shutil.copy2(source, target)
+                return
+            except FileExistsError:
+                raise
+            except OSError:
+                # Cross-device links, or file systems and platforms that do
+                # not support them, fall through to the next mode.
+                if mode == modes[-1]:
+                    raise
+
+
+def _same_file(a: str, b: str) -> bool:
+    try:
+        return os.path.samefile(a, b) or filecmp.cmp(a, b, shallow=True)
+    except OSError:
+        return False
+
+
+def write_m3u(
+    output_dir: str, entries: list[TrackEntry], output_ext: str = "mp3"
+) -> str:
+    """
+    Write an extended M3U playlist of the tracks present in a playlist
+    directory, in playlist order.
+
+    The file is named after the directory and uses paths relative to it.
+    Tracks are found under the names TrackStore.link gives them or the one
+    yt-dlp gives them. Entries without a file are left out.
+
+    Parameters
+    ----------
+    output_dir : str
+        Playlist directory.
+    entries : list[TrackEntry]
+        Playlist entries, in order.
+    output_ext : str, optional
+        Output file extension, by default "mp3"
+
+    Returns
+    -------
+    str
+        Path to the M3U file.
+    """
+    # yt-dlp names the tracks it downloads straight into the directory.
+    from yt_dlp.utils import sanitize_filename
+
+    lines: list[str] = ["#EXTM3U"]
+    for entry in entries:
+        name: str = safe_filename(entry.title)
+        for filename in (
+            f"{name} [{entry.id}].{output_ext}",
+            f"{name}.{output_ext}",
+            f"{sanitize_filename(entry.title)}.{output_ext}",
+        ):
+            if os.path.exists(os.path.join(output_dir, filename)):
+                duration: int = round(entry.duration) if entry.duration else -1
+                lines.append(f"#EXTINF:{duration},{entry.title}")
+                lines.append(filename)
+                break
+    path: str = os.path.join(
+        output_dir, f"{os.path.basename(os.path.normpath(output_dir))}.m3u8"
+    )
+    os.makedirs(output_dir, exist_ok=True)
+    tmp_path: str = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fp:
+        fp.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+    return path
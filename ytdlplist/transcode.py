@@ -0,0 +1,133 @@
+import asyncio
+import os
+import subprocess
+import time
+
+from ytdlplist import profiling
+from ytdlplist.utils import executable
+
+# Encoder options per output extension, matching yt-dlp's --extract-audio
+# defaults. Other extensions let ffmpeg pick the encoder.
+CODEC_ARGS: dict[str, list[str]] = {
+    "mp3": ["-c:a", "libmp3lame", "-q:a", "5"],
+    "m4a": ["-c:a", "aac", "-q:a", "1.5"],
+    "aac": ["-c:a", "aac", "-q:a", "1.5"],
+    "opus": ["-c:a", "libopus", "-b:a", "128k"],
+    "ogg": ["-c:a", "libvorbis", "-q:a", "5"],
+    "flac": ["-c:a", "flac"],
+    "wav": [],
+}
+
+
+def transcode_args(source: str, target: str, output_ext: str) -> list[str]:
+    """
+    Build the ffmpeg command line that converts a downloaded audio stream.
+
+    Each ffmpeg process is limited to one thread, so that the number of
+    transcode workers decides how many cores are used.
+
+    Parameters
+    ----------
+    source : str
+        Downloaded file.
+    target : str
+        File to write.
+    output_ext : str
+        Output file extension.
+
+    Returns
+    -------
+    list[str]
+        Argument list, starting with the ffmpeg executable.
+    """
+    return [
+        executable("ffmpeg"),
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-i",
+        source,
+        "-vn",
+        "-map_metadata",
+        "0",
+        "-threads",
+        "1",
+        *CODEC_ARGS.get(output_ext, []),
+        target,
+    ]
+
+
+class Transcoder:
+    """
+    Converts downloaded audio streams to the requested format with ffmpeg.
+
+    Attributes
+    ----------
+    workers : int
+        Number of ffmpeg processes to run at once; defaults to the number of
+        CPU cores.
+
+    keep_source : bool
+        Whether to keep the downloaded file after converting it.
+    """
+
+    def __init__(self, workers: int | None = None, keep_source: bool = False) -> None:
+        self.workers: int = max(1, workers or os.cpu_count() or 1)
+        self.keep_source: bool = keep_source
+
+    async def transcode(self, source: str, output_ext: str) -> str:
+        """
+        Convert a file, next to it, to ``output_ext``.
+
+        Files that already have the right extension are left as they are.
+
+        Parameters
+        ----------
+        source : str
+            Downloaded file.
+        output_ext : str
+            Output file extension.
+
+        Returns
+        -------
+        str
+            Path to the converted file.
+
+        Raises
+        ------
+        ChildProcessError :
+            If the ffmpeg process could not be started.
+        subprocess.CalledProcessError :
+            If ffmpeg exits with an error.
+        """
+        base, ext = os.path.splitext(source)
+        if ext.lstrip(".").lower() == output_ext.lower():
+            return source
+        target: str = f"{base}.{output_ext}"
+        _args: list[str] = transcode_args(source, target, output_ext)
+        spawned_at: float = time.monotonic()
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *_args,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as e:
+            raise ChildProcessError("Error starting ffmpeg:", e) from e
+        profiling.watch(proc, "ffmpeg transcode", spawned_at)
+        try:
+            _, stderr = await proc.communicate()
+        finally:
+            if proc.returncode is None:
+                # The conversion was cancelled; don't leave ffmpeg running.
+                proc.kill()
+                await proc.wait()
+        if proc.returncode:
+            raise subprocess.CalledProcessError(
+                proc.returncode, _args, stderr=stderr.decode(errors="replace")
+            )
+        if not self.keep_source:
+            os.remove(source)
+        return target
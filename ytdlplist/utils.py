@@ -1,10 +1,19 @@
+import asyncio
+import functools
 import os
+import subprocess
+import time
 
+from ytdlplist import profiling
 
+
+@functools.cache
 def find_data_dir() -> str:
     """
     Find the data directory.
 
+    The result is cached for the life of the process.
+
     Returns
     -------
     str
@@ -64,10 +73,13 @@ def ensure_valid_destination(path: str) -> int:
         ) from e
 
 
+@functools.cache
 def find_sound(sound_file: str) -> str:
     """
     Find a sound file.
 
+    Found paths are cached for the life of the process.
+
     Parameters
     ----------
     sound_file : str
@@ -92,3 +104,77 @@ def find_sound(sound_file: str) -> str:
         return soundpath
     else:
         raise FileNotFoundError("Sound file not found.")
+
+
+async def check_output_async(args: list[str], name: str = "command") -> bytes:
+    """
+    Run a command without blocking the event loop and return its output.
+
+    Parameters
+    ----------
+    args : list[str]
+        Command and arguments.
+    name : str, optional
+        What the command is for, in profiles, by default "command"
+
+    Returns
+    -------
+    bytes
+        Captured standard output.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If the command exits with a non-zero status.
+    """
+    spawned_at: float = time.monotonic()
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    profiling.watch(proc, name, spawned_at)
+    stdout, stderr = await proc.communicate()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(
+            proc.returncode or 0, args, output=stdout, stderr=stderr
+        )
+    return stdout
+
+
+def executable(name: str) -> str:
+    """
+    Get the command to run for an external program.
+
+    ``YTDLPLIST_YTDLP`` and ``YTDLPLIST_FFMPEG`` override ``yt-dlp`` and
+    ``ffmpeg``, for example to point at a specific build or a local stand-in.
+
+    Parameters
+    ----------
+    name : str
+        Program name, ``"yt-dlp"`` or ``"ffmpeg"``.
+
+    Returns
+    -------
+    str
+        Command to run.
+    """
+    variable: str = "YTDLPLIST_" + name.upper().replace("-", "")
+    return os.environ.get(variable) or name
+
+
+def get_cache_dir() -> str:
+    """
+    Get the directory used for ytdlplist's caches and state files.
+
+    Honours ``XDG_CACHE_HOME`` and falls back to ``~/.cache``.
+
+    Returns
+    -------
+    str
+        Path to the cache directory. It is not created.
+    """
+    base: str = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "ytdlplist")
@@ -0,0 +1,449 @@
+import asyncio
+import json
+import os
+import random
+import signal
+from subprocess import CalledProcessError
+from time import monotonic
+from typing import Any, Callable, Coroutine
+
+from ytdlplist.archive import DownloadArchive
+from ytdlplist.backends import Backend
+from ytdlplist.cache import MetadataCache, fetch_incremental
+from ytdlplist.constants import (
+    DEFAULT_METADATA_CONCURRENCY,
+    DEFAULT_WATCH_INTERVAL,
+    DEFAULT_WATCH_RELOAD,
+    DEFAULT_WATCH_RETRIES,
+    GREEN,
+    MAGENTA,
+    RED,
+    RESET,
+    YELLOW,
+)
+from ytdlplist.fairqueue import PlaylistPolicy
+from ytdlplist.journal import RunJournal
+from ytdlplist.metrics import RunMetrics
+from ytdlplist.models import PlaylistSnapshot, TrackEntry
+from ytdlplist.playlist_index import normalize_playlist, playlist_url
+from ytdlplist.playlist_util import Playlist
+from ytdlplist.scheduler import DownloadScheduler
+from ytdlplist.store import write_m3u
+
+
+def read_watchlist(
+    path: str, default_interval: float
+) -> dict[str, tuple[float, PlaylistPolicy]]:
+    """
+    Read playlists.json along with each playlist's poll interval and policy.
+
+    Entries are either playlist URLs or objects such as
+    ``{"url": "...", "interval": 1800, "priority": 1}``.
+
+    Parameters
+    ----------
+    path : str
+        Path to playlists.json.
+    default_interval : float
+        Poll interval for entries that do not set their own.
+
+    Returns
+    -------
+    dict[str, tuple[float, PlaylistPolicy]]
+        Poll interval in seconds and policy, keyed by canonical playlist URL.
+        Invalid and repeated playlists are left out.
+
+    Raises
+    ------
+    OSError :
+        If the file cannot be read.
+    ValueError :
+        If the file is not valid JSON, or a policy value is out of range.
+    """
+    with open(path, "r") as fp:
+        raw: list[str | dict[str, Any]] = json.load(fp)
+    intervals: dict[str, tuple[float, PlaylistPolicy]] = {}
+    for item in raw:
+        value: str = item.get("url", "") if isinstance(item, dict) else item
+        playlist_id: str | None = (
+            normalize_playlist(value) if isinstance(value, str) else None
+        )
+        if playlist_id is None:
+            continue
+        interval: float = (
+            float(item.get("interval", default_interval))
+            if isinstance(item, dict)
+            else default_interval
+        )
+        intervals.setdefault(
+            playlist_url(playlist_id), (interval, PlaylistPolicy.from_entry(item))
+        )
+    return intervals
+
+
+class WatchedPlaylist:
+    """
+    Poll state of one playlist in watch mode.
+
+    Attributes
+    ----------
+    playlist : Playlist
+        The playlist.
+
+    interval : float
+        Seconds between polls.
+
+    next_poll : float
+        Monotonic time of the next poll.
+
+    snapshot : PlaylistSnapshot | None
+        Entries seen by the last poll, or None before the first one.
+
+    polling : bool
+        Whether a poll is in progress.
+
+    deferred : set[str]
+        IDs of entries left out by the playlist's track limit, which the next
+        poll queues again.
+    """
+
+    __slots__ = ("playlist", "interval", "next_poll", "snapshot", "polling", "deferred")
+
+    def __init__(self, playlist: Playlist, interval: float) -> None:
+        self.playlist: Playlist = playlist
+        self.interval: float = interval
+        self.next_poll: float = 0.0
+        self.snapshot: PlaylistSnapshot | None = None
+        self.polling: bool = False
+        self.deferred: set[str] = set()
+
+
+class PlaylistWatcher:
+    """
+    Long-running sync loop that polls playlists and queues their new tracks.
+
+    Each playlist is polled on its own interval. A poll fetches only the
+    head of the playlist, back to the first video seen before, and queues the
+    entries that were not in the previous poll, along with those that failed
+    fewer than DEFAULT_WATCH_RETRIES times and those a playlist's track limit
+    left out. The first poll of a playlist
+    queues all of its entries, leaving it to the download archive to skip
+    those already downloaded. playlists.json is reloaded whenever it changes,
+    and the run journal is reset whenever the scheduler runs out of work.
+
+    Attributes
+    ----------
+    path : str
+        Path to playlists.json.
+
+    scheduler : DownloadScheduler
+        Scheduler that new tracks are submitted to. It must be started.
+
+    backend : Backend
+        Backend used to run yt-dlp.
+
+    audio_player : Callable[..., Coroutine[Any, Any, None]]
+        Coroutine to play a sound file.
+
+    output_root : str
+        Directory that holds one subdirectory per playlist.
+
+    interval : float
+        Poll interval for playlists that do not set their own.
+
+    cache : MetadataCache | None
+        Cache that seeds the first poll and is updated after every poll.
+
+    incremental : bool
+        Whether polls fetch only the head of a playlist.
+
+    use_archive : bool
+        Whether to skip tracks recorded in the download archive.
+
+    title_lookup : bool
+        Whether to fall back to a separate yt-dlp title lookup.
+
+    journal : RunJournal | None
+        Journal to reset whenever the scheduler is idle.
+
+    metrics : RunMetrics | None
+        Where poll timings are recorded.
+
+    m3u : bool
+        Whether to rewrite each playlist's M3U file after polling it. Tracks
+        still downloading join the file at the next poll.
+
+    playlists : dict[str, WatchedPlaylist]
+        Watched playlists, keyed by URL.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        scheduler: DownloadScheduler,
+        backend: Backend,
+        audio_player: Callable[..., Coroutine[Any, Any, None]],
+        output_root: str,
+        interval: float = DEFAULT_WATCH_INTERVAL,
+        cache: MetadataCache | None = None,
+        incremental: bool = True,
+        use_archive: bool = True,
+        title_lookup: bool = True,
+        journal: RunJournal | None = None,
+        metrics: RunMetrics | None = None,
+        m3u: bool = False,
+    ) -> None:
+        self.path: str = path
+        self.scheduler: DownloadScheduler = scheduler
+        self.backend: Backend = backend
+        self.audio_player: Callable[..., Coroutine[Any, Any, None]] = audio_player
+        self.output_root: str = output_root
+        self.interval: float = interval
+        self.cache: MetadataCache | None = cache
+        self.incremental: bool = incremental
+        self.use_archive: bool = use_archive
+        self.title_lookup: bool = title_lookup
+        self.journal: RunJournal | None = journal
+        self.metrics: RunMetrics = metrics or RunMetrics()
+        self.m3u: bool = m3u
+        self.playlists: dict[str, WatchedPlaylist] = {}
+        self._mtime: float | None = None
+        self._slots = asyncio.Semaphore(DEFAULT_METADATA_CONCURRENCY)
+        self._polls: set[asyncio.Task[None]] = set()
+        self._stopping: bool = False
+        self._wake = asyncio.Event()
+
+    def reload(self) -> bool:
+        """
+        Re-read playlists.json if it changed since it was last read.
+
+        New playlists are polled straight away, removed ones are dropped, and
+        changed intervals and policies apply from the next poll on. An
+        unreadable file is reported and the current playlists are kept.
+
+        Returns
+        -------
+        bool
+            Whether the file was re-read.
+        """
+        try:
+            mtime: float = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        try:
+            intervals: dict[str, tuple[float, PlaylistPolicy]] = read_watchlist(
+                self.path, self.interval
+            )
+        except (OSError, ValueError, TypeError) as e:
+            self.scheduler.progress.log(
+                f"{RED}Could not reload {self.path}: {e}{RESET}"
+            )
+            return False
+        for url in [url for url in self.playlists if url not in intervals]:
+            del self.playlists[url]
+        for url, (interval, policy) in intervals.items():
+            if url in self.playlists:
+                self.playlists[url].interval = interval
+                self.playlists[url].playlist.policy = policy
+                continue
+            try:
+                playlist = Playlist(
+                    url,
+                    self.audio_player,
+                    self.backend,
+                    progress=self.scheduler.progress,
+                    policy=policy,
+                )
+            except ValueError as e:
+                self.scheduler.progress.log(f"{RED}Skipping {url}: {e}{RESET}")
+                continue
+            self.playlists[url] = WatchedPlaylist(playlist, interval)
+        self.scheduler.progress.log(
+            f"{YELLOW}Watching {MAGENTA}{len(self.playlists)}{YELLOW} playlists.{RESET}"
+        )
+        return True
+
+    def stop(self) -> None:
+        """
+        Make ``run`` return once it wakes up, without waiting for the queue.
+        """
+        self._stopping = True
+        self._wake.set()
+
+    async def run(self) -> None:
+        """
+        Poll playlists as they fall due until SIGTERM is received, ``stop`` is
+        called or the task is cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGTERM, self.stop)
+        except (NotImplementedError, RuntimeError):
+            # Signal handlers are not available on Windows event loops.
+            pass
+        try:
+            while not self._stopping:
+                self.reload()
+                now: float = monotonic()
+                for watched in self.playlists.values():
+                    if not watched.polling and watched.next_poll <= now:
+                        watched.polling = True
+                        task: asyncio.Task[None] = asyncio.create_task(
+                            self.poll(watched)
+                        )
+                        self._polls.add(task)
+                        task.add_done_callback(self._polls.discard)
+                if self.journal is not None and len(self.journal):
+                    if not self.scheduler.pending:
+                        self.journal.close(finished=True)
+                        self.journal.open(resume=False)
+                next_poll: float = min(
+                    (w.next_poll for w in self.playlists.values() if not w.polling),
+                    default=now + DEFAULT_WATCH_RELOAD,
+                )
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wake.wait(),
+                        max(0.0, min(DEFAULT_WATCH_RELOAD, next_poll - now)),
+                    )
+                except TimeoutError:
+                    pass
+        finally:
+            for task in self._polls:
+                task.cancel()
+            try:
+                loop.remove_signal_handler(signal.SIGTERM)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+    async def poll(self, watched: WatchedPlaylist) -> int:
+        """
+        Fetch a playlist's new entries and queue them.
+
+        Parameters
+        ----------
+        watched : WatchedPlaylist
+            Playlist to poll.
+
+        Returns
+        -------
+        int
+            Number of tracks queued.
+        """
+        playlist: Playlist = watched.playlist
+        try:
+            async with self._slots:
+                started_at: float = monotonic()
+                try:
+                    snapshot: PlaylistSnapshot = await self.fetch(watched)
+                except CalledProcessError as e:
+                    self.metrics.inc("ytdlplist_playlist_errors_total")
+                    self.scheduler.progress.log(
+                        f"  {YELLOW}[{RED}SKIP{YELLOW}] {RED}Error retrieving playlist information for playlist id {MAGENTA}{playlist.id}{YELLOW}: {RED}{e}{RESET}"
+                    )
+                    return 0
+                await playlist.settle_title(snapshot.title, self.title_lookup)
+                seconds: float = monotonic() - started_at
+            output_dir: str = playlist.output_dir(self.output_root)
+            failures: dict[tuple[str, str], int] = self.scheduler.failures
+            listed: set[str] = {entry.id for entry in snapshot.entries}
+            for key in [k for k in failures if k[0] == output_dir]:
+                if key[1] not in listed:
+                    del failures[key]
+            new: list[TrackEntry] = snapshot.entries
+            if watched.snapshot is not None:
+                known: set[str] = {entry.id for entry in watched.snapshot.entries}
+                new = [
+                    entry
+                    for entry in snapshot.entries
+                    if entry.id not in known
+                    or entry.id in watched.deferred
+                    or 0
+                    < failures.get((output_dir, entry.id), 0)
+                    < DEFAULT_WATCH_RETRIES
+                ]
+            watched.snapshot = snapshot
+            deferred: list[TrackEntry] = []
+            queued: int = playlist.enqueue(
+                self.scheduler,
+                output_dir=output_dir,
+                entries=new,
+                archive=(
+                    DownloadArchive.for_directory(output_dir)
+                    if self.use_archive
+                    else None
+                ),
+                deferred=deferred,
+            )
+            watched.deferred = {entry.id for entry in deferred}
+            if self.m3u:
+                try:
+                    write_m3u(output_dir, snapshot.entries)
+                except OSError as e:
+                    self.scheduler.progress.log(
+                        f"{RED}Could not write the M3U file: {e}{RESET}"
+                    )
+            if queued:
+                self.scheduler.progress.log(
+                    f"  {YELLOW}Queued {GREEN}{queued} new tracks{YELLOW} from {MAGENTA}{playlist.title}{YELLOW}.{RESET}"
+                )
+            self.metrics.observe("ytdlplist_playlist_metadata_seconds", seconds)
+            self.metrics.event(
+                "poll",
+                id=playlist.id,
+                title=playlist.title,
+                entries=len(snapshot.entries),
+                queued=queued,
+                metadata_seconds=round(seconds, 3),
+            )
+            return queued
+        finally:
+            # Spread polls out so that playlists with the same interval do not
+            # all hit the network at once.
+            watched.next_poll = monotonic() + watched.interval * random.uniform(
+                0.9, 1.1
+            )
+            watched.polling = False
+            self._wake.set()
+
+    async def fetch(self, watched: WatchedPlaylist) -> PlaylistSnapshot:
+        """
+        Get a playlist's current entries, fetching only its head when a
+        previous snapshot is known.
+
+        Parameters
+        ----------
+        watched : WatchedPlaylist
+            Playlist to fetch.
+
+        Returns
+        -------
+        PlaylistSnapshot
+            The playlist's ID, title and entries.
+
+        Raises
+        ------
+        subprocess.CalledProcessError :
+            If an error occurs when running the yt-dlp command.
+        """
+        playlist: Playlist = watched.playlist
+        self.scheduler.progress.log(
+            f"  {YELLOW}Checking {MAGENTA}{playlist.title}{YELLOW} for new tracks...{RESET}"
+        )
+        previous: PlaylistSnapshot | None = watched.snapshot
+        if previous is None and self.cache is not None:
+            previous = self.cache.get(playlist.id)
+        if previous is not None and self.incremental:
+            snapshot: PlaylistSnapshot = await fetch_incremental(
+                self.backend, playlist.url, previous
+            )
+        else:
+            snapshot = await self.backend.fetch_playlist(playlist.url)
+        if self.cache is not None:
+            self.cache.put(playlist.id, snapshot)
+            self.cache.save()
+        return snapshot
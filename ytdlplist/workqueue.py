@@ -0,0 +1,288 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from ytdlplist.journal import DONE, FAILED, QUEUED, RUNNING
+from ytdlplist.retry import PERMANENT
+
+QueueKey = tuple[str, str]
+
+# Track fields kept alongside the key, as in journal records.
+_FIELDS: tuple[str, ...] = ("title", "audio", "ext", "pos", "total", "archive")
+
+
+class WorkQueue:
+    """
+    Interface for a track queue shared by several ytdlplist processes,
+    possibly on different hosts.
+
+    Tracks are identified by their output directory and video ID, and carry
+    the same fields as journal records. A worker claims tracks for a lease,
+    keeps the lease alive with heartbeats while it works on them and settles
+    them when done. Tracks whose lease runs out, because their worker died,
+    can be claimed again by any worker.
+    """
+
+    def put(self, tracks: list[dict[str, Any]]) -> int:
+        """
+        Add tracks that are not in the queue yet, and queue again those that
+        failed with an error that is not permanent.
+
+        Parameters
+        ----------
+        tracks : list[dict[str, Any]]
+            Tracks, each with ``dir`` and ``id`` keys and journal fields.
+
+        Returns
+        -------
+        int
+            Number of tracks added or queued again.
+        """
+        raise NotImplementedError
+
+    def claim(self, worker: str, limit: int, lease: float) -> list[dict[str, Any]]:
+        """
+        Take up to ``limit`` tracks that are due, or whose lease expired.
+
+        Parameters
+        ----------
+        worker : str
+            ID of the claiming worker.
+        limit : int
+            Maximum number of tracks to claim.
+        lease : float
+            Seconds the claim lasts without a heartbeat.
+
+        Returns
+        -------
+        list[dict[str, Any]]
+            Claimed tracks, oldest first.
+        """
+        raise NotImplementedError
+
+    def heartbeat(self, worker: str, keys: list[QueueKey], lease: float) -> None:
+        """
+        Extend the worker's leases on tracks it still holds.
+        """
+        raise NotImplementedError
+
+    def settle(
+        self, worker: str, updates: list[tuple[str, str, dict[str, Any]]]
+    ) -> None:
+        """
+        Record the outcome of claimed tracks.
+
+        A track whose lease ran out and was claimed by another worker only
+        takes a DONE outcome from this one; failures and hand-backs are left
+        to the worker that holds it now.
+
+        Parameters
+        ----------
+        worker : str
+            ID of the worker that held the tracks.
+        updates : list[tuple[str, str, dict[str, Any]]]
+            Output directory, video ID and fields of each track. ``state`` is
+            DONE, FAILED, or QUEUED to hand the track back; ``delay`` keeps a
+            handed back track from being claimed for that many seconds.
+        """
+        raise NotImplementedError
+
+    def remaining(self) -> int:
+        """
+        Count the tracks that are queued or being worked on.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Release the queue's resources.
+        """
+
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    WorkQueue kept in a SQLite database, which may sit on shared storage.
+
+    Claims run in ``BEGIN IMMEDIATE`` transactions, so SQLite's file lock
+    stops two workers from taking the same track. The rollback journal is
+    used instead of WAL, which needs shared memory and does not work on
+    network file systems. Lease times are wall-clock times, so the hosts'
+    clocks must roughly agree. Finished tracks stay in the database, so
+    adding them again is a no-op, as it is for tracks that failed for good;
+    delete the file to start over.
+
+    Attributes
+    ----------
+    path : str
+        Path to the database file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        # Calls arrive from asyncio.to_thread, so the connection is shared
+        # between threads behind the lock.
+        self._db = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=DELETE")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS tracks (
+                output_dir TEXT NOT NULL,
+                video_id TEXT NOT NULL,
+                fields TEXT NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                owner TEXT,
+                lease_until REAL NOT NULL DEFAULT 0,
+                not_before REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                error_class TEXT,
+                PRIMARY KEY (output_dir, video_id)
+            )
+            """)
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS tracks_state ON tracks (state, not_before)"
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # The connection is in autocommit mode so that every write takes the
+        # database lock up front, instead of upgrading a read lock mid-way.
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def put(self, tracks: list[dict[str, Any]]) -> int:
+        rows: list[tuple[str, str, str, int]] = [
+            (
+                track["dir"],
+                track["id"],
+                json.dumps({k: track[k] for k in _FIELDS if k in track}),
+                track.get("attempts", 0),
+            )
+            for track in tracks
+        ]
+        with self._transaction() as db:
+            before: int = db.total_changes
+            db.executemany(
+                "INSERT INTO tracks (output_dir, video_id, fields, state, attempts)"
+                f" VALUES (?, ?, ?, '{QUEUED}', ?)"
+                " ON CONFLICT (output_dir, video_id) DO UPDATE SET"
+                f" fields = excluded.fields, state = '{QUEUED}', owner = NULL,"
+                " attempts = excluded.attempts, not_before = 0, error = NULL,"
+                f" error_class = NULL WHERE state = '{FAILED}'"
+                f" AND error_class IS NOT '{PERMANENT}'",
+                rows,
+            )
+            return db.total_changes - before
+
+    def claim(self, worker: str, limit: int, lease: float) -> list[dict[str, Any]]:
+        if limit <= 0:
+            return []
+        now: float = time.time()
+        with self._transaction() as db:
+            rows: list[tuple[Any, ...]] = db.execute(
+                "SELECT rowid, output_dir, video_id, fields, attempts FROM tracks"
+                " WHERE state = ? AND not_before <= ? ORDER BY rowid LIMIT ?",
+                (QUEUED, now, limit),
+            ).fetchall()
+            if len(rows) < limit:
+                # Tracks whose worker stopped sending heartbeats.
+                rows += db.execute(
+                    "SELECT rowid, output_dir, video_id, fields, attempts FROM tracks"
+                    " WHERE state = ? AND lease_until < ? ORDER BY rowid LIMIT ?",
+                    (RUNNING, now, limit - len(rows)),
+                ).fetchall()
+            db.executemany(
+                "UPDATE tracks SET state = ?, owner = ?, lease_until = ?"
+                " WHERE rowid = ?",
+                [(RUNNING, worker, now + lease, row[0]) for row in rows],
+            )
+        return [
+            {"dir": output_dir, "id": video_id, "attempts": attempts, **json.loads(f)}
+            for _, output_dir, video_id, f, attempts in rows
+        ]
+
+    def heartbeat(self, worker: str, keys: list[QueueKey], lease: float) -> None:
+        if not keys:
+            return
+        lease_until: float = time.time() + lease
+        with self._transaction() as db:
+            db.executemany(
+                "UPDATE tracks SET lease_until = ?"
+                " WHERE output_dir = ? AND video_id = ? AND owner = ? AND state = ?",
+                [(lease_until, d, v, worker, RUNNING) for d, v in keys],
+            )
+
+    def settle(
+        self, worker: str, updates: list[tuple[str, str, dict[str, Any]]]
+    ) -> None:
+        if not updates:
+            return
+        now: float = time.time()
+        rows: list[tuple[Any, ...]] = []
+        for output_dir, video_id, fields in updates:
+            state: str = fields["state"]
+            rows.append(
+                (
+                    state,
+                    None if state in (QUEUED, DONE) else worker,
+                    now + fields.get("delay", 0) if state == QUEUED else 0,
+                    fields.get("attempts", 0),
+                    fields.get("error"),
+                    fields.get("error_class"),
+                    output_dir,
+                    video_id,
+                    DONE,
+                    worker,
+                    state,
+                    DONE,
+                )
+            )
+        with self._transaction() as db:
+            # A track another worker already finished is left as it is, and
+            # only the worker holding the lease may fail or requeue a track.
+            db.executemany(
+                "UPDATE tracks SET state = ?, owner = ?, not_before = ?, attempts = ?,"
+                " error = ?, error_class = ? WHERE output_dir = ? AND video_id = ?"
+                " AND state != ? AND (owner = ? OR ? = ?)",
+                rows,
+            )
+
+    def remaining(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM tracks WHERE state IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+
+    def counts(self) -> dict[str, int]:
+        """
+        Count tracks by state.
+
+        Returns
+        -------
+        dict[str, int]
+            Number of tracks in each state.
+        """
+        counts: dict[str, int] = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        with self._lock:
+            for state, count in self._db.execute(
+                "SELECT state, COUNT(*) FROM tracks GROUP BY state"
+            ):
+                counts[state] = count
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -1,76 +1,71 @@
+import argparse
 import asyncio
 import json
-from concurrent.futures import ThreadPoolExecutor
 from os import name as osname
-from os import path, system
-from types import ModuleType
-from typing import Callable, Coroutine, Literal
-
-from ytdlplist.constants import BANNER, RESET, YELLOW
+from os import environ, path, system
+from time import monotonic
+from subprocess import CalledProcessError
+from typing import TYPE_CHECKING, Any, Callable, Coroutine
+
+from ytdlplist.backends import BACKENDS, Backend, get_backend
+from ytdlplist.cache import MetadataCache
+from ytdlplist.constants import (
+    BANNER,
+    DARK,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_CONCURRENCY,
+    DEFAULT_INTERVAL,
+    DEFAULT_LEASE,
+    DEFAULT_METADATA_CONCURRENCY,
+    DEFAULT_MIN_CONCURRENCY,
+    DEFAULT_RETRIES,
+    DEFAULT_WATCH_INTERVAL,
+    GREEN,
+    MAGENTA,
+    RED,
+    RESET,
+    YELLOW,
+)
+from ytdlplist.fairqueue import PlaylistPolicy, playlist_policies
+from ytdlplist.journal import RunJournal
+from ytdlplist.metrics import RunMetrics
+from ytdlplist.playlist_index import PlaylistIndex
 from ytdlplist.playlist_util import Playlist
-from ytdlplist.utils import find_data_dir, find_sound
-
-executor = ThreadPoolExecutor(max_workers=1)
-
-
-wave: ModuleType | None = None
-pyaudio: ModuleType | None = None
-
-sound_enabled = False
-
-
-def sound_init():
-    global sound_enabled, wave, pyaudio
-    try:
-        wave = __import__("wave")
-
-        pyaudio = __import__("pyaudio")
-
-        sound_enabled = True
-    except ImportError:
-        pass
-
-
-async def __play_sound(sound_file: str) -> None:
+from ytdlplist.profiling import PROFILE_MODES
+from ytdlplist.progress import PROGRESS_MODES, ProgressView, get_progress_view
+from ytdlplist.retry import RetryPolicy
+from ytdlplist.scheduler import DownloadScheduler
+from ytdlplist.store import LINK_MODES, TrackStore, write_m3u
+from ytdlplist.utils import find_data_dir
+
+# Modules that only some options need are imported where they are used, so
+# that a plain run starts without them.
+if TYPE_CHECKING:
+    from ytdlplist.adaptive import ConcurrencyController
+    from ytdlplist.planner import SyncPlan
+    from ytdlplist.profiling import Profiler
+    from ytdlplist.ranged import RangedFetcher
+    from ytdlplist.sound import SoundService
+    from ytdlplist.transcode import Transcoder
+    from ytdlplist.workqueue import WorkQueue
+
+sound_service: "SoundService | None" = None
+
+
+def sound_init() -> bool:
     """
-    Play a sound file.
+    Load the audio cues and start the sound service.
 
-    Parameters
-    ----------
-    sound_file : str
-        Path to the sound file to play.
+    Returns
+    -------
+    bool
+        Whether sound is enabled.
     """
-    global sound_enabled
-    if not sound_enabled:
-        return
+    global sound_service
+    from ytdlplist.sound import SoundService
 
-    def _play_sound(sound_file: str):
-        global sound_enabled, pyaudio, wave
-        try:
-            sound_file = find_sound(sound_file)
-        except FileNotFoundError:
-            sound_enabled = False
-            return
-        if sound_enabled and pyaudio and wave:
-            chunk: Literal[1024] = 1024
-            f = wave.open(sound_file, "rb")
-            p = pyaudio.PyAudio()
-            stream = p.open(
-                format=p.get_format_from_width(f.getsampwidth()),
-                channels=f.getnchannels(),
-                rate=f.getframerate(),
-                output=True,
-            )
-            data: bytes = f.readframes(chunk)
-            while data:
-                stream.write(data)
-                data = f.readframes(chunk)
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
-
-    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
-    await loop.run_in_executor(executor, _play_sound, sound_file)
+    sound_service = sound_service or SoundService()
+    return sound_service.start()
 
 
 def get_sound_player() -> Callable[..., Coroutine[str, None, None]]:
@@ -80,13 +75,15 @@ def get_sound_player() -> Callable[..., Coroutine[str, None, None]]:
     Returns
     -------
     Coroutine
-        The sound player coroutine.
+        The sound player coroutine. It queues the sound and returns at once.
     """
 
     async def dummy_player(sound_file: str) -> None:
         pass
 
-    return __play_sound if sound_enabled else dummy_player
+    if sound_service is not None and sound_service.enabled:
+        return sound_service
+    return dummy_player
 
 
 async def play_sound(sound_file: str) -> None:
@@ -97,11 +94,6 @@ async def play_sound(sound_file: str) -> None:
     ----------
     sound_file : str
         Path to the sound file to play.
-
-    Raises
-    ------
-    FileNotFoundError
-        If the sound file does not exist.
     """
     await get_sound_player()(sound_file)
 
@@ -109,25 +101,290 @@ async def play_sound(sound_file: str) -> None:
 async def dlplist_main(
     playlists: list[str],
     player: Callable[..., Coroutine[str, None, None]] | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    interval: float = DEFAULT_INTERVAL,
+    title_lookup: bool = True,
+    backend: str = "cli",
+    cache_ttl: float | None = DEFAULT_CACHE_TTL,
+    incremental: bool = True,
+    use_archive: bool = True,
+    resume: bool = True,
+    retries: int = DEFAULT_RETRIES,
+    show_banner: bool = True,
+    split_transcode: bool = True,
+    transcode_workers: int | None = None,
+    metrics_file: str | None = None,
+    prometheus_file: str | None = None,
+    prometheus_port: int | None = None,
+    watch: str | None = None,
+    watch_interval: float = DEFAULT_WATCH_INTERVAL,
+    use_store: bool = False,
+    link_mode: str = "hardlink",
+    m3u: bool = False,
+    work_queue: str | None = None,
+    worker_id: str | None = None,
+    lease: float = DEFAULT_LEASE,
+    adaptive: bool = False,
+    min_concurrency: int = DEFAULT_MIN_CONCURRENCY,
+    min_interval: float | None = None,
+    connections: int = 1,
+    progress_mode: str = "auto",
+    dry_run: bool = False,
+    plan: bool = False,
+    policies: dict[str, PlaylistPolicy] | None = None,
+    profile: str | None = None,
+    profile_mode: str | None = None,
 ) -> None:
-    # Create the tasks
-    sound_task = asyncio.create_task(play_sound("ps1.wav"))
-    banner_task = asyncio.create_task(abanner())
-    await asyncio.gather(sound_task, banner_task)
-
-    for _playlist in playlists:
-        playlist = Playlist(_playlist, player or get_sound_player())
-        await playlist.async_init()
-        pname: str = playlist.title.replace(" ", "_")
-        outdir: str = path.join(
-            path.expanduser("~"), "Music", "yt-dlp", "Playlists", pname
+    profiler: Profiler | None = None
+    if profile:
+        from ytdlplist.profiling import Profiler
+
+        profiler = Profiler(profile_mode)
+        profiler.start()
+    await play_sound("ps1.wav")
+    if show_banner:
+        await abanner()
+
+    audio_player = player or get_sound_player()
+    progress: ProgressView = get_progress_view(progress_mode)
+    metrics = RunMetrics(metrics_file, prometheus_file)
+    if prometheus_port is not None:
+        await metrics.serve(prometheus_port)
+    run_started_at: float = monotonic()
+    engine: Backend = get_backend(
+        backend, workers=concurrency, metrics=metrics, fragments=connections
+    )
+    ranged: RangedFetcher | None = None
+    # Ranged fetches feed the transcoders; inline downloads only get the
+    # backend's concurrent fragments.
+    if connections > 1 and split_transcode:
+        from ytdlplist.ranged import RangedFetcher
+
+        ranged = RangedFetcher(engine, connections, streams=concurrency)
+    cache: MetadataCache | None = (
+        MetadataCache(ttl=cache_ttl) if cache_ttl is not None else None
+    )
+    music_root: str = path.join(path.expanduser("~"), "Music", "yt-dlp")
+    output_root: str = path.join(music_root, "Playlists")
+    store: TrackStore | None = (
+        TrackStore(path.join(music_root, "Store"), link_mode) if use_store else None
+    )
+    index: PlaylistIndex = PlaylistIndex.from_inputs(playlists)
+    playlists = list(index.urls.values())
+    policies = policies or {}
+
+    async def make_plan() -> "SyncPlan":
+        from ytdlplist.planner import build_plan
+
+        sync_plan: SyncPlan = await build_plan(
+            [
+                Playlist(
+                    _playlist,
+                    audio_player,
+                    engine,
+                    cache=cache,
+                    incremental=incremental,
+                    progress=progress,
+                    policy=policies.get(_playlist),
+                )
+                for _playlist in playlists
+            ],
+            output_root,
+            store=store,
+            use_archive=use_archive,
+            title_lookup=title_lookup,
         )
-        await playlist.download(
-            audio_only=True,
-            output_dir=outdir,
-            output_ext="mp3",
-            interval=30,
+        if cache:
+            cache.save()
+        sync_plan.report(progress, concurrency, interval, verbose=dry_run)
+        return sync_plan
+
+    def write_profile() -> None:
+        if profiler is None or profile is None:
+            return
+        profiler.stop()
+        try:
+            profiler.write(profile)
+        except OSError as e:
+            print(f"{RED}Could not write the profile: {e}{RESET}")
+        else:
+            print(f"{YELLOW}Profile written to {MAGENTA}{profile}{YELLOW}.{RESET}")
+
+    if dry_run:
+        try:
+            await make_plan()
+        finally:
+            if ranged is not None:
+                ranged.close()
+            engine.close()
+            metrics.close()
+            write_profile()
+        return
+    # The shared queue hands a worker's unfinished tracks to the others once
+    # its lease expires, so workers keep no journal of their own to replay.
+    journal: RunJournal | None = None
+    if work_queue is None:
+        journal = RunJournal()
+        journal.open(resume=resume)
+    shared_queue: WorkQueue | None = None
+    if work_queue is not None:
+        from ytdlplist.workqueue import SqliteWorkQueue
+
+        shared_queue = SqliteWorkQueue(work_queue)
+    transcoder: Transcoder | None = None
+    if split_transcode:
+        from ytdlplist.transcode import Transcoder
+
+        transcoder = Transcoder(transcode_workers)
+    controller: ConcurrencyController | None = None
+    if adaptive:
+        from ytdlplist.adaptive import ConcurrencyController
+
+        controller = ConcurrencyController(
+            min(min_concurrency, concurrency), concurrency
         )
+    scheduler = DownloadScheduler(
+        downloader=engine.download,
+        audio_player=audio_player,
+        concurrency=concurrency,
+        interval=interval,
+        journal=journal,
+        retry=RetryPolicy(retries),
+        fetcher=ranged.fetch_audio if ranged is not None else engine.fetch_audio,
+        transcoder=transcoder,
+        metrics=metrics,
+        store=store,
+        work_queue=shared_queue,
+        worker_id=worker_id,
+        lease=lease,
+        controller=controller,
+        min_interval=min_interval if adaptive else None,
+        progress=progress,
+    )
+    progress.open()
+    scheduler.start()
+    if journal is not None and len(journal):
+        counts: dict[str, int] = journal.counts()
+        progress.log(
+            f"{YELLOW}Resuming interrupted run: {GREEN}{counts['done']} done{YELLOW}, {MAGENTA}{scheduler.resume()} left{YELLOW}.{RESET}"
+        )
+    if cache is not None:
+        for playlist_id in index.urls:
+            index.add_tracks(playlist_id, cache.video_ids(playlist_id))
+        shared: int = len(index.shared())
+        metrics.set("ytdlplist_shared_tracks", shared)
+        if shared and store is not None:
+            progress.log(
+                f"{YELLOW}{MAGENTA}{shared}{YELLOW} known tracks are in more than one playlist; each is downloaded once.{RESET}"
+            )
+    metadata_slots = asyncio.Semaphore(DEFAULT_METADATA_CONCURRENCY)
+    prepared: list[Playlist] = []
+
+    async def prepare(_playlist: str) -> None:
+        async with metadata_slots:
+            playlist = Playlist(
+                _playlist,
+                audio_player,
+                engine,
+                cache=cache,
+                incremental=incremental,
+                progress=progress,
+                policy=policies.get(_playlist),
+            )
+            started_at: float = monotonic()
+            try:
+                queued: int = await playlist.enqueue_streaming(
+                    scheduler,
+                    output_root=output_root,
+                    audio_only=True,
+                    output_ext="mp3",
+                    use_archive=use_archive,
+                    title_lookup=title_lookup,
+                    keep_entries=m3u,
+                )
+            except CalledProcessError as e:
+                metrics.inc("ytdlplist_playlist_errors_total")
+                progress.log(
+                    f"  {YELLOW}[{RED}SKIP{YELLOW}] {RED}Error retrieving playlist information for playlist id {MAGENTA}{playlist.id}{YELLOW}: {RED}{e}{RESET}"
+                )
+                return
+            prepared.append(playlist)
+            seconds: float = monotonic() - started_at
+            metrics.observe("ytdlplist_playlist_metadata_seconds", seconds)
+            metrics.event(
+                "playlist",
+                id=playlist.id,
+                title=playlist.title,
+                queued=queued,
+                metadata_seconds=round(seconds, 3),
+            )
+
+    try:
+        if watch is not None:
+            from ytdlplist.watcher import PlaylistWatcher
+
+            watcher = PlaylistWatcher(
+                watch,
+                scheduler,
+                engine,
+                audio_player,
+                output_root,
+                interval=watch_interval,
+                cache=cache,
+                incremental=incremental,
+                use_archive=use_archive,
+                title_lookup=title_lookup,
+                journal=journal,
+                metrics=metrics,
+                m3u=m3u,
+            )
+            # Runs until SIGTERM; tracks still queued are resumed next time.
+            await watcher.run()
+            await scheduler.stop()
+            if journal is not None and not scheduler.pending:
+                journal.close(finished=True)
+            playlists = list(watcher.playlists)
+            results: dict[str, int] = scheduler.results
+        else:
+            if plan:
+                sync_plan: SyncPlan = await make_plan()
+                sync_plan.enqueue(scheduler, use_archive)
+                for playlist_plan in sync_plan.playlists:
+                    if playlist_plan.error is None:
+                        prepared.append(playlist_plan.playlist)
+                    else:
+                        metrics.inc("ytdlplist_playlist_errors_total")
+            else:
+                await asyncio.gather(*(prepare(_playlist) for _playlist in playlists))
+                if cache:
+                    cache.save()
+            results = await scheduler.join()
+            if journal is not None:
+                journal.close(finished=True)
+            if m3u:
+                for playlist in prepared:
+                    write_m3u(playlist.output_dir(output_root), playlist.json or [])
+        metrics.event(
+            "run",
+            playlists=len(playlists),
+            seconds=round(monotonic() - run_started_at, 3),
+            **results,
+        )
+    finally:
+        await progress.close()
+        if journal is not None:
+            journal.close()
+        if ranged is not None:
+            ranged.close()
+        engine.close()
+        metrics.close()
+        if shared_queue is not None:
+            shared_queue.close()
+        write_profile()
+    await audio_player("slidebeep.wav")
+    print(
+        f"{YELLOW}Downloaded {GREEN}{results['success']} tracks{YELLOW} with {RED}{results['error']} errors{YELLOW}, skipped {DARK}{results['skipped']} already downloaded{YELLOW}, retried {DARK}{results['retried']}.{RESET}"
+    )
 
 
 def banner():
@@ -141,18 +398,281 @@ def banner():
 
 
 async def abanner():
-    await asyncio.sleep(1.5)
     banner()
 
 
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+
+    Parameters
+    ----------
+    argv : list[str] | None, optional
+        Arguments to parse, by default sys.argv[1:]
+
+    Returns
+    -------
+    argparse.Namespace
+        Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="ytdlplist", description="Download YouTube playlists with yt-dlp."
+    )
+    parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="number of tracks to download at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help="average seconds between download starts per host (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="adjust the number of downloads at once between --min-concurrency and --concurrency, and the pacing between --interval and --min-interval, to download speed and errors",
+    )
+    parser.add_argument(
+        "--min-concurrency",
+        type=int,
+        default=DEFAULT_MIN_CONCURRENCY,
+        help="with --adaptive, fewest tracks to download at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        help="with --adaptive, shortest average seconds between download starts per host (default: --interval)",
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=1,
+        help="connections per track download; more than one fetches long streams in parallel byte ranges, or DASH fragments in parallel (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-title-lookup",
+        dest="title_lookup",
+        action="store_false",
+        help="never spawn a separate yt-dlp call for a playlist's title",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="cli",
+        help="spawn the yt-dlp CLI per track, or drive yt_dlp in a worker pool (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_CACHE_TTL,
+        help="seconds to reuse cached playlist metadata without any network call (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="neither read nor write the playlist metadata cache",
+    )
+    parser.add_argument(
+        "--full-refresh",
+        dest="incremental",
+        action="store_false",
+        help="re-fetch whole playlists instead of only their new head entries",
+    )
+    parser.add_argument(
+        "--no-archive",
+        dest="use_archive",
+        action="store_false",
+        help="download every track, even if the download archive lists it",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help="times to retry a track after a transient or rate-limit error (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--transcode-workers",
+        type=int,
+        default=None,
+        help="number of ffmpeg conversions to run at once (default: number of CPU cores)",
+    )
+    parser.add_argument(
+        "--inline-transcode",
+        dest="split_transcode",
+        action="store_false",
+        help="let each yt-dlp process convert its own download instead of a separate ffmpeg pool",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="append per-track and per-playlist timings to this JSON lines file",
+    )
+    parser.add_argument(
+        "--prometheus-file",
+        metavar="PATH",
+        help="keep Prometheus text-format metrics up to date in this file",
+    )
+    parser.add_argument(
+        "--prometheus-port",
+        type=int,
+        metavar="PORT",
+        help="serve Prometheus metrics on 127.0.0.1:PORT while running",
+    )
+    parser.add_argument(
+        "--store",
+        action="store_true",
+        help="download each track once into a shared store and link it into every playlist directory that lists it, instead of downloading into each directory",
+    )
+    parser.add_argument(
+        "--link",
+        choices=LINK_MODES,
+        default="hardlink",
+        help="with --store, how stored tracks appear in playlist directories; falls back to the next option when unsupported (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--m3u",
+        action="store_true",
+        help="write an M3U playlist into each playlist directory",
+    )
+    parser.add_argument(
+        "--work-queue",
+        metavar="PATH",
+        help="share the download queue with other processes or hosts through this SQLite file, e.g. on shared storage",
+    )
+    parser.add_argument(
+        "--drain-only",
+        action="store_true",
+        help="with --work-queue, only download tracks already in the queue instead of also enumerating playlists.json",
+    )
+    parser.add_argument(
+        "--worker-id",
+        help="name to claim work queue tracks under (default: host name and process ID)",
+    )
+    parser.add_argument(
+        "--lease",
+        type=float,
+        default=DEFAULT_LEASE,
+        help="seconds a claimed track stays reserved after its worker stops sending heartbeats (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running, polling each playlist for new tracks and reloading playlists.json when it changes",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL,
+        help="seconds between polls of a playlist that does not set its own interval (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--progress",
+        choices=PROGRESS_MODES,
+        default="auto",
+        help="show a live status block of the downloads in flight, or plain log lines; auto uses the status block on terminals only (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="list what a sync would download, link and leave alone, with an estimate of its size and duration, then exit without downloading",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="enumerate every playlist and show that plan before downloading, instead of downloading while playlists are enumerated",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        default=environ.get("YTDLPLIST_PROFILE"),
+        help="write a profile of the run to this file: time from spawn to exit of every yt-dlp and ffmpeg process, and event loop stalls over 100 ms (default: $YTDLPLIST_PROFILE)",
+    )
+    parser.add_argument(
+        "--profiler",
+        choices=PROFILE_MODES,
+        default=environ.get("YTDLPLIST_PROFILER"),
+        help="with --profile, also profile the event loop thread with cProfile, or by sampling its stack (default: $YTDLPLIST_PROFILER)",
+    )
+    parser.add_argument(
+        "--no-banner",
+        dest="banner",
+        action="store_false",
+        help="start straight away, without clearing the screen or showing the banner",
+    )
+    parser.add_argument(
+        "--no-sound",
+        dest="sound",
+        action="store_false",
+        help="never load PyAudio or play audio cues",
+    )
+    parser.add_argument(
+        "--no-resume",
+        dest="resume",
+        action="store_false",
+        help="discard the journal of an interrupted run instead of resuming it",
+    )
+    return parser.parse_args(argv)
+
+
 def main():
-    system("cls" if osname == "nt" else "clear")
-    sound_init()
+    args: argparse.Namespace = parse_args()
+    if args.banner:
+        system("cls" if osname == "nt" else "clear")
+    if args.sound:
+        sound_init()
     PLAYER = get_sound_player()
     _playlists: list[Playlist] = []
-    with open(path.join(find_data_dir(), "playlists.json"), "r") as fp:
-        plists: list[str] = Playlist.validate_playlists(json.load(fp))
-        asyncio.run(dlplist_main(playlists=plists, player=PLAYER))
+    playlists_path: str = path.join(find_data_dir(), "playlists.json")
+    with open(playlists_path, "r") as fp:
+        entries: list[str | dict[str, Any]] = json.load(fp)
+        plists: list[str] = Playlist.validate_playlists(entries)
+        asyncio.run(
+            dlplist_main(
+                playlists=[] if args.drain_only and args.work_queue else plists,
+                player=PLAYER,
+                concurrency=args.concurrency,
+                interval=args.interval,
+                title_lookup=args.title_lookup,
+                backend=args.backend,
+                cache_ttl=args.cache_ttl if args.cache else None,
+                incremental=args.incremental,
+                use_archive=args.use_archive,
+                resume=args.resume,
+                retries=args.retries,
+                show_banner=args.banner,
+                split_transcode=args.split_transcode,
+                transcode_workers=args.transcode_workers,
+                metrics_file=args.metrics_file,
+                prometheus_file=args.prometheus_file,
+                prometheus_port=args.prometheus_port,
+                watch=playlists_path if args.watch else None,
+                watch_interval=args.watch_interval,
+                use_store=args.store,
+                link_mode=args.link,
+                m3u=args.m3u,
+                work_queue=args.work_queue,
+                worker_id=args.worker_id,
+                lease=args.lease,
+                adaptive=args.adaptive,
+                min_concurrency=args.min_concurrency,
+                min_interval=args.min_interval,
+                connections=args.connections,
+                progress_mode=args.progress,
+                dry_run=args.dry_run,
+                plan=args.plan,
+                policies=playlist_policies(entries),
+                profile=args.profile,
+                profile_mode=args.profiler,
+            )
+        )
+    if sound_service is not None:
+        sound_service.close()
 
 
 if __name__ == "__main__":